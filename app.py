@@ -5,11 +5,13 @@ import asyncio
 import tempfile
 from pathlib import Path
 import streamlit as st
-from PIL import Image
 import cv2
 import numpy as np
 from fastmcp import Client
+from face_recognition.utils import load_image, load_image_pil
 
+# Previews are decoded at a reduced scale; Streamlit shrinks them to the column anyway.
+PREVIEW_MAX_SIDE = 1024
 
 # Page configuration
 print("Configuring Streamlit page")
@@ -121,7 +123,7 @@ with col1:
             st.session_state.uploaded_image_path = tmp.name
         
         # Display uploaded image
-        image = Image.open(uploaded_file)
+        image = load_image_pil(st.session_state.uploaded_image_path, max_side=PREVIEW_MAX_SIDE)
         st.image(image, caption="Uploaded Image", use_column_width=True)
 
 
@@ -149,7 +151,7 @@ with col2:
                 if result and result.get("success"):
                     print("Image captured successfully")
                     # Display the captured image
-                    image = Image.open(st.session_state.webcam_image_path)
+                    image = load_image_pil(st.session_state.webcam_image_path, max_side=PREVIEW_MAX_SIDE)
                     st.image(image, caption="Captured Image", use_column_width=True)
                     
                     if st.button("🔄 Retake Picture"):
@@ -209,6 +211,8 @@ if run_identification:
                             
                             # Process each detected face
                             identification_results = []
+                            # Decode the uploaded image once for all faces
+                            original_img = load_image(st.session_state.uploaded_image_path)
                             
                             for idx, face in enumerate(faces):
                                 st.divider()
@@ -220,7 +224,6 @@ if run_identification:
                                     x1, y1, x2, y2 = int(bbox[0]), int(bbox[1]), int(bbox[2]), int(bbox[3])
                                     
                                     # Crop face from image
-                                    original_img = cv2.imread(st.session_state.uploaded_image_path)
                                     if original_img is not None:
                                         cropped_face = original_img[y1:y2, x1:x2]
                                         
@@ -0,0 +1,82 @@
+"""Benchmark latency versus throughput of micro-batched face detection at different batch settings."""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_recognition.face_detector import detect_faces_batch  # noqa: E402
+from face_recognition.request_batcher import RequestBatcher  # noqa: E402
+
+
+async def _client(batcher: RequestBatcher, image_path: str, calls: int, latencies: List[float]) -> None:
+    for _ in range(calls):
+        started = time.perf_counter()
+        await batcher.submit(image_path)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_setting(image_path: str, max_batch_size: int, max_wait_ms: float, clients: int, calls: int,
+                      workers: int) -> Dict[str, Any]:
+    """Run ``clients`` concurrent callers through a batcher that detects in a ``workers``-thread pool."""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batcher = RequestBatcher(lambda paths: loop.run_in_executor(pool, detect_faces_batch, paths),
+                                 max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        latencies: List[float] = []
+        started = time.perf_counter()
+        await asyncio.gather(*[_client(batcher, image_path, calls, latencies) for _ in range(clients)])
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "max_batch_size": max_batch_size,
+        "max_wait_ms": max_wait_ms,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_seconds": statistics.median(latencies),
+        "p95_seconds": latencies[int(0.95 * (len(latencies) - 1))],
+        "mean_batch_size": batcher.stats()["mean_batch_size"],
+    }
+
+
+def _parse_settings(text: str) -> List[Tuple[int, float]]:
+    """Parse "1:0,4:10,8:20" into (batch size, window ms) pairs."""
+    return [(int(size), float(window)) for size, window in (item.split(":") for item in text.split(","))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", help="Image to detect in (default: a generated 1280x720 frame).")
+    parser.add_argument("--settings", default="1:0,2:5,4:10,8:10,8:25",
+                        help="Comma-separated max_batch_size:max_wait_ms pairs; 1:0 is unbatched.")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent callers.")
+    parser.add_argument("--calls", type=int, default=4, help="Sequential calls per caller.")
+    parser.add_argument("--workers", type=int, default=1, help="Threads running batches (like MCP_CPU_WORKERS).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = args.image
+        if image_path is None:
+            image_path = os.path.join(tmp, "frame.jpg")
+            rng = np.random.default_rng(0)
+            cv2.imwrite(image_path, rng.integers(0, 255, size=(720, 1280, 3), dtype=np.uint8))
+
+        # Build the model and warm up the graph before timing anything
+        detect_faces_batch([image_path])
+        for max_batch_size, max_wait_ms in _parse_settings(args.settings):
+            run = asyncio.run(run_setting(image_path, max_batch_size, max_wait_ms, args.clients, args.calls,
+                                          args.workers))
+            print(f"batch {run['max_batch_size']:>2}, window {run['max_wait_ms']:>5.1f} ms: "
+                  f"{run['requests_per_second']:.2f} req/s, p50 {run['p50_seconds']:.3f}s, "
+                  f"p95 {run['p95_seconds']:.3f}s, mean batch {run['mean_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
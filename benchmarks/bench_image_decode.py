@@ -0,0 +1,85 @@
+"""Benchmark decode time and peak memory of the image loading paths on a 12 MP JPEG."""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from face_recognition.utils import clear_image_cache, load_image, load_image_pil, load_image_region  # noqa: E402
+
+
+def make_photo(path: str, width: int = 4000, height: int = 3000) -> None:
+    """Write a photo-like JPEG (smooth gradients plus sensor noise) of the given size."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width * 255, y / height * 255, (x + y) / (width + height) * 255], axis=-1)
+    noise = rng.normal(0, 12, size=(height, width, 3)).astype(np.float32)
+    cv2.imwrite(path, np.clip(base + noise, 0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 92])
+
+
+def _modes(path: str) -> Dict[str, Callable[[], object]]:
+    region = [1800, 1200, 2200, 1700]
+    return {
+        "cv2.imread (baseline)": lambda: cv2.imread(path),
+        "PIL.Image.open (baseline)": lambda: np.asarray(Image.open(path).convert("RGB")),
+        "load_image": lambda: load_image(path),
+        "load_image reduce=2": lambda: load_image(path, reduce=2),
+        "load_image reduce=4": lambda: load_image(path, reduce=4),
+        "load_image reduce=8": lambda: load_image(path, reduce=8),
+        "load_image_pil max_side=1920": lambda: load_image_pil(path, max_side=1920),
+        "load_image_region 400x500": lambda: load_image_region(path, region),
+    }
+
+
+def _measure(decode: Callable[[], object], repeats: int) -> Tuple[float, float]:
+    """
+    Median decode time and peak traced allocation for one mode.
+
+    OpenCV decodes into numpy-allocated buffers, which tracemalloc traces, so the
+    peak covers the decoded pixels plus any intermediate full-size copies.
+    """
+    timings = []
+    peak = 0
+    for _ in range(repeats):
+        clear_image_cache()
+        tracemalloc.start()
+        started = time.perf_counter()
+        image = decode()
+        timings.append(time.perf_counter() - started)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del image
+    clear_image_cache()
+    return statistics.median(timings), peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", help="JPEG to decode (defaults to a synthetic 4000x3000 photo).")
+    parser.add_argument("--repeats", type=int, default=5, help="Decodes per mode; the median is reported.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.image
+        if path is None:
+            path = os.path.join(tmp, "photo.jpg")
+            make_photo(path)
+        width, height = Image.open(path).size
+        print(f"{path}: {width}x{height} ({width * height / 1e6:.1f} MP, {os.path.getsize(path) / 1e6:.1f} MB)")
+        print(f"{'mode':<32} {'median ms':>10} {'peak MB':>9}")
+
+        for mode, decode in _modes(path).items():
+            seconds, peak_mb = _measure(decode, args.repeats)
+            print(f"{mode:<32} {seconds * 1000:>10.1f} {peak_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
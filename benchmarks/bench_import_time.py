@@ -0,0 +1,79 @@
+"""Benchmark import time and resident memory of the face_recognition package and its submodules."""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy frameworks that importing the package should not load
+HEAVY_MODULES = ("tensorflow", "retinaface.RetinaFace", "google.generativeai", "google.adk")
+
+# Measured in a fresh interpreter
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from benchmarks.bench_import_time import peak_rss_mb
+started = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "rss_mb": peak_rss_mb(),
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+STATEMENTS = {
+    "python (baseline)": "pass",
+    "import face_recognition": "import face_recognition",
+    "greeter": "import face_recognition; face_recognition.greeter('bench')",
+    "import face_detector": "import face_recognition.face_detector",
+    "import face_matcher": "import face_recognition.face_matcher",
+    # What every import of the package used to cost
+    "first detection import": "from face_recognition.face_detector import RetinaFace; RetinaFace.detect_faces",
+}
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident memory of this process in MB.
+
+    Linux's ``ru_maxrss`` survives ``exec`` and so includes the parent's
+    peak; ``VmHWM`` is reset with the new address space.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def measure(statement: str) -> Dict[str, Any]:
+    """Run ``statement`` in a new interpreter and return its import time, peak RSS and heavy modules loaded."""
+    output = subprocess.run([sys.executable, "-c", PROBE.format(root=ROOT, statement=statement, heavy=HEAVY_MODULES)],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per statement; medians are reported.")
+    args = parser.parse_args()
+
+    print(f"{'statement':<26} {'median ms':>10} {'peak RSS MB':>12}  heavy modules loaded")
+    for name, statement in STATEMENTS.items():
+        runs = [measure(statement) for _ in range(args.repeats)]
+        seconds = statistics.median(run["seconds"] for run in runs)
+        rss_mb = statistics.median(run["rss_mb"] for run in runs)
+        print(f"{name:<26} {seconds * 1000:>10.0f} {rss_mb:>12.0f}  {', '.join(runs[0]['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark throughput and per-worker memory of the prefork MCP server against a single process."""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from fastmcp import Client
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_test_mcp import run_load  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _wait_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with Client(url) as client:
+                await client.call_tool("server_load", {})
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(1)
+
+
+async def _worker_memory(url: str, samples: int) -> Dict[int, Dict[str, Any]]:
+    """Memory reported by each worker that answers ``samples`` fresh connections."""
+    workers: Dict[int, Dict[str, Any]] = {}
+    for _ in range(samples):
+        async with Client(url) as client:
+            worker = (await client.call_tool("server_load", {})).structured_content["worker"]
+            workers[worker["pid"]] = worker
+    return workers
+
+
+def run_server(workers: int, port: int, args: argparse.Namespace, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Start the server with ``workers`` processes, load it, and return throughput and worker memory."""
+    # Detection runs on threads in both modes, so the comparison isolates the number of processes
+    env = {**os.environ, "MCP_WORKERS": str(workers), "MCP_PORT": str(port), "MCP_CPU_EXECUTOR": "thread",
+           "MCP_STATEFUL_TOOLS": "false"}
+    server = subprocess.Popen([sys.executable, "mcp_server.py"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/mcp"
+    try:
+        asyncio.run(_wait_ready(url, args.startup_timeout))
+        # Warm every worker up (each builds its model after the fork, or on first use without the weights)
+        asyncio.run(run_load(url, args.tool, arguments, workers * 2, 1))
+        load = asyncio.run(run_load(url, args.tool, arguments, args.clients, args.calls))
+        memory = asyncio.run(_worker_memory(url, workers * 4))
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    return {"workers": workers, "load": load, "memory": memory}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4, help="Prefork workers to compare with one process.")
+    parser.add_argument("--tool", default="call_detect_faces", help="Tool to call.")
+    parser.add_argument("--args", default='{"image_path": "captured_image.jpg"}', help="Tool arguments as JSON.")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients.")
+    parser.add_argument("--calls", type=int, default=5, help="Sequential calls per client.")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the benchmarked servers.")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="Seconds to wait for the server.")
+    args = parser.parse_args()
+    arguments = json.loads(args.args)
+
+    runs = [run_server(1, args.port, args, arguments), run_server(args.workers, args.port, args, arguments)]
+    for run in runs:
+        load = run["load"]
+        print(f"{run['workers']} worker(s): {load['requests']} requests ({load['errors']} errors) -> "
+              f"{load['requests_per_second']:.2f} req/s, p50 {load['p50_seconds']:.3f}s, "
+              f"p95 {load['p95_seconds']:.3f}s")
+        for pid, memory in sorted(run["memory"].items()):
+            if "rss_mb" in memory:
+                print(f"    pid {pid}: RSS {memory['rss_mb']:.0f} MB, incremental (private) "
+                      f"{memory['private_mb']:.0f} MB, shared {memory['shared_mb']:.0f} MB")
+    single, prefork = (run["load"]["requests_per_second"] for run in runs)
+    if single:
+        print(f"Aggregate throughput gain: {prefork / single:.2f}x with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
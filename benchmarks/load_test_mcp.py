@@ -0,0 +1,70 @@
+"""Load test: concurrent MCP clients calling one tool against a running server."""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from fastmcp import Client
+
+
+async def _client_loop(url: str, tool: str, arguments: Dict[str, Any], calls: int, latencies: List[float],
+                       errors: List[str]) -> None:
+    """One client with its own session issuing ``calls`` sequential requests."""
+    async with Client(url) as client:
+        for _ in range(calls):
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments, raise_on_error=False)
+                if result.is_error:
+                    errors.append(str(result.content))
+            except Exception as e:
+                errors.append(str(e))
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_load(url: str, tool: str, arguments: Dict[str, Any], clients: int, calls: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    await asyncio.gather(*[_client_loop(url, tool, arguments, calls, latencies, errors) for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_seconds": statistics.median(latencies) if latencies else 0.0,
+        "p95_seconds": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/mcp", help="MCP server endpoint.")
+    parser.add_argument("--tool", default="call_detect_faces", help="Tool to call.")
+    parser.add_argument("--args", default='{"image_path": "captured_image.jpg"}', help="Tool arguments as JSON.")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent clients in the loaded run.")
+    parser.add_argument("--calls", type=int, default=5, help="Sequential calls per client.")
+    args = parser.parse_args()
+    arguments = json.loads(args.args)
+
+    # Warm up the server's worker pools (spawned workers load the model on first use), then
+    # a single client gives the serialized baseline; the loaded run should scale well past it
+    asyncio.run(run_load(args.url, args.tool, arguments, 1, 1))
+    baseline = asyncio.run(run_load(args.url, args.tool, arguments, 1, args.calls))
+    loaded = asyncio.run(run_load(args.url, args.tool, arguments, args.clients, args.calls))
+    for run in (baseline, loaded):
+        print(f"{run['clients']:>3} clients: {run['requests']} requests ({run['errors']} errors) in "
+              f"{run['elapsed_seconds']:.2f}s -> {run['requests_per_second']:.2f} req/s, "
+              f"p50 {run['p50_seconds']:.3f}s, p95 {run['p95_seconds']:.3f}s")
+    if baseline["requests_per_second"]:
+        print(f"Throughput scaling: {loaded['requests_per_second'] / baseline['requests_per_second']:.1f}x "
+              f"with {args.clients} clients")
+
+
+if __name__ == "__main__":
+    main()
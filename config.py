@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -13,6 +13,11 @@ class ServerConfig:
     port: int = int(os.getenv("MCP_PORT", 8000))
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     workers: int = int(os.getenv("MCP_WORKERS", 1))
+    # Job and chunked-upload tools keep state in the process that serves them; prefork mode needs them off
+    stateful_tools: bool = os.getenv("MCP_STATEFUL_TOOLS", "true").lower() == "true"
+    # Endpoint the agent's MCP client connects to, and how often its idle session is pinged
+    client_url: str = os.getenv("MCP_SERVER_URL", "http://localhost:8000/mcp")
+    client_keepalive_seconds: float = float(os.getenv("MCP_CLIENT_KEEPALIVE_SECONDS", 30))
     
     @property
     def url(self) -> str:
@@ -75,6 +80,13 @@ class DetectionConfig:
     model_name: str = os.getenv("DETECTION_MODEL", "resnet50")
     nms_threshold: float = float(os.getenv("NMS_THRESHOLD", 0.4))
 
+    # Streaming: minimum frame change score (0-255) to re-run detection, 0 disables gating
+    motion_threshold: float = float(os.getenv("MOTION_THRESHOLD", 4.0))
+
+    # Micro-batching of concurrent call_detect_faces requests; a batch size of 1 disables it
+    batch_max_size: int = int(os.getenv("DETECTION_BATCH_MAX_SIZE", 8))
+    batch_window_ms: float = float(os.getenv("DETECTION_BATCH_WINDOW_MS", 10))
+
 
 @dataclass
 class IdentificationConfig:
@@ -83,6 +95,79 @@ class IdentificationConfig:
     confidence_threshold: float = float(os.getenv("ID_CONFIDENCE", 0.7))
     max_retries: int = int(os.getenv("MAX_RETRIES", 3))
     retry_delay: int = int(os.getenv("RETRY_DELAY", 2))
+    # "full" uploads the whole target frame, "crops" uploads only locally detected target faces
+    target_mode: str = os.getenv("ID_TARGET_MODE", "full")
+    # Tracked faces are re-identified at most once per this many seconds
+    reverify_seconds: float = float(os.getenv("TRACK_REVERIFY_SECONDS", 60))
+
+
+@dataclass
+class CameraConfig:
+    """Camera capture configuration."""
+    # Camera index (e.g. "0"), a video file path / stream URL, or "shm://<name>" for a shared frame ring
+    source: str = os.getenv("CAMERA_SOURCE", "0")
+
+
+@dataclass
+class ExecutorConfig:
+    """Worker pools that keep blocking tool work off the MCP server's event loop."""
+    # "process" runs detection in separate processes (true parallelism), "thread" in threads
+    cpu_executor: str = os.getenv("MCP_CPU_EXECUTOR", "process")
+    cpu_workers: int = int(os.getenv("MCP_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+    # Threads for camera access, file I/O and waiting on remote model calls
+    io_workers: int = int(os.getenv("MCP_IO_WORKERS", 32))
+
+
+@dataclass
+class BlobConfig:
+    """Content-addressed store for images uploaded to the MCP server."""
+    root: str = os.getenv("BLOB_STORE_DIR", "/tmp/face_detection/blobs")
+    # Largest base64 data URI accepted inline in a tool argument; bigger images use chunked uploads
+    max_inline_bytes: int = int(os.getenv("BLOB_MAX_INLINE_BYTES", 4 * 1024 * 1024))
+    max_blob_bytes: int = int(os.getenv("BLOB_MAX_BYTES", 256 * 1024 * 1024))
+
+
+@dataclass
+class AdmissionConfig:
+    """Per-tool concurrency limits and bounded wait queues for the expensive MCP tools."""
+    detect_concurrency: int = int(os.getenv("MCP_DETECT_CONCURRENCY", 32))
+    detect_queue: int = int(os.getenv("MCP_DETECT_QUEUE", 128))
+    identify_concurrency: int = int(os.getenv("MCP_IDENTIFY_CONCURRENCY", 4))
+    identify_queue: int = int(os.getenv("MCP_IDENTIFY_QUEUE", 16))
+    # Each face_matcher call can fan out into many detections and Gemini calls
+    matcher_concurrency: int = int(os.getenv("MCP_MATCHER_CONCURRENCY", 2))
+    matcher_queue: int = int(os.getenv("MCP_MATCHER_QUEUE", 8))
+    search_concurrency: int = int(os.getenv("MCP_SEARCH_CONCURRENCY", 1))
+    search_queue: int = int(os.getenv("MCP_SEARCH_QUEUE", 2))
+    # Seconds a queued call may wait for a slot before it is rejected
+    queue_timeout: float = float(os.getenv("MCP_QUEUE_TIMEOUT", 30))
+
+    def limits(self) -> Dict[str, Tuple[int, int]]:
+        """(max concurrent, max queued) per tool name."""
+        return {
+            "call_detect_faces": (self.detect_concurrency, self.detect_queue),
+            "call_identify_face": (self.identify_concurrency, self.identify_queue),
+            "call_face_matcher": (self.matcher_concurrency, self.matcher_queue),
+            "call_search_video": (self.search_concurrency, self.search_queue),
+        }
+
+
+@dataclass
+class JobConfig:
+    """Background jobs for work that can outlast client and HTTP timeouts."""
+    workers: int = int(os.getenv("MCP_JOB_WORKERS", 2))
+    max_queued: int = int(os.getenv("MCP_JOB_MAX_QUEUED", 100))
+    # Finished jobs and their results are kept this long for get_job
+    ttl_seconds: float = float(os.getenv("MCP_JOB_TTL_SECONDS", 3600))
+
+
+@dataclass
+class TracingConfig:
+    """OpenTelemetry tracing; see face_recognition.tracing.configure_tracing for the exporters."""
+    exporter: str = os.getenv("OTEL_TRACES_EXPORTER", "none")
+    # e.g. http://localhost:4318/v1/traces for a local collector, or a Phoenix endpoint
+    endpoint: Optional[str] = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    service_name: str = os.getenv("OTEL_SERVICE_NAME", "face-detection-mcp")
 
 
 @dataclass
@@ -104,6 +189,12 @@ class AppConfig:
     paths: PathConfig = None
     detection: DetectionConfig = None
     identification: IdentificationConfig = None
+    camera: CameraConfig = None
+    executors: ExecutorConfig = None
+    blobs: BlobConfig = None
+    admission: AdmissionConfig = None
+    jobs: JobConfig = None
+    tracing: TracingConfig = None
     logging: LoggingConfig = None
     
     # Application settings
@@ -125,6 +216,18 @@ class AppConfig:
             self.detection = DetectionConfig()
         if self.identification is None:
             self.identification = IdentificationConfig()
+        if self.camera is None:
+            self.camera = CameraConfig()
+        if self.executors is None:
+            self.executors = ExecutorConfig()
+        if self.blobs is None:
+            self.blobs = BlobConfig()
+        if self.admission is None:
+            self.admission = AdmissionConfig()
+        if self.jobs is None:
+            self.jobs = JobConfig()
+        if self.tracing is None:
+            self.tracing = TracingConfig()
         if self.logging is None:
             self.logging = LoggingConfig()
     
@@ -193,6 +296,36 @@ def get_identification_config() -> IdentificationConfig:
     return get_config().identification
 
 
+def get_camera_config() -> CameraConfig:
+    """Get camera configuration."""
+    return get_config().camera
+
+
+def get_executor_config() -> ExecutorConfig:
+    """Get executor configuration."""
+    return get_config().executors
+
+
+def get_blob_config() -> BlobConfig:
+    """Get blob store configuration."""
+    return get_config().blobs
+
+
+def get_admission_config() -> AdmissionConfig:
+    """Get admission control configuration."""
+    return get_config().admission
+
+
+def get_job_config() -> JobConfig:
+    """Get background job configuration."""
+    return get_config().jobs
+
+
+def get_tracing_config() -> TracingConfig:
+    """Get tracing configuration."""
+    return get_config().tracing
+
+
 def get_logging_config() -> LoggingConfig:
     """Get logging configuration."""
     return get_config().logging
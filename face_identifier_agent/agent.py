@@ -1,5 +1,5 @@
 import json
-from fastmcp import Client
+import os
 from typing import Any, Dict
 from google.adk.agents.llm_agent import Agent
 from google.adk.tools import FunctionTool, ToolContext
@@ -7,8 +7,23 @@ from pathlib import Path
 from .prompt import FACE_MATCHER_PROMPT
 from face_recognition.fetch_image import fetch_image
 from face_recognition.draw_bounding_box_on_image import draw_object_rectangle
+from face_recognition.blob_store import upload_file
+from face_recognition.tracing import configure_tracing
+from face_recognition.mcp_session import PersistentSession
+from config import get_server_config, get_tracing_config
 
-client = Client("http://localhost:8000/mcp")
+# ADK traces each agent turn and the MCP client sends its trace context with every tool call,
+# so the server's tool and pipeline spans appear in the same trace as the turn
+_tracing_config = get_tracing_config()
+configure_tracing(_tracing_config.exporter, _tracing_config.endpoint, "face-identifier-agent")
+
+# One MCP session shared by every tool wrapper, opened on first use and re-established only after a failure.
+# Only idempotent tools are retried after a dropped connection; the others may already have run on the server.
+# upload_blob is content-addressed, so sending the same bytes twice stores the same blob once.
+_server_config = get_server_config()
+IDEMPOTENT_TOOLS = ("call_detect_faces", "has_blob", "upload_blob", "server_load", "get_job")
+session = PersistentSession(_server_config.client_url, keepalive_seconds=_server_config.client_keepalive_seconds,
+                            idempotent_tools=IDEMPOTENT_TOOLS)
 
 # Define a custom tool for drawing bounding rectangle over the target image
 # Use FunctionTool() to create the tool
@@ -19,8 +34,28 @@ draw_object_rectangle_tool = FunctionTool(func=draw_object_rectangle)
 # Use FunctionTool() to create the tool
 # The name and description are automatically inferred from the function's definition and docstring.
 fetch_image_tool = FunctionTool(func=fetch_image)
-    
-async def capture_image(output_path: str) -> str:
+
+
+def _structured(result: Any) -> Dict[str, Any]:
+    """Return the structured content of an MCP tool result, parsing the text content if there is none."""
+    if getattr(result, "structured_content", None) is not None:
+        return result.structured_content
+    for block in getattr(result, "content", None) or []:
+        text = getattr(block, "text", None)
+        if text:
+            return json.loads(text)
+    return {"success": False, "error": "Tool returned no content"}
+
+
+async def _image_ref(image_path: str) -> str:
+    """Upload a local image (skipped if the server already has it) so the server need not share our disk."""
+    if os.path.isfile(image_path):
+        # Through the session, so has_blob and upload_blob are retried on a fresh connection if one drops
+        return await upload_file(session, image_path)
+    return image_path
+
+
+async def capture_image(output_path: str) -> Dict[str, Any]:
     """
     Captures an image from the primary camera and saves it to the specified path.
 
@@ -28,7 +63,7 @@ async def capture_image(output_path: str) -> str:
         output_path (str): The file path where the captured image should be saved.
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the capture result,
+        dict: A dictionary with the capture result,
              for example:
              {
                "success": true,             # bool indicating whether capture succeeded
@@ -37,15 +72,14 @@ async def capture_image(output_path: str) -> str:
              }.
     """
     try:
-        async with client:
-            print(f"Inside the capture_image tool - {output_path}")
-            result = await client.call_tool("call_capture_image", {"output_path": output_path})
-            return str(result)
+        print(f"Inside the capture_image tool - {output_path}")
+        result = await session.call_tool("call_capture_image", {"output_path": output_path})
+        return _structured(result)
     except Exception as e:
-        return json.dumps({"success": False, "file_path": None, "error": str(e)})
+        return {"success": False, "file_path": None, "error": str(e)}
     
 
-async def detect_faces(image_path: str) -> str:
+async def detect_faces(image_path: str) -> Dict[str, Any]:
     """
     Detect faces in an image using RetinaFace.
     
@@ -53,7 +87,7 @@ async def detect_faces(image_path: str) -> str:
         image_path: Path to the image file
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the capture result,
+        dict: A dictionary with the capture result,
              for example:
              {
                 "success": True,
@@ -63,14 +97,13 @@ async def detect_faces(image_path: str) -> str:
             }
     """
     try:
-        async with client:
-            print(f"Inside the detect_faces tool - {image_path}")
-            result = await client.call_tool("call_detect_faces", {"image_path": image_path})
-            return str(result)
+        print(f"Inside the detect_faces tool - {image_path}")
+        result = await session.call_tool("call_detect_faces", {"image_path": await _image_ref(image_path)})
+        return _structured(result)
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
 
-async def identify_face(base_image_path: str, image_to_search_path: str) -> str:
+async def identify_face(base_image_path: str, image_to_search_path: str) -> Dict[str, Any]:
     """
     Compares two images to determine if they contain the same person.
 
@@ -79,7 +112,7 @@ async def identify_face(base_image_path: str, image_to_search_path: str) -> str:
         image_to_search_path (str): The file path to the image to search within.
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the identification result,
+        dict: A dictionary with the identification result,
              for example:
              {
                "is_match": true,              # bool indicating whether the faces match
@@ -90,18 +123,17 @@ async def identify_face(base_image_path: str, image_to_search_path: str) -> str:
              }
     """
     try:
-        async with client:
-            print(f"Inside the identify_face tool - {base_image_path} {image_to_search_path}")
-            result = await client.call_tool(
-                "call_identify_face",
-                {
-                    "base_image_path": base_image_path,
-                    "image_to_search_path": image_to_search_path,
-                },
-            )
-            return str(result)
+        print(f"Inside the identify_face tool - {base_image_path} {image_to_search_path}")
+        result = await session.call_tool(
+            "call_identify_face",
+            {
+                "base_image_path": await _image_ref(base_image_path),
+                "image_to_search_path": await _image_ref(image_to_search_path),
+            },
+        )
+        return _structured(result)
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
     
 async def face_matcher(source_image_path: str, target_image_path: str) -> Dict[str, Any]:
     """
@@ -115,20 +147,19 @@ async def face_matcher(source_image_path: str, target_image_path: str) -> Dict[s
         A dictionary containing the matching results for each detected face.
     """
     try:
-        async with client:
-            print(f"Inside the identify_face tool - {source_image_path} {target_image_path}")
-            result = await client.call_tool(
-                "call_face_matcher",
-                {
-                    "source_image_path": source_image_path,
-                    "target_image_path": target_image_path,
-                },
-            )
-            
-            print(f"Face matcher returend {str(result)}")
-            return str(result)
+        print(f"Inside the identify_face tool - {source_image_path} {target_image_path}")
+        result = await session.call_tool(
+            "call_face_matcher",
+            {
+                "source_image_path": await _image_ref(source_image_path),
+                "target_image_path": await _image_ref(target_image_path),
+            },
+        )
+
+        print(f"Face matcher returend {result}")
+        return _structured(result)
     except Exception as e:
-        return json.dumps({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
     
 root_agent = Agent(
     model='gemini-2.5-flash',
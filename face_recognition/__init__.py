@@ -1,10 +1,48 @@
+"""Face capture, detection, identification and matching tools.
 
-from .camera import capture_image
-from .face_detector import detect_faces
-from .face_identifier import identify_face
-from .draw_bounding_box_on_image import draw_object_rectangle
-from .greet import greeter
-from .face_matcher import face_matcher
-from .fetch_image import fetch_image
+The public functions are imported on first access, so importing the package
+(or one light submodule) does not load TensorFlow, Gemini or ADK.
+"""
+import importlib
+import sys
+import types
+from typing import Any, List
 
-__all__ = ["capture_image", "detect_faces", "identify_face", "greeter", "face_matcher", "fetch_image", "draw_object_rectangle"]
+# Public name -> submodule defining it
+_EXPORTS = {
+    "capture_image": ".camera",
+    "detect_faces": ".face_detector",
+    "identify_face": ".face_identifier",
+    "draw_object_rectangle": ".draw_bounding_box_on_image",
+    "greeter": ".greet",
+    "face_matcher": ".face_matcher",
+    "fetch_image": ".fetch_image",
+    "stream_detections": ".video_stream",
+    "search_video": ".video_search",
+}
+
+__all__ = ["capture_image", "detect_faces", "identify_face", "greeter", "face_matcher", "fetch_image", "draw_object_rectangle",
+           "stream_detections", "search_video"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Importing the face_matcher submodule binds it on the package; keep the function of that name instead
+        if name in _EXPORTS and isinstance(value, types.ModuleType) and value.__name__ == __name__ + _EXPORTS[name]:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,151 @@
+"""Admission control: per-tool concurrency limits with bounded, timed wait queues."""
+import asyncio
+import contextlib
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when a tool call is shed instead of admitted."""
+
+    def __init__(self, tool: str, reason: str, limiter: "ToolLimiter"):
+        super().__init__(f"{tool} is overloaded ({reason}); retry later")
+        self.tool = tool
+        self.reason = reason
+        self.stats = limiter.stats()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Structured tool result describing the rejection."""
+        return {
+            "success": False,
+            "error": str(self),
+            "overloaded": True,
+            "tool": self.tool,
+            "reason": self.reason,
+            "active": self.stats["active"],
+            "queued": self.stats["queued"],
+        }
+
+
+class ToolLimiter:
+    """
+    At most ``max_concurrent`` calls run at once; up to ``max_queue`` more wait.
+
+    A call that arrives when the queue is full is rejected immediately, and
+    a queued call that is not admitted within ``queue_timeout`` seconds is
+    rejected then. Waiters are admitted in arrival order.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        if max_concurrent < 1 or max_queue < 0:
+            raise ValueError(f"Invalid limits: max_concurrent={max_concurrent}, max_queue={max_queue}")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """True when new calls are being rejected outright."""
+        return self.active >= self.max_concurrent and self.queued >= self.max_queue
+
+    async def acquire(self, tool: str) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise Overloaded(tool, "queue_full", self)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # asyncio.wait leaves the future alone on timeout, so a slot handed over just now is not lost
+            done, _ = await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            self.rejected_timeout += 1
+            raise Overloaded(tool, "queue_timeout", self)
+        # release() handed its slot straight to this waiter, so active is unchanged
+        self.admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Admitted at the same moment the caller gave up: pass the slot on
+            self.release()
+            return
+        waiter.cancel()
+        with contextlib.suppress(ValueError):
+            self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "saturated": self.saturated,
+        }
+
+
+class AdmissionController:
+    """
+    Per-tool limiters keyed by tool name.
+
+    Tools without configured limits are always admitted.
+    """
+
+    def __init__(self, limits: Mapping[str, Tuple[int, int]], queue_timeout: float = 30.0):
+        self.limiters = {tool: ToolLimiter(max_concurrent, max_queue, queue_timeout)
+                         for tool, (max_concurrent, max_queue) in limits.items()}
+
+    @contextlib.asynccontextmanager
+    async def admit(self, tool: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for ``tool`` for the duration of the block.
+
+        Raises:
+            Overloaded: If the call is shed because the queue is full or the wait timed out
+        """
+        limiter = self.limiters.get(tool)
+        if limiter is None:
+            yield
+            return
+        await limiter.acquire(tool)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def overloaded(self) -> bool:
+        return any(limiter.saturated for limiter in self.limiters.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "overloaded": self.overloaded(),
+            "tools": {tool: limiter.stats() for tool, limiter in self.limiters.items()},
+        }
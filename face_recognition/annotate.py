@@ -0,0 +1,123 @@
+"""In-memory rendering of face boxes, labels and landmarks onto images."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from .metrics import time_stage
+
+# Encoded formats supported by the renderer and their MIME types.
+MIME_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+FILE_EXTENSIONS = {"jpeg": "jpg", "png": "png", "webp": "webp"}
+
+DEFAULT_COLOR = (255, 0, 0)
+LANDMARK_COLOR = (0, 255, 255)
+
+
+def normalize_format(image_format: str) -> str:
+    """Map a format name or extension such as "JPG" or ".png" to a key of ``MIME_TYPES``."""
+    name = image_format.lower().lstrip(".")
+    name = "jpeg" if name == "jpg" else name
+    if name not in MIME_TYPES:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return name
+
+
+def _to_corners(bbox: Sequence[float], box_format: str) -> Tuple[int, int, int, int]:
+    x1, y1, a, b = [int(round(float(c))) for c in bbox]
+    if box_format == "xywh":
+        return x1, y1, x1 + a, y1 + b
+    return x1, y1, a, b
+
+
+def render_annotations(
+    image: np.ndarray,
+    annotations: List[Dict[str, Any]],
+    box_format: str = "xyxy",
+    thickness: int = 2,
+) -> np.ndarray:
+    """
+    Draw every annotation on a copy of an image in a single pass.
+
+    Args:
+        image: BGR image; it is not modified (cached images are read-only)
+        annotations: Dictionaries with a ``bbox`` and optional ``label``, ``landmarks``
+            (name -> [x, y], as returned by ``detect_faces``) and ``color`` (BGR)
+        box_format: "xyxy" for [x1, y1, x2, y2] boxes, "xywh" for [x, y, width, height]
+        thickness: Line thickness in pixels
+
+    Returns:
+        The annotated copy of the image
+    """
+    canvas = image.copy()
+    for annotation in annotations:
+        color = tuple(annotation.get("color") or DEFAULT_COLOR)
+        bbox = annotation.get("bbox")
+        if bbox and len(bbox) == 4:
+            x1, y1, x2, y2 = _to_corners(bbox, box_format)
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), color, thickness)
+
+            label = annotation.get("label")
+            if label:
+                (text_w, text_h), baseline = cv2.getTextSize(str(label), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+                top = max(0, y1 - text_h - baseline - 4)
+                cv2.rectangle(canvas, (x1, top), (x1 + text_w + 4, top + text_h + baseline + 4), color, cv2.FILLED)
+                cv2.putText(canvas, str(label), (x1 + 2, top + text_h + 2), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                            (255, 255, 255), 1, cv2.LINE_AA)
+
+        for point in (annotation.get("landmarks") or {}).values():
+            center = (int(round(float(point[0]))), int(round(float(point[1]))))
+            cv2.circle(canvas, center, max(2, thickness), LANDMARK_COLOR, cv2.FILLED)
+    return canvas
+
+
+def encode_image(image: np.ndarray, image_format: str = "jpeg", quality: int = 90) -> Tuple[bytes, str]:
+    """
+    Encode a BGR image once, in memory.
+
+    Returns:
+        The encoded bytes and their MIME type
+    """
+    image_format = normalize_format(image_format)
+    params: List[int] = []
+    if image_format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    elif image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    with time_stage("encode"):
+        ok, buffer = cv2.imencode(f".{FILE_EXTENSIONS[image_format]}", image, params)
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+    return buffer.tobytes(), MIME_TYPES[image_format]
+
+
+def annotate_image(
+    image: np.ndarray,
+    annotations: List[Dict[str, Any]],
+    image_format: str = "jpeg",
+    box_format: str = "xyxy",
+    quality: int = 90,
+    thickness: int = 2,
+) -> Tuple[bytes, str]:
+    """Render annotations on an image and return the encoded bytes and MIME type."""
+    canvas = render_annotations(image, annotations, box_format=box_format, thickness=thickness)
+    return encode_image(canvas, image_format=image_format, quality=quality)
+
+
+def annotations_from_boxes(
+    bounding_boxes: List[List[int]],
+    labels: Optional[List[str]] = None,
+    landmarks: Optional[List[Dict[str, List[float]]]] = None,
+) -> List[Dict[str, Any]]:
+    """Zip parallel lists of boxes, labels and landmarks into annotation dictionaries."""
+    annotations = []
+    for i, bbox in enumerate(bounding_boxes):
+        annotations.append({
+            "bbox": bbox,
+            "label": labels[i] if labels and i < len(labels) else None,
+            "landmarks": landmarks[i] if landmarks and i < len(landmarks) else None,
+        })
+    return annotations
@@ -0,0 +1,142 @@
+"""Content-addressed ADK artifact saving with cached display previews."""
+import hashlib
+import mimetypes
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+import cv2
+from google.adk.tools import ToolContext
+from google.genai import types
+from .annotate import encode_image
+from .utils import cached_derivative, load_image_scaled
+
+# Session state key mapping sha256 digests to the artifacts already saved for them.
+ARTIFACT_HASHES_KEY = "artifact_hashes"
+
+# Long side, in pixels, of the JPEG previews saved for display.
+PREVIEW_MAX_SIDE = 640
+PREVIEW_QUALITY = 85
+
+
+def content_hash(data: bytes) -> str:
+    """Hex sha256 digest of in-memory content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_mapped(path: str) -> str:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """
+    Hex sha256 digest of a file, hashed straight from a memory map.
+
+    The digest is cached per file version, so unchanged files are hashed once.
+    """
+    return cached_derivative(path, "sha256", lambda: _hash_mapped(path))
+
+
+def read_file(path: str) -> bytes:
+    """
+    Read a whole file in one call.
+
+    ``types.Part`` only accepts ``bytes``, so uploads always need their own
+    copy of the content; a memory map would only add a second copy.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def make_preview(image_path: str, max_side: int = PREVIEW_MAX_SIDE, quality: int = PREVIEW_QUALITY) -> bytes:
+    """
+    Return a JPEG preview whose long side is at most ``max_side`` pixels.
+
+    Large JPEGs are decoded at a reduced scale first. Previews are cached per
+    file version, so repeated requests do not decode or encode again.
+    """
+    def build() -> bytes:
+        image, _ = load_image_scaled(image_path, max_side)
+        if image is None:
+            raise ValueError(f"Could not read image from {image_path}")
+        height, width = image.shape[:2]
+        scale = max_side / max(height, width)
+        if scale < 1:
+            image = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        data, _ = encode_image(image, "jpeg", quality=quality)
+        return data
+
+    return cached_derivative(image_path, f"preview/{max_side}/{quality}", build)
+
+
+async def save_artifact_once(
+    tool_context: ToolContext, file_name: str, data: bytes, mime_type: str, digest: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Save an artifact unless identical content was already saved in this session.
+
+    Digests of saved artifacts are kept in ``tool_context.state`` so the
+    check survives across tool calls.
+
+    Args:
+        tool_context: ADK tool context of the calling tool
+        file_name: Artifact name used when the content is new
+        data: Artifact content
+        mime_type: MIME type of the content
+        digest: Precomputed sha256 of ``data``
+
+    Returns:
+        Dictionary with the artifact ``filename`` and ``version``, the content
+        ``sha256`` and whether the upload was ``deduplicated``
+    """
+    digest = digest or content_hash(data)
+    known = dict(tool_context.state.get(ARTIFACT_HASHES_KEY) or {})
+    if digest in known:
+        print(f"Artifact content already saved as {known[digest]['filename']}, skipping upload")
+        return {**known[digest], "sha256": digest, "deduplicated": True}
+
+    version = await tool_context.save_artifact(file_name, types.Part.from_bytes(data=data, mime_type=mime_type))
+    known[digest] = {"filename": file_name, "version": version}
+    # Reassign rather than mutate so ADK records the state change
+    tool_context.state[ARTIFACT_HASHES_KEY] = known
+    return {**known[digest], "sha256": digest, "deduplicated": False}
+
+
+async def save_file_artifact(
+    tool_context: ToolContext, path: str, file_name: Optional[str] = None, mime_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Save a file as an artifact, skipping the upload when its content was already saved.
+
+    The file is hashed from a memory map; its bytes are only materialized
+    when it actually has to be uploaded.
+    """
+    file_name = file_name or Path(path).name
+    mime_type = mime_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    digest = file_hash(path)
+    known = tool_context.state.get(ARTIFACT_HASHES_KEY) or {}
+    if digest in known:
+        return await save_artifact_once(tool_context, file_name, b"", mime_type, digest=digest)
+    return await save_artifact_once(tool_context, file_name, read_file(path), mime_type, digest=digest)
+
+
+async def save_preview_artifact(
+    tool_context: ToolContext, image_path: str, max_side: int = PREVIEW_MAX_SIDE
+) -> Dict[str, Any]:
+    """
+    Save a cached, size-bounded JPEG preview of an image as an artifact.
+
+    Files that cannot be decoded as images are saved unchanged instead.
+    """
+    try:
+        preview = make_preview(image_path, max_side=max_side)
+    except (ValueError, cv2.error) as e:
+        print(f"Could not build a preview of {image_path} ({e}); saving the original file")
+        return await save_file_artifact(tool_context, image_path)
+    file_name = f"{Path(image_path).stem}_preview_{max_side}.jpg"
+    return await save_artifact_once(tool_context, file_name, preview, "image/jpeg")
@@ -0,0 +1,176 @@
+"""Resumable parallel offline face matching over directories of images."""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from .serialization import dumps_str
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def list_targets(target: str) -> List[str]:
+    """
+    Expand a directory or manifest into a sorted list of image paths.
+
+    A manifest is a text file with one path per line, or a JSONL file whose
+    objects have a ``path`` field. Relative manifest entries are resolved
+    against the manifest's directory.
+    """
+    path = Path(target)
+    if path.is_dir():
+        return sorted(str(p) for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+    targets = []
+    with open(path, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line)["path"] if line.startswith("{") else line
+            entry_path = Path(entry)
+            targets.append(str(entry_path if entry_path.is_absolute() else path.parent / entry_path))
+    return targets
+
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """
+    Return the targets already completed successfully in an existing JSONL output.
+
+    A partially written last line (from a killed run) is truncated so new
+    results can be appended cleanly.
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("success"):
+            done.add(record["target"])
+    return done
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+def run_batch(
+    sources: List[str],
+    targets: Iterable[str],
+    output_path: str,
+    workers: int = 4,
+    matcher: Optional[Callable[..., Dict[str, Any]]] = None,
+    matcher_kwargs: Optional[Dict[str, Any]] = None,
+    progress: Callable[[str], None] = print,
+    on_record: Optional[Callable[[Dict[str, Any], int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Match the source images against every target and stream results to JSONL.
+
+    Each output line is ``{"target": ..., "success": ..., "result": ...}``.
+    The output file doubles as the checkpoint: targets that already have a
+    successful line are skipped, so a killed job resumes where it stopped
+    (failed targets are retried).
+
+    Args:
+        sources: Source images whose faces are searched for
+        targets: Target image paths
+        output_path: JSONL file to append results to
+        workers: Number of targets processed in parallel
+        matcher: Matching function called as ``matcher(sources, target, **matcher_kwargs)``;
+            defaults to ``face_matcher``
+        matcher_kwargs: Extra keyword arguments for the matcher
+        progress: Callback receiving progress lines
+        on_record: Called as ``on_record(record, processed, pending)`` after each record is written;
+            if it raises, targets not yet started are cancelled and the exception propagates
+
+    Returns:
+        Summary with processed, skipped and failed counts and the throughput
+    """
+    if matcher is None:
+        from .face_matcher import face_matcher as matcher
+    matcher_kwargs = matcher_kwargs or {}
+
+    targets = list(targets)
+    done = load_checkpoint(output_path)
+    pending = [target for target in targets if target not in done]
+    progress(f"{len(targets)} targets, {len(done)} already done, {len(pending)} to process with {workers} workers")
+
+    processed = failed = 0
+    started = time.perf_counter()
+
+    def match(target: str) -> Dict[str, Any]:
+        try:
+            result = matcher(sources, target, **matcher_kwargs)
+            return {"target": target, "success": bool(result.get("success")), "result": result}
+        except Exception as e:
+            return {"target": target, "success": False, "error": str(e)}
+
+    with open(output_path, "a") as output, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(match, target) for target in pending]
+        try:
+            for future in as_completed(futures):
+                record = future.result()
+                output.write(dumps_str(record) + "\n")
+                output.flush()
+
+                processed += 1
+                failed += 0 if record["success"] else 1
+                elapsed = time.perf_counter() - started
+                rate = processed / elapsed if elapsed else 0.0
+                eta = (len(pending) - processed) / rate if rate else 0.0
+                progress(f"[{processed}/{len(pending)}] {rate:.2f} img/s, ETA {_format_seconds(eta)} - "
+                         f"{'ok' if record['success'] else 'FAILED'} {record['target']}")
+                if on_record is not None:
+                    on_record(record, processed, len(pending))
+        except BaseException:
+            # Stop quickly: targets not yet started are dropped (the checkpoint makes a rerun resume)
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "total": len(targets),
+        "skipped": len(done),
+        "processed": processed,
+        "failed": failed,
+        "elapsed_seconds": elapsed,
+        "images_per_second": processed / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Match source faces against a directory or manifest of images.")
+    parser.add_argument("targets", help="Directory of images, or a manifest (.txt paths or .jsonl with 'path').")
+    parser.add_argument("--source", "-s", action="append", required=True,
+                        help="Source image with the faces to look for (repeatable).")
+    parser.add_argument("--output", "-o", default="face_batch_results.jsonl",
+                        help="JSONL results file; also used to resume an interrupted run.")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Number of parallel workers.")
+    parser.add_argument("--target-mode", choices=["full", "crops"], default="full",
+                        help="Send whole target images or only detected target face crops to the identifier.")
+    args = parser.parse_args()
+
+    summary = run_batch(args.source, list_targets(args.targets), args.output, workers=args.workers,
+                        matcher_kwargs={"target_mode": args.target_mode})
+    print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Content-addressed blob store so clients can send image bytes instead of shared paths."""
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Blob references look like "sha256:<64 hex digits>".
+BLOB_REF_PREFIX = "sha256:"
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URI_RE = re.compile(r"^data:[\w/+.-]*(;[\w=.-]+)*;base64,", re.IGNORECASE)
+
+# Uploads that are not finished within this many seconds are discarded.
+UPLOAD_TTL_SECONDS = 3600
+
+
+def make_ref(digest: str) -> str:
+    return f"{BLOB_REF_PREFIX}{digest}"
+
+
+def parse_ref(ref: str) -> Optional[str]:
+    """Return the digest of a ``sha256:<hex>`` reference, or None if ``ref`` is not one."""
+    if not isinstance(ref, str) or not ref.startswith(BLOB_REF_PREFIX):
+        return None
+    digest = ref[len(BLOB_REF_PREFIX):].lower()
+    if not _DIGEST_RE.match(digest):
+        raise ValueError(f"Invalid blob reference: {ref}")
+    return digest
+
+
+def decode_base64(data: str) -> bytes:
+    """Decode plain base64 or a ``data:<mime>;base64,`` URI."""
+    match = _DATA_URI_RE.match(data)
+    if match:
+        data = data[match.end():]
+    try:
+        return base64.b64decode(data, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 payload: {e}") from e
+
+
+class BlobStore:
+    """
+    Immutable blobs stored on disk under their sha256 digest.
+
+    Blobs are written atomically (temporary file then rename), so a blob
+    that exists is always complete and the same content is stored once no
+    matter how often it is uploaded. Large payloads can be uploaded in
+    chunks with ``begin_upload`` / ``append_chunk`` / ``finish_upload``.
+    """
+
+    def __init__(self, root: str, max_blob_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_blob_bytes = max_blob_bytes
+        self._uploads_dir = self.root / "uploads"
+        self._uploads_dir.mkdir(parents=True, exist_ok=True)
+        self._uploads: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def exists(self, ref: str) -> bool:
+        digest = parse_ref(ref)
+        return digest is not None and self.path_for(digest).exists()
+
+    def _commit(self, temp_path: str, digest: str) -> str:
+        final = self.path_for(digest)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        if final.exists():
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, final)
+        return make_ref(digest)
+
+    def put(self, data: bytes) -> str:
+        """Store bytes and return their ``sha256:`` reference."""
+        if len(data) > self.max_blob_bytes:
+            raise ValueError(f"Blob of {len(data)} bytes exceeds the {self.max_blob_bytes} byte limit")
+        digest = hashlib.sha256(data).hexdigest()
+        if self.path_for(digest).exists():
+            return make_ref(digest)
+        fd, temp_path = tempfile.mkstemp(dir=self._uploads_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self._commit(temp_path, digest)
+
+    def put_file(self, path: str) -> str:
+        """Copy a local file into the store and return its reference."""
+        hasher = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self._uploads_dir)
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                hasher.update(chunk)
+                dst.write(chunk)
+        return self._commit(temp_path, hasher.hexdigest())
+
+    def begin_upload(self) -> str:
+        """Start a chunked upload and return its id."""
+        self._expire_uploads()
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = {
+                "path": self._uploads_dir / f"{upload_id}.part",
+                "size": 0,
+                "last_offset": None,
+                "hasher": hashlib.sha256(),
+                "updated": time.monotonic(),
+            }
+            self._uploads[upload_id]["path"].touch()
+        return upload_id
+
+    def append_chunk(self, upload_id: str, offset: int, data: bytes) -> int:
+        """
+        Append a chunk at ``offset`` and return the bytes received so far.
+
+        Chunks must arrive in order; resending the chunk that was just
+        written (same offset and length) is accepted and ignored.
+        """
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                raise KeyError(f"Unknown or expired upload: {upload_id}")
+            if offset == upload["last_offset"] and offset + len(data) == upload["size"]:
+                return upload["size"]
+            if offset != upload["size"]:
+                raise ValueError(f"Expected chunk at offset {upload['size']}, got {offset}")
+            if upload["size"] + len(data) > self.max_blob_bytes:
+                raise ValueError(f"Upload exceeds the {self.max_blob_bytes} byte limit")
+            with open(upload["path"], "ab") as f:
+                f.write(data)
+            upload["hasher"].update(data)
+            upload["last_offset"] = offset
+            upload["size"] += len(data)
+            upload["updated"] = time.monotonic()
+            return upload["size"]
+
+    def finish_upload(self, upload_id: str, expected_sha256: Optional[str] = None) -> str:
+        """Complete a chunked upload, optionally verifying its digest, and return the blob reference."""
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            raise KeyError(f"Unknown or expired upload: {upload_id}")
+        digest = upload["hasher"].hexdigest()
+        if expected_sha256 and expected_sha256.lower().removeprefix(BLOB_REF_PREFIX) != digest:
+            os.remove(upload["path"])
+            raise ValueError(f"Upload digest {digest} does not match the expected {expected_sha256}")
+        return self._commit(str(upload["path"]), digest)
+
+    def _expire_uploads(self) -> None:
+        cutoff = time.monotonic() - UPLOAD_TTL_SECONDS
+        with self._lock:
+            expired = [uid for uid, upload in self._uploads.items() if upload["updated"] < cutoff]
+            for upload_id in expired:
+                upload = self._uploads.pop(upload_id)
+                Path(upload["path"]).unlink(missing_ok=True)
+
+    def read(self, ref: str) -> bytes:
+        digest = parse_ref(ref)
+        if digest is None:
+            raise ValueError(f"Not a blob reference: {ref}")
+        return self.path_for(digest).read_bytes()
+
+    def resolve(self, value: str, max_inline_bytes: Optional[int] = None) -> str:
+        """
+        Turn an image argument into a local file path.
+
+        Accepts a ``sha256:<hex>`` blob reference, a base64 ``data:`` URI
+        (stored first, so it can be referenced by hash later), or a plain
+        path, which is returned unchanged.
+
+        Raises:
+            FileNotFoundError: If a referenced blob is not in the store
+            ValueError: If an inline payload is malformed or too large
+        """
+        digest = parse_ref(value)
+        if digest is not None:
+            path = self.path_for(digest)
+            if not path.exists():
+                raise FileNotFoundError(f"Blob not found: {value}; upload it first")
+            return str(path)
+        if _DATA_URI_RE.match(value):
+            if max_inline_bytes is not None and len(value) * 3 // 4 > max_inline_bytes:
+                raise ValueError(f"Inline image exceeds {max_inline_bytes} bytes; use a chunked upload")
+            return str(self.path_for(parse_ref(self.put(decode_base64(value)))))
+        return value
+
+
+async def upload_file(client: Any, path: str, chunk_size: int = 1024 * 1024, inline_limit: int = 1024 * 1024) -> str:
+    """
+    Make a local file available to a (possibly remote) MCP server and return its blob reference.
+
+    Nothing is sent if the server already has the content. Files up to
+    ``inline_limit`` bytes are sent in one call; larger files are sent in
+    ``chunk_size`` chunks.
+
+    Args:
+        client: Connected ``fastmcp.Client``, or a ``PersistentSession`` to retry dropped calls
+        path: Local file to upload
+
+    Raises:
+        RuntimeError: If the server rejects any step of the upload
+    """
+    data = Path(path).read_bytes()
+    ref = make_ref(hashlib.sha256(data).hexdigest())
+    if (await _call(client, "has_blob", {"ref": ref})).get("exists"):
+        return ref
+
+    if len(data) <= inline_limit:
+        result = await _call(client, "upload_blob", {"data_base64": base64.b64encode(data).decode("ascii")})
+        return result["ref"]
+
+    upload_id = (await _call(client, "begin_upload", {}))["upload_id"]
+    for offset in range(0, len(data), chunk_size):
+        chunk = base64.b64encode(data[offset:offset + chunk_size]).decode("ascii")
+        await _call(client, "upload_chunk", {"upload_id": upload_id, "offset": offset, "data_base64": chunk})
+    return (await _call(client, "finish_upload", {"upload_id": upload_id, "sha256": ref}))["ref"]
+
+
+async def _call(client: Any, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Call an upload tool and return its structured content, raising with the server's message on failure."""
+    result = await client.call_tool(tool, arguments)
+    content = result.structured_content or {}
+    if result.is_error or content.get("success") is False or content.get("error"):
+        message = content.get("error") or " ".join(getattr(block, "text", "") for block in result.content)
+        raise RuntimeError(f"{tool} failed: {message or 'no error message'}")
+    return content
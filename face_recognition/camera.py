@@ -1,9 +1,34 @@
 """Camera capture module using OpenCV."""
 print("Executing camera.py")
 
-from typing import Any, Dict
+import atexit
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
 import cv2
+import numpy as np
 import time
+from .frame_ring import FrameRingConsumer, ring_name_from_source
+
+# Frames captured right after a device is opened are often dark while the
+# sensor adjusts its exposure, so the first read waits this long.
+DEVICE_WARMUP_SECONDS = 1.0
+
+
+def _open_capture(source: Union[int, str]) -> cv2.VideoCapture:
+    """Open a camera index or video file/stream URL with a suitable backend."""
+    if isinstance(source, int):
+        backend = cv2.CAP_AVFOUNDATION if sys.platform == "darwin" else cv2.CAP_ANY
+        return cv2.VideoCapture(source, backend)
+    return cv2.VideoCapture(source)
+
+
+def normalize_source(source: Union[int, str]) -> Union[int, str]:
+    """Treat numeric strings (e.g. from environment variables) as camera indices."""
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
 
 def list_cameras() -> list[int]:
     """
@@ -13,7 +38,7 @@ def list_cameras() -> list[int]:
     print("Listing available cameras")
     available_cameras = []
     for i in range(10):  # Check up to 10 possible camera indices
-        cap = cv2.VideoCapture(i, cv2.CAP_AVFOUNDATION)
+        cap = _open_capture(i)
         if cap.isOpened():
             print(f"Camera index {i} is available.")
             available_cameras.append(i)
@@ -21,40 +46,336 @@ def list_cameras() -> list[int]:
     return available_cameras
 
 
-def capture_image(file_path: str, camera_index: int = 0) -> Dict[str, Any]:
+class CameraSession:
+    """
+    Keep a capture source open and continuously grab its newest frame.
+
+    A background thread reads frames into a single latest-frame slot, so
+    ``read()`` returns immediately with the freshest frame instead of paying
+    the device open/warm-up cost on every capture. The source can be a camera
+    index or a video file path; files are played back at their native frame
+    rate (and looped by default) so they behave like a live feed.
+    """
+
+    def __init__(self, source: Union[int, str] = 0, loop: bool = True):
+        self.source = normalize_source(source)
+        self.loop = loop
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Serializes start() and stop(), so concurrent first captures open the source once
+        self._lifecycle = threading.Lock()
+        self._frame_ready = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._seq = 0
+        self._started_at = 0.0
+        self._ended = False
+        self.fps = 0.0
+
+    @property
+    def is_file(self) -> bool:
+        """Whether the source is a file or stream rather than a camera index."""
+        return not isinstance(self.source, int)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background grabber is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def frame_count(self) -> int:
+        """Number of frames grabbed since the session started."""
+        return self._seq
+
+    def start(self) -> bool:
+        """
+        Open the source and start the grabber thread. Returns False if the source cannot be opened.
+
+        Safe to call from several threads at once: exactly one of them opens
+        the source and starts the grabber, the others see it running.
+        """
+        with self._lifecycle:
+            if self.is_running:
+                return True
+            print(f"Opening camera session for source {self.source}")
+            cap = _open_capture(self.source)
+            if not cap.isOpened():
+                print(f"Error: Could not open capture source {self.source}.")
+                cap.release()
+                return False
+
+            self.fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            # Each grabber gets its own stop event, so one that outlived stop() never resumes
+            self._stop_event = threading.Event()
+            self._ended = False
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._grab_loop, args=(cap, self._stop_event),
+                                            name=f"camera-{self.source}", daemon=True)
+            self._thread.start()
+            return True
+
+    def _grab_loop(self, cap: cv2.VideoCapture, stop_event: threading.Event) -> None:
+        """
+        Continuously read frames from ``cap`` into the latest-frame slot.
+
+        The grabber owns its capture and releases it when it exits, so no
+        other thread can release the capture while a read is in progress.
+        """
+        try:
+            self._grab_frames(cap, stop_event)
+        finally:
+            cap.release()
+        # Drop the last frame so a stopped source is never reported as a successful capture;
+        # a grabber that outlived stop() leaves the state of its successor alone
+        with self._frame_ready:
+            if stop_event is self._stop_event:
+                self._frame = None
+                self._seq = 0
+                self._ended = True
+            self._frame_ready.notify_all()
+
+    def _grab_frames(self, cap: cv2.VideoCapture, stop_event: threading.Event) -> None:
+        frame_interval = 1.0 / self.fps if self.is_file and self.fps > 0 else 0.0
+        next_frame_at = time.monotonic()
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                if self.is_file and self.loop and self._seq > 0:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                print(f"Capture source {self.source} stopped producing frames")
+                break
+            if stop_event.is_set():
+                break
+
+            with self._frame_ready:
+                self._frame = frame
+                self._seq += 1
+                self._frame_ready.notify_all()
+
+            # Pace file playback to real time so it behaves like a live camera
+            if frame_interval:
+                next_frame_at += frame_interval
+                delay = next_frame_at - time.monotonic()
+                if delay > 0:
+                    stop_event.wait(delay)
+                else:
+                    next_frame_at = time.monotonic()
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return the sequence number and the newest frame without waiting (frame may be None)."""
+        with self._frame_ready:
+            return self._seq, self._frame
+
+    def read(self, timeout: float = 5.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Return a copy of the freshest frame, in the ``cv2.VideoCapture.read`` style.
+
+        Only the very first read after opening a camera waits for frames to
+        arrive (and for the sensor to warm up); later reads return at once.
+        If the grabber has stopped (device disconnected or file ended) the
+        source is reopened, and the read fails if that is not possible.
+        """
+        if not self.is_running and not self.start():
+            return False, None
+
+        deadline = time.monotonic() + timeout
+        if not self.is_file:
+            warmup_left = self._started_at + DEVICE_WARMUP_SECONDS - time.monotonic()
+            if warmup_left > 0:
+                time.sleep(min(warmup_left, timeout))
+
+        with self._frame_ready:
+            while self._frame is None and not self._ended:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._frame_ready.wait(remaining)
+            if self._frame is None:
+                return False, None
+            return True, self._frame.copy()
+
+    def wait_for_frame(self, after_seq: int, timeout: float = 5.0) -> Tuple[int, Optional[np.ndarray]]:
+        """Block until a frame newer than ``after_seq`` is available; returns (seq, frame)."""
+        if not self.is_running and not self.start():
+            return self._seq, None
+        deadline = time.monotonic() + timeout
+        with self._frame_ready:
+            while self._seq <= after_seq and not self._ended:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._frame_ready.wait(remaining)
+            if self._seq <= after_seq:
+                return self._seq, None
+            return self._seq, self._frame
+
+    def stop(self) -> None:
+        """Stop the grabber thread; it releases the device as it exits."""
+        with self._lifecycle:
+            self._stop_event.set()
+            if self._thread is not None:
+                self._thread.join(timeout=2.0)
+                self._thread = None
+
+    def __enter__(self) -> "CameraSession":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+_sessions: Dict[Union[int, str], CameraSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_camera_session(source: Union[int, str] = 0) -> CameraSession:
+    """Return the shared, already-started session for a source, creating it on first use."""
+    source = normalize_source(source)
+    with _sessions_lock:
+        session = _sessions.get(source)
+        if session is None:
+            session = CameraSession(source)
+            _sessions[source] = session
+    if not session.is_running:
+        session.start()
+    return session
+
+
+@atexit.register
+def close_camera_sessions() -> None:
+    """Stop every shared camera session."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.stop()
+
+
+# A ring whose producer has not written for this long is treated as stale and re-attached.
+RING_STALE_SECONDS = 2.0
+
+class _SharedConsumer:
+    """A cached ring consumer shared by capture threads, closed only once no read is using it."""
+
+    def __init__(self, consumer: FrameRingConsumer):
+        self.consumer = consumer
+        self.readers = 0
+        self.retired = False
+
+
+_ring_consumers: Dict[str, _SharedConsumer] = {}
+# Guards _ring_consumers and every _SharedConsumer's readers/retired fields
+_ring_lock = threading.Lock()
+
+
+def _retire_ring_consumer(name: str, shared: _SharedConsumer) -> None:
+    """Stop handing out ``shared`` and close it once its last reader is done (call with _ring_lock held)."""
+    if _ring_consumers.get(name) is shared:
+        del _ring_consumers[name]
+    shared.retired = True
+    if shared.readers == 0:
+        shared.consumer.close()
+
+
+def _drop_ring_consumer(name: str, shared: _SharedConsumer) -> None:
+    with _ring_lock:
+        _retire_ring_consumer(name, shared)
+
+
+def _acquire_ring_consumer(name: str) -> _SharedConsumer:
+    """The shared consumer for a ring, attaching (or re-attaching a stale one) as needed; counts a reader."""
+    with _ring_lock:
+        shared = _ring_consumers.get(name)
+        if shared is not None and shared.consumer.age > RING_STALE_SECONDS:
+            print(f"Frame ring {name} has not advanced for {shared.consumer.age:.1f}s; re-attaching")
+            _retire_ring_consumer(name, shared)
+            shared = None
+        if shared is None:
+            shared = _SharedConsumer(FrameRingConsumer(name))
+            _ring_consumers[name] = shared
+        shared.readers += 1
+        return shared
+
+
+def _release_ring_consumer(shared: _SharedConsumer) -> None:
+    with _ring_lock:
+        shared.readers -= 1
+        if shared.retired and shared.readers == 0:
+            shared.consumer.close()
+
+
+def _read_from_ring(name: str) -> Tuple[bool, Optional[np.ndarray]]:
+    """
+    Read the newest frame from a shared-memory ring, attaching on first use.
+
+    A cached consumer that has stopped advancing may still be mapped to the
+    block of a producer that has since restarted, so it is dropped and the
+    ring is attached again. If the freshly attached ring is stale as well,
+    the producer is not publishing, and the read fails instead of returning
+    the last frame again. Consumers are shared between threads and counted
+    while a read uses them, so a dropped consumer is only closed (and its
+    memory unmapped) after the last read on it has finished.
+    """
+    shared = _acquire_ring_consumer(name)
+    try:
+        if shared.consumer.age > RING_STALE_SECONDS:
+            print(f"Frame ring {name} is not being written to")
+            _drop_ring_consumer(name, shared)
+            return False, None
+        ret, frame = shared.consumer.read()
+        if not ret:
+            _drop_ring_consumer(name, shared)
+        return ret, frame
+    except Exception:
+        _drop_ring_consumer(name, shared)
+        raise
+    finally:
+        _release_ring_consumer(shared)
+
+
+def capture_image(file_path: str, camera_index: int = 0, source: Optional[Union[int, str]] = None) -> Dict[str, Any]:
     """
     Capture an image from the specified webcam.
 
+    The device is kept open in a shared ``CameraSession``, so only the first
+    capture pays the open/warm-up cost.
+
     Args:
         file_path: Path where the captured image will be saved
         camera_index: The index of the camera to use (default: 0)
+        source: Optional capture source overriding camera_index (camera index, video file
+            path, or "shm://<name>" to read from a shared-memory frame ring)
 
     Returns:
         Dictionary with success status and image information
     """
-    print(f"Attempting to capture image from camera {camera_index} to {file_path}")
-    # Open a connection to the specified camera.
-    cap = cv2.VideoCapture(camera_index, cv2.CAP_AVFOUNDATION)
+    source = camera_index if source is None else source
+    print(f"Attempting to capture image from camera {source} to {file_path}")
+    ring_name = ring_name_from_source(source)
+    if ring_name is not None:
+        try:
+            ret, frame = _read_from_ring(ring_name)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: Could not attach to frame ring {ring_name}: {e}")
+            return {"success": False, "error": f"Could not attach to frame ring {ring_name}: {e}"}
+    else:
+        session = get_camera_session(source)
 
-    if not cap.isOpened():
-        print(f"Error: Could not open camera with index {camera_index}.")
-        return {"success": False, "error": f"Could not open camera with index {camera_index}."}
+        if not session.is_running and not session.start():
+            print(f"Error: Could not open camera with index {source}.")
+            return {"success": False, "error": f"Could not open camera with index {source}."}
 
-    # Capture a single frame from the camera.
-    time.sleep(1)
-    ret, frame = cap.read()
+        # Take the freshest frame from the background grabber.
+        ret, frame = session.read()
 
     if not ret:
         print("Error: Could not read frame from camera.")
-        cap.release()
         return {"success": False, "error": "Could not read frame from camera."}
 
     # Save the captured frame to the specified file.
     success = cv2.imwrite(file_path, frame)
 
-    # Release the camera resource.
-    cap.release()
-
     if success:
         print(f"Image captured and saved as {file_path}")
         return {"success": True, "file_path": file_path}
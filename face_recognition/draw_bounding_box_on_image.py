@@ -1,23 +1,36 @@
-import cv2
-from typing import Any, Dict, List
-from google.genai import types
+import uuid
+from typing import Any, Dict, List, Optional
 from google.adk.tools import ToolContext
 from pathlib import Path
-from .utils import load_image_bytes, get_filename
+from .artifacts import save_artifact_once
+from .annotate import FILE_EXTENSIONS, annotate_image, annotations_from_boxes, normalize_format
+from .utils import load_image
 
 
 async  def draw_object_rectangle(
-    image_path: str, bounding_box: List[int], tool_context: ToolContext
+    image_path: str,
+    bounding_box: List[int],
+    tool_context: ToolContext,
+    bounding_boxes: Optional[List[List[int]]] = None,
+    labels: Optional[List[str]] = None,
+    landmarks: Optional[List[Dict[str, List[float]]]] = None,
+    image_format: str = "jpeg",
 ) -> Dict[str, Any]:
     """
-    Draws a bounding box on an image and saves it to a new file.
+    Draws bounding boxes on an image and stores the result as an artifact.
+
+    All boxes, labels and landmarks are drawn in one pass on an in-memory copy
+    of the image, which is encoded once and saved without touching the disk.
 
     Args:
         image_path (str): The path to the input image file.
         bounding_box (List[int]): A list of 4 integers representing the bounding box
-                                  in [x1, y1, x2, y2] format.
-        output_path (str): The path to save the output image with the bounding box.
-        tool_context(ToolContext): 
+                                  in [x, y, width, height] format.
+        tool_context(ToolContext): The ADK tool context used to save the artifact.
+        bounding_boxes (List[List[int]]): Additional boxes in [x, y, width, height] format.
+        labels (List[str]): Optional label per box (bounding_box first, then bounding_boxes).
+        landmarks (List[Dict[str, List[float]]]): Optional facial landmarks per box.
+        image_format (str): Output format, "jpeg", "png" or "webp".
 
     Returns:
         A dictionary with the result of the operation.
@@ -29,35 +42,28 @@ async  def draw_object_rectangle(
     """
     print(f"Tool called to draw object rectangle: '{image_path}'")
     try:
-        color = (255, 0, 0)
-        thickness = 2
-         
-        # Read the image
-        image = cv2.imread(image_path)
+        image_format = normalize_format(image_format)
+
+        # Read the image through the shared cache; the renderer draws on a copy
+        image = load_image(image_path)
         if image is None:
             return {"success": False, "output_path": None, "error": f"Could not read image from {image_path}"}
-        
-        # Draw the bounding box
-        x, y, w, h = [int(c) for c in bounding_box]
-        cv2.rectangle(image, (x, y), (x + w, y + h), color, thickness)
 
-        output_path = "./result_with_bbox.jpg"
-        # Save rewriet the image 
-        cv2.imwrite(output_path, image)
-        
-        # load bytes from the desired path
-        image_bytes = load_image_bytes(output_path)
-    
-        file_name = get_filename(output_path)
-        await tool_context.save_artifact(
-            file_name,
-            types.Part.from_bytes(data=image_bytes, mime_type='image/png'),
-        )
-        
+        boxes = ([bounding_box] if bounding_box else []) + list(bounding_boxes or [])
+        annotations = annotations_from_boxes(boxes, labels, landmarks)
+        image_bytes, mime_type = annotate_image(image, annotations, image_format=image_format, box_format="xywh")
+
+        # Unique names so concurrent calls never overwrite each other's artifact;
+        # an identical rendering that was already saved is not uploaded again
+        file_name = f"{Path(image_path).stem}_bbox_{uuid.uuid4().hex[:8]}.{FILE_EXTENSIONS[image_format]}"
+        artifact = await save_artifact_once(tool_context, file_name, image_bytes, mime_type)
+
         return {
             'status': 'success',
             'detail': 'Image showing detected face is generated successfully and stored in artifacts.',
-            'filename': file_name,
+            'filename': artifact['filename'],
+            'boxes_drawn': len(boxes),
+            'deduplicated': artifact['deduplicated'],
         }
 
     except Exception as e:
@@ -0,0 +1,95 @@
+"""Worker pools for running blocking face recognition calls from async code."""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from . import tracing
+from .metrics import REGISTRY, call_collecting_metrics
+
+
+def _run_in_worker(fn: Callable[..., Any], trace_settings: Optional[Dict[str, Any]],
+                   trace_carrier: Dict[str, str], *args: Any, **kwargs: Any) -> Any:
+    """Process-pool entry point: run under the caller's trace and return the result with its metrics."""
+    if trace_settings and tracing.worker_settings() is None:
+        tracing.configure_tracing(**trace_settings)
+    with tracing.attached_context(trace_carrier):
+        return call_collecting_metrics(fn, *args, **kwargs)
+
+
+class ToolExecutors:
+    """
+    A CPU pool for detection-heavy work and a thread pool for I/O.
+
+    The CPU pool uses spawned processes by default, so RetinaFace inference
+    in one request does not hold the GIL for every other request; pass
+    ``cpu_executor="thread"`` to share one model in a single process instead.
+    Pools are created on first use.
+    """
+
+    def __init__(self, cpu_workers: int = 4, io_workers: int = 32, cpu_executor: str = "process"):
+        if cpu_executor not in ("process", "thread"):
+            raise ValueError(f"cpu_executor must be 'process' or 'thread', got {cpu_executor!r}")
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self.cpu_executor = cpu_executor
+        self._cpu: Optional[Executor] = None
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cpu(self) -> Executor:
+        with self._lock:
+            if self._cpu is None:
+                if self.cpu_executor == "process":
+                    # Spawn rather than fork: TensorFlow's threads do not survive a fork
+                    self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                    mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._cpu = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="tool-cpu")
+            return self._cpu
+
+    @property
+    def io(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io is None:
+                self._io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="tool-io")
+            return self._io
+
+    async def run_cpu(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a CPU-bound function (it must be picklable for the process pool) and await its result."""
+        loop = asyncio.get_running_loop()
+        if self.cpu_executor == "thread":
+            # Copy the context so spans in the worker thread join the caller's trace
+            return await loop.run_in_executor(self.cpu, functools.partial(contextvars.copy_context().run, fn,
+                                                                          *args, **kwargs))
+        # The trace context is sent along, and stage metrics recorded in the worker come back with the result
+        result, metrics = await loop.run_in_executor(
+            self.cpu, functools.partial(_run_in_worker, fn, tracing.worker_settings(), tracing.inject_context(),
+                                        *args, **kwargs))
+        REGISTRY.merge(metrics)
+        return result
+
+    async def run_io(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking I/O function in the thread pool and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.io, functools.partial(contextvars.copy_context().run, fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cpu_executor": self.cpu_executor,
+            "cpu_workers": self.cpu_workers,
+            "io_workers": self.io_workers,
+            "cpu_started": self._cpu is not None,
+            "io_started": self._io is not None,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down any pools that were started; they are recreated on next use."""
+        with self._lock:
+            pools, self._cpu, self._io = (self._cpu, self._io), None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
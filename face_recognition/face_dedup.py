@@ -0,0 +1,99 @@
+"""Near-duplicate face suppression using perceptual hashes."""
+from typing import Any, Dict, List, Sequence
+import cv2
+import numpy as np
+
+# Maximum Hamming distance (out of 64 bits) for two crops to share a cluster.
+DEFAULT_HASH_THRESHOLD = 10
+
+# Crops whose grayscale standard deviation is below this carry no usable
+# structure (flat or blank regions); their hash is meaningless, so they are
+# never merged with anything.
+MIN_CROP_STDDEV = 2.0
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Compute the difference hash of an image.
+
+    Args:
+        image: BGR or grayscale image as a numpy array
+        hash_size: Width/height of the hash grid (hash has hash_size**2 bits)
+
+    Returns:
+        The hash packed into a Python int
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    resized = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = resized[:, 1:] > resized[:, :-1]
+    return int.from_bytes(np.packbits(diff.flatten()).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def _is_degenerate(image: np.ndarray) -> bool:
+    """Check whether a crop is too flat or small to hash reliably."""
+    if image is None or image.size == 0 or min(image.shape[:2]) < 2:
+        return True
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return float(gray.std()) < MIN_CROP_STDDEV
+
+
+def cluster_faces(crops: Sequence[np.ndarray], threshold: int = DEFAULT_HASH_THRESHOLD) -> List[List[int]]:
+    """
+    Group near-identical face crops into clusters.
+
+    Crops can come from one or many source images. Larger crops are visited
+    first so that each cluster's representative (its first member) is the
+    highest-resolution view of that face.
+
+    Args:
+        crops: Face crops as numpy arrays
+        threshold: Maximum Hamming distance between a crop and a cluster representative
+
+    Returns:
+        A list of clusters, each a list of indices into ``crops`` with the
+        representative first
+    """
+    order = sorted(range(len(crops)), key=lambda i: -(crops[i].size if crops[i] is not None else 0))
+
+    clusters: List[List[int]] = []
+    representative_hashes: List[int] = []
+    for index in order:
+        crop = crops[index]
+        if _is_degenerate(crop):
+            clusters.append([index])
+            representative_hashes.append(-1)
+            continue
+
+        crop_hash = dhash(crop)
+        for cluster, rep_hash in zip(clusters, representative_hashes):
+            if rep_hash >= 0 and hamming_distance(crop_hash, rep_hash) <= threshold:
+                cluster.append(index)
+                break
+        else:
+            clusters.append([index])
+            representative_hashes.append(crop_hash)
+
+    return clusters
+
+
+def dedup_stats(total_crops: int, clusters: List[List[int]]) -> Dict[str, Any]:
+    """
+    Summarise a clustering run.
+
+    Returns:
+        Dictionary with the crop count, the number of unique clusters and the
+        fraction of crops that did not need their own identification call
+    """
+    unique = len(clusters)
+    return {
+        "total_crops": total_crops,
+        "unique_clusters": unique,
+        "suppressed": total_crops - unique,
+        "dedup_ratio": (total_crops - unique) / total_crops if total_crops else 0.0,
+    }
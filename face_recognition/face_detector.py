@@ -1,22 +1,91 @@
 """Face detection module using RetinaFace."""
-from typing import Any, Dict
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
-from retinaface import RetinaFace
-
-def convert_to_native_types(obj: Any) -> Any:
-    """Convert numpy types to native Python types for JSON serialization."""
-    if isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, dict):
-        return {k: convert_to_native_types(v) for k, v in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [convert_to_native_types(item) for item in obj]
-    return obj
+from retinaface.commons import preprocess
+from . import tracing
+from .lazy import lazy_module
+from .metrics import STAGE_LATENCY, time_stage
+from .utils import image_size, load_image, reduction_for
+
+# TensorFlow is imported on the first detection rather than with this module
+RetinaFace = lazy_module("retinaface.RetinaFace")
+
+# RetinaFace resizes every input so its short side is 1024 px, capped at a long
+# side of 1980 px. Decoding a larger image beyond that size is wasted work.
+RETINAFACE_TARGET_SIZE = 1024
+RETINAFACE_MAX_SIZE = 1980
+
+
+def load_model() -> Any:
+    """Import TensorFlow and load the RetinaFace weights now instead of on the first detection."""
+    return RetinaFace.build_model()
+
+
+def decode_for_detection(image_path: str) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Decode an image at the smallest JPEG reduction that RetinaFace would not upscale.
+
+    Returns:
+        The cached, read-only image (None if it cannot be decoded) and the
+        reduction factor; coordinates on the image times the factor give
+        full-resolution coordinates
+    """
+    size = image_size(image_path)
+    if size is None or min(size) == 0:
+        return load_image(image_path), 1
+    needed = min(max(size) * RETINAFACE_TARGET_SIZE / min(size), RETINAFACE_MAX_SIZE)
+    reduction = reduction_for(image_path, math.ceil(needed))
+    return load_image(image_path, reduce=reduction), reduction
+
+
+def _landmarks(landmarks: Dict[str, Any], scale: float) -> Dict[str, List[float]]:
+    return {name: [float(c) * scale for c in point] for name, point in landmarks.items()}
+
+
+def _process_faces(faces: Any, scale: float = 1) -> Dict[str, Any]:
+    """
+    Convert raw RetinaFace output into the detection result dictionary.
+
+    Args:
+        faces: RetinaFace output
+        scale: Factor mapping detection coordinates to full-resolution coordinates
+    """
+    if not faces or isinstance(faces, dict) and "error" in faces:
+        print("No faces detected or an error occurred")
+        return {
+            "success": True,
+            "error": None,
+            "faces": [],
+            "total_faces": 0
+        }
+
+    # Process detected faces
+    print(f"Detected {len(faces)} faces")
+    processed_faces = []
+    for face_id, face_data in faces.items():
+        if isinstance(face_data, dict):
+            # Extract facial area (bounding box)
+            facial_area = face_data.get("facial_area", [])
+
+            # Built from native types directly so results serialize without a conversion pass
+            face_info = {
+                "face_id": face_id,
+                "bbox": [int(round(float(c) * scale)) for c in facial_area],
+                "landmarks": _landmarks(face_data.get("landmarks", {}), scale),
+                "confidence": float(face_data.get("score", 0))
+            }
+            processed_faces.append(face_info)
+
+    print("Face detection successful")
+    return {
+        "success": True,
+        "error": None,
+        "faces": processed_faces,
+        "total_faces": len(processed_faces)
+    }
 
 
 def detect_faces(image_path: str) -> Dict[str, Any]:
@@ -41,43 +110,140 @@ def detect_faces(image_path: str) -> Dict[str, Any]:
                 "faces": []
             }
         
-        # Detect faces using RetinaFace
-        print("Calling RetinaFace.detect_faces")
-        faces = RetinaFace.detect_faces(image_path)
-        
-        if not faces or isinstance(faces, dict) and "error" in faces:
-            print("No faces detected or an error occurred")
+        # Decode through the shared image cache so later stages reuse the pixels.
+        # Large JPEGs are decoded at a reduced scale that RetinaFace would resize to anyway.
+        image, reduction = decode_for_detection(image_path)
+        if image is None:
+            print(f"Could not decode image: {image_path}")
             return {
-                "success": True,
-                "error": None,
+                "success": False,
+                "error": f"Could not decode image: {image_path}",
                 "faces": [],
                 "total_faces": 0
             }
-        
-        # Process detected faces
-        print(f"Detected {len(faces)} faces")
-        processed_faces = []
-        for face_id, face_data in faces.items():
-            if isinstance(face_data, dict):
-                # Extract facial area (bounding box)
-                facial_area = face_data.get("facial_area", [])
-                
-                face_info = {
-                    "face_id": face_id,
-                    "bbox": convert_to_native_types(facial_area),
-                    "landmarks": convert_to_native_types(face_data.get("landmarks", {})),
-                    "confidence": float(face_data.get("score", 0))
-                }
-                processed_faces.append(face_info)
-        
-        print("Face detection successful")
+
+        # Detect faces using RetinaFace
+        print("Calling RetinaFace.detect_faces")
+        with tracing.span("detect_faces", **{"image.width": image.shape[1], "image.height": image.shape[0],
+                                             "image.decode_reduction": reduction}) as current:
+            with time_stage("detect"):
+                faces = RetinaFace.detect_faces(image)
+            result = _process_faces(faces, scale=reduction)
+            tracing.set_attributes(current, **{"faces.count": result.get("total_faces")})
+        result["decode_reduction"] = reduction
+        return result
+    
+    except Exception as e:
+        print(f"An error occurred during face detection: {e}")
         return {
-            "success": True,
-            "error": None,
-            "faces": processed_faces,
-            "total_faces": len(processed_faces)
+            "success": False,
+            "error": str(e),
+            "faces": [],
+            "total_faces": 0
         }
-    
+
+
+class _PrecomputedOutput(np.ndarray):
+    """Model output that every RetinaFace backend can unwrap (``.numpy()`` or as a plain array)."""
+
+    def numpy(self) -> np.ndarray:
+        return self.view(np.ndarray)
+
+
+class _PrecomputedModel:
+    """Stands in for the RetinaFace model, returning one image's slice of a batched forward pass."""
+
+    def __init__(self, outputs: List[np.ndarray]):
+        self.outputs = [np.asarray(output).view(_PrecomputedOutput) for output in outputs]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> List[np.ndarray]:
+        return self.outputs
+
+
+def detect_faces_batch(image_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Detect faces in several images with one RetinaFace forward pass per input shape.
+
+    Images are bucketed by the tensor shape RetinaFace resizes them to, and
+    each bucket is stacked into a single batch. Images are not padded into a
+    shared shape: padding changes the network output near the image edges,
+    while exact-shape buckets keep every result identical to ``detect_faces``.
+    Same-camera images always share a bucket.
+
+    Args:
+        image_paths: Paths of the image files
+
+    Returns:
+        One ``detect_faces`` result per path, in order; a failure affects
+        only its own image (or, for a failed forward pass, its bucket)
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(image_paths)
+    buckets: Dict[Tuple[int, ...], List[Tuple[int, np.ndarray, np.ndarray, int]]] = {}
+    for index, image_path in enumerate(image_paths):
+        if not Path(image_path).exists():
+            results[index] = {"success": False, "error": f"Image file not found: {image_path}",
+                              "faces": [], "total_faces": 0}
+            continue
+        try:
+            image, reduction = decode_for_detection(image_path)
+            if image is None:
+                results[index] = {"success": False, "error": f"Could not decode image: {image_path}",
+                                  "faces": [], "total_faces": 0}
+                continue
+            im_tensor, _, _ = preprocess.preprocess_image(image, True)
+        except Exception as e:
+            results[index] = {"success": False, "error": str(e), "faces": [], "total_faces": 0}
+            continue
+        buckets.setdefault(im_tensor.shape, []).append((index, image, im_tensor, reduction))
+
+    print(f"Detecting faces in {len(image_paths)} images with {len(buckets)} batched forward passes")
+    for shape, entries in buckets.items():
+        try:
+            started = time.perf_counter()
+            with tracing.span("detect_faces_batch", **{"batch.size": len(entries), "tensor.height": shape[1],
+                                                       "tensor.width": shape[2]}):
+                net_out = RetinaFace._predict(RetinaFace.build_model(),
+                                              np.concatenate([entry[2] for entry in entries]))
+            # Each image in the batch is charged an equal share of the forward pass
+            share = (time.perf_counter() - started) / len(entries)
+            for row, (index, image, _, reduction) in enumerate(entries):
+                # RetinaFace's own post-processing, fed this image's rows of the batched output
+                started = time.perf_counter()
+                model = _PrecomputedModel([output[row:row + 1] for output in net_out])
+                faces = RetinaFace.detect_faces(image, model=model)
+                STAGE_LATENCY.observe(share + time.perf_counter() - started, stage="detect")
+                result = _process_faces(faces, scale=reduction)
+                result["decode_reduction"] = reduction
+                results[index] = result
+        except Exception as e:
+            print(f"An error occurred during batched face detection: {e}")
+            for index, *_ in entries:
+                results[index] = {"success": False, "error": str(e), "faces": [], "total_faces": 0}
+    return results
+
+
+def detect_faces_in_frame(frame: np.ndarray) -> Dict[str, Any]:
+    """
+    Detect faces in an already decoded BGR frame (e.g. from a video stream).
+
+    Args:
+        frame: BGR image as a numpy array
+
+    Returns:
+        Dictionary containing detected faces with bounding boxes and landmarks
+    """
+    try:
+        if frame is None or frame.size == 0:
+            return {
+                "success": False,
+                "error": "Empty frame",
+                "faces": [],
+                "total_faces": 0
+            }
+        with time_stage("detect"):
+            faces = RetinaFace.detect_faces(frame)
+        return _process_faces(faces)
+
     except Exception as e:
         print(f"An error occurred during face detection: {e}")
         return {
@@ -1,48 +1,34 @@
-import google.generativeai as genai
+import asyncio
 from pathlib import Path
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple, Union
 import json
-from PIL import Image
+import math
+import time
+import cv2
+import numpy as np
+from .face_detector import decode_for_detection, detect_faces
+from . import tracing
+from .lazy import lazy_module
+from .metrics import time_stage
+from .utils import load_image, load_image_scaled
 
-def identify_face(base_image_path: str, image_to_search_path: str) -> Dict[str, Any]:
-    """
-    Identify if the same person appears in two images using Gemini 2.5 Flash.
-    
-    Args:
-        base_image_path: Path to the reference face image (cropped)
-        image_to_search_path: Path to the image to search in (webcam capture)
-        
-    Returns:
-        Dictionary with identification result (True if same person, False otherwise)
-    """
-    print(f"Attempting to identify face from {base_image_path} in {image_to_search_path}")
-    
-    try:
-        # Verify both image files exist
-        base_path = Path(base_image_path)
-        search_path = Path(image_to_search_path)
-        
-        if not base_path.exists():
-            print(f"Base image not found: {base_image_path}")
-            return {
-                "success": False,
-                "error": f"Base image not found: {base_image_path}",
-                "is_match": False
-            }
-        
-        if not search_path.exists():
-            print(f"Search image not found: {image_to_search_path}")
-            return {
-                "success": False,
-                "error": f"Search image not found: {image_to_search_path}",
-                "is_match": False
-            }
-        
-        # Load images using PIL
-        image1 = Image.open(base_image_path)
-        image2 = Image.open(image_to_search_path)
-        
-        prompt = """
+# The Gemini SDK is imported on the first identification rather than with this module
+genai = lazy_module("google.generativeai")
+
+# The full-mode prompt asks for coordinates on a 1920x1080 canvas, so larger
+# targets are decoded at a reduced scale that keeps at least this long side.
+FULL_MODE_MIN_SIDE = 1920
+
+# Gemini model used for identification.
+MODEL_NAME = 'gemini-2.5-pro'
+
+# Side length, in pixels, of each target face tile in the crop mosaic.
+MOSAIC_TILE_SIZE = 160
+
+# Supported values of ``target_mode``.
+TARGET_MODES = ("full", "crops")
+
+FULL_PROMPT = """
             You are a highly specialized face recognition and image analysis expert. Your task is to perform an accurate face comparison and location detection.
 
             **Input:**
@@ -75,30 +61,191 @@ def identify_face(base_image_path: str, image_to_search_path: str) -> Dict[str,
             "bounding_box": [120, 345, 200, 400]
             }
         """
-        
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-2.5-pro')
-        
-        # Generate response with both images
-        response = model.generate_content([
-            prompt,
-            image1,
-            image2
-        ])
-        
-        raw = response.text.strip()
-        print(f"Gemini raw response: {raw}")
-        
+
+CROPS_PROMPT = """
+    You are a highly specialized face recognition expert. Your task is to perform an accurate face comparison.
+
+    **Input:**
+    1.  **Source Image:** Contains the target face for identification.
+    2.  **Target Mosaic:** A grid of {count} face crops taken from a target image. Each tile is labelled with its index (0 to {last}) in the top-left corner.
+
+    **Task:**
+    1.  Compare the face in the Source Image against **every** tile in the Target Mosaic using fine-grained facial features
+        (facial hair, eyeglasses, facial structure, skin texture, hair pattern/color).
+    2.  Determine Match: `'yes'` if the source person appears in one of the tiles, `'no'` otherwise.
+    3.  Return **ONLY** a single, valid JSON object and nothing else.
+
+    **Mandatory Output Schema:**
+    * `"match"`: A string, either `"yes"` or `"no"`.
+    * `"tile"`: The integer index of the matching tile, or the JSON keyword `null` if no match is found.
+
+    **Example Output:**
+    ```json
+    {{
+    "match": "yes",
+    "tile": 2
+    }}
+"""
+
+
+def _parse_model_response(raw: str) -> Dict[str, Any]:
+    """Parse the JSON object returned by the model, tolerating markdown fences."""
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+        raw = raw.strip()
+    return json.loads(raw)
+
+
+def build_face_mosaic(image: np.ndarray, faces: List[Dict[str, Any]], tile_size: int = MOSAIC_TILE_SIZE) -> np.ndarray:
+    """
+    Tile the detected faces of an image into a single labelled mosaic.
+
+    Args:
+        image: BGR image the faces were detected in
+        faces: Detected faces as returned by ``detect_faces`` (bbox is [x1, y1, x2, y2])
+        tile_size: Side length of each square tile
+
+    Returns:
+        BGR mosaic image with tile ``i`` holding ``faces[i]``
+    """
+    cols = max(1, math.ceil(math.sqrt(len(faces))))
+    rows = max(1, math.ceil(len(faces) / cols))
+    mosaic = np.zeros((rows * tile_size, cols * tile_size, 3), dtype=np.uint8)
+    height, width = image.shape[:2]
+
+    for index, face in enumerate(faces):
+        x1, y1, x2, y2 = [int(c) for c in face["bbox"]]
+        crop = image[max(0, y1):min(height, y2), max(0, x1):min(width, x2)]
+        if crop.size == 0:
+            continue
+        # Letterbox the crop into the tile to preserve its aspect ratio
+        scale = tile_size / max(crop.shape[:2])
+        resized = cv2.resize(crop, (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale))),
+                             interpolation=cv2.INTER_AREA)
+        row, col = divmod(index, cols)
+        top, left = row * tile_size, col * tile_size
+        mosaic[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+        cv2.putText(mosaic, str(index), (left + 4, top + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                    (0, 255, 255), 2, cv2.LINE_AA)
+
+    return mosaic
+
+
+def _encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+    """Encode a BGR image as JPEG bytes."""
+    with time_stage("encode"):
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode image as JPEG")
+    return buffer.tobytes()
+
+
+def _prepare_crops_request(
+    base_image_path: str, image_to_search_path: str, target_faces: Optional[List[Dict[str, Any]]]
+) -> Union[Dict[str, Any], Tuple[List[Any], Callable[[str, float], Dict[str, Any]]]]:
+    """Build the request comparing the base face against a mosaic of the target's locally detected faces."""
+    if target_faces is None:
+        detection_result = detect_faces(image_to_search_path)
+        if not detection_result.get("success"):
+            return {
+                "success": False,
+                "error": f"Target face detection failed: {detection_result.get('error')}",
+                "is_match": False
+            }
+        target_faces = detection_result.get("faces", [])
+
+    target_faces = [face for face in target_faces if face.get("bbox") and len(face["bbox"]) == 4]
+    if not target_faces:
+        print("No faces detected in the target image")
+        return {
+            "success": True,
+            "error": None,
+            "is_match": False,
+            "response": None,
+            "bounding_box": None,
+            "payload_bytes": 0,
+            "inference_seconds": 0.0
+        }
+
+    base_image = load_image(base_image_path)
+    target_image, reduction = decode_for_detection(image_to_search_path)
+    if base_image is None or target_image is None:
+        return {
+            "success": False,
+            "error": f"Could not read {base_image_path if base_image is None else image_to_search_path}",
+            "is_match": False
+        }
+
+    base_bytes = _encode_jpeg(base_image)
+    tile_faces = [dict(face, bbox=[c / reduction for c in face["bbox"]]) for face in target_faces]
+    with time_stage("crop"):
+        mosaic = build_face_mosaic(target_image, tile_faces)
+    mosaic_bytes = _encode_jpeg(mosaic)
+    prompt = CROPS_PROMPT.format(count=len(target_faces), last=len(target_faces) - 1)
+    contents = [
+        prompt,
+        {"mime_type": "image/jpeg", "data": base_bytes},
+        {"mime_type": "image/jpeg", "data": mosaic_bytes}
+    ]
+
+    def finish(raw: str, inference_seconds: float) -> Dict[str, Any]:
+        bounding_box = None
+        target_face_id = None
+        try:
+            parsed = _parse_model_response(raw)
+            is_match = parsed.get("match", "").strip().lower() == "yes"
+            tile = parsed.get("tile")
+            if is_match and isinstance(tile, int) and 0 <= tile < len(target_faces):
+                # Report the exact local detection box in the [x, y, width, height] format
+                x1, y1, x2, y2 = [int(c) for c in target_faces[tile]["bbox"]]
+                bounding_box = [x1, y1, x2 - x1, y2 - y1]
+                target_face_id = target_faces[tile].get("face_id")
+        except Exception as parse_err:
+            print(f"Failed to parse JSON from model response: {parse_err}")
+            is_match = raw.lower().startswith("yes")
+
+        return {
+            "success": True,
+            "error": None,
+            "is_match": is_match,
+            "response": raw,
+            "bounding_box": bounding_box,
+            "target_face_id": target_face_id,
+            "payload_bytes": len(base_bytes) + len(mosaic_bytes),
+            "inference_seconds": inference_seconds
+        }
+
+    return contents, finish
+
+
+def _prepare_full_request(
+    base_image_path: str, image_to_search_path: str
+) -> Union[Dict[str, Any], Tuple[List[Any], Callable[[str, float], Dict[str, Any]]]]:
+    """Build the request asking the model to find the base face in the whole target image."""
+    # Decode large targets at a reduced scale; the re-encoded images are what gets uploaded
+    image1 = load_image(base_image_path)
+    image2, _ = load_image_scaled(image_to_search_path, FULL_MODE_MIN_SIDE)
+    if image1 is None or image2 is None:
+        return {
+            "success": False,
+            "error": f"Could not read {base_image_path if image1 is None else image_to_search_path}",
+            "is_match": False
+        }
+    base_bytes = _encode_jpeg(image1)
+    target_bytes = _encode_jpeg(image2)
+    payload_bytes = len(base_bytes) + len(target_bytes)
+    contents = [
+        FULL_PROMPT,
+        {"mime_type": "image/jpeg", "data": base_bytes},
+        {"mime_type": "image/jpeg", "data": target_bytes}
+    ]
+
+    def finish(raw: str, inference_seconds: float) -> Dict[str, Any]:
         # Try to parse JSON response from the model
         try:
-            # Clean up markdown code blocks if present
-            if raw.startswith("```"):
-                raw = raw.split("```")[1]
-                if raw.startswith("json"):
-                    raw = raw[4:]
-                raw = raw.strip()
-            
-            parsed = json.loads(raw)
+            parsed = _parse_model_response(raw)
             match_str = parsed.get("match", "").strip().lower()
             is_match = match_str == "yes"
             bounding_box = parsed.get("bounding_box")
@@ -107,14 +254,109 @@ def identify_face(base_image_path: str, image_to_search_path: str) -> Dict[str,
             # Fallback: try simple yes/no
             is_match = raw.lower().startswith("yes")
             bounding_box = None
-        
+
         return {
             "success": True,
             "error": None,
             "is_match": is_match,
             "response": raw,
-            "bounding_box": bounding_box
+            "bounding_box": bounding_box,
+            "payload_bytes": payload_bytes,
+            "inference_seconds": inference_seconds
+        }
+
+    return contents, finish
+
+
+def _prepare_request(
+    base_image_path: str,
+    image_to_search_path: str,
+    target_mode: str,
+    target_faces: Optional[List[Dict[str, Any]]],
+) -> Union[Dict[str, Any], Tuple[List[Any], Callable[[str, float], Dict[str, Any]]]]:
+    """
+    Validate the inputs and build the model request (local decoding and detection happen here).
+
+    Returns:
+        Either a final result dictionary (on errors, or when no model call is needed),
+        or the request contents and a function turning the model's raw reply and
+        latency into the result
+    """
+    if target_mode not in TARGET_MODES:
+        return {
+            "success": False,
+            "error": f"Unknown target_mode {target_mode!r}; expected one of {TARGET_MODES}",
+            "is_match": False
+        }
+
+    # Verify both image files exist
+    if not Path(base_image_path).exists():
+        print(f"Base image not found: {base_image_path}")
+        return {
+            "success": False,
+            "error": f"Base image not found: {base_image_path}",
+            "is_match": False
+        }
+
+    if not Path(image_to_search_path).exists():
+        print(f"Search image not found: {image_to_search_path}")
+        return {
+            "success": False,
+            "error": f"Search image not found: {image_to_search_path}",
+            "is_match": False
         }
+
+    if target_mode == "crops":
+        return _prepare_crops_request(base_image_path, image_to_search_path, target_faces)
+    return _prepare_full_request(base_image_path, image_to_search_path)
+
+
+def _traced(current: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the upload size and verdict of an identification onto its span."""
+    tracing.set_attributes(current, **{"identify.upload_bytes": result.get("payload_bytes"),
+                                       "identify.is_match": result.get("is_match")})
+    return result
+
+
+def identify_face(
+    base_image_path: str,
+    image_to_search_path: str,
+    target_mode: str = "full",
+    target_faces: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Identify if the same person appears in two images using Gemini 2.5 Flash.
+    
+    Args:
+        base_image_path: Path to the reference face image (cropped)
+        image_to_search_path: Path to the image to search in (webcam capture)
+        target_mode: "full" uploads the whole target image and lets the model locate
+            the face; "crops" runs local face detection on the target and uploads only
+            a mosaic of the detected faces, returning the exact local bounding box
+        target_faces: Pre-computed detections for the target image ("crops" mode only)
+        
+    Returns:
+        Dictionary with identification result (True if same person, False otherwise)
+    """
+    print(f"Attempting to identify face from {base_image_path} in {image_to_search_path}")
+    
+    try:
+        request = _prepare_request(base_image_path, image_to_search_path, target_mode, target_faces)
+        if isinstance(request, dict):
+            return request
+        contents, finish = request
+
+        # Generate response with both images
+        model = genai.GenerativeModel(MODEL_NAME)
+        with tracing.span("identify_face", **{"identify.target_mode": target_mode}) as current:
+            started = time.perf_counter()
+            with time_stage("identify"):
+                response = model.generate_content(contents)
+            inference_seconds = time.perf_counter() - started
+
+            raw = response.text.strip()
+            print(f"Gemini raw response: {raw}")
+            return _traced(current, finish(raw, inference_seconds))
         
     except Exception as e:
         print(f"An error occurred during face identification: {e}")
@@ -122,4 +364,73 @@ def identify_face(base_image_path: str, image_to_search_path: str) -> Dict[str,
             "success": False,
             "error": str(e),
             "is_match": False
-        }
\ No newline at end of file
+        }
+
+
+async def identify_face_async(
+    base_image_path: str,
+    image_to_search_path: str,
+    target_mode: str = "full",
+    target_faces: Optional[List[Dict[str, Any]]] = None,
+    run_cpu: Optional[Callable[..., Awaitable[Any]]] = None,
+    run_io: Optional[Callable[..., Awaitable[Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Asynchronous ``identify_face`` that never blocks the event loop.
+
+    Target face detection ("crops" mode) runs through ``run_cpu`` (e.g. a
+    server's process pool); decoding and request building run through
+    ``run_io``; and the model is called through Gemini's async client, so
+    many identifications can be in flight at once.
+
+    Args:
+        base_image_path: Path to the reference face image (cropped)
+        image_to_search_path: Path to the image to search in
+        target_mode: "full" or "crops", as for ``identify_face``
+        target_faces: Pre-computed detections for the target image ("crops" mode only)
+        run_cpu: Awaitable runner for target face detection, called as ``run_cpu(fn, *args)``;
+            defaults to a worker thread
+        run_io: Awaitable runner for request building; defaults to a worker thread
+
+    Returns:
+        Dictionary with identification result, as returned by ``identify_face``
+    """
+    print(f"Attempting to identify face from {base_image_path} in {image_to_search_path}")
+    run_cpu = run_cpu or asyncio.to_thread
+    run_io = run_io or asyncio.to_thread
+
+    try:
+        if target_mode == "crops" and target_faces is None and Path(image_to_search_path).exists():
+            detection_result = await run_cpu(detect_faces, image_to_search_path)
+            if not detection_result.get("success"):
+                return {
+                    "success": False,
+                    "error": f"Target face detection failed: {detection_result.get('error')}",
+                    "is_match": False
+                }
+            target_faces = detection_result.get("faces", [])
+
+        request = await run_io(
+            _prepare_request, base_image_path, image_to_search_path, target_mode, target_faces)
+        if isinstance(request, dict):
+            return request
+        contents, finish = request
+
+        model = genai.GenerativeModel(MODEL_NAME)
+        with tracing.span("identify_face", **{"identify.target_mode": target_mode}) as current:
+            started = time.perf_counter()
+            with time_stage("identify"):
+                response = await model.generate_content_async(contents)
+            inference_seconds = time.perf_counter() - started
+
+            raw = response.text.strip()
+            print(f"Gemini raw response: {raw}")
+            return _traced(current, finish(raw, inference_seconds))
+
+    except Exception as e:
+        print(f"An error occurred during face identification: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "is_match": False
+        }
@@ -1,36 +1,253 @@
-
 """Face matching module."""
+import asyncio
 import cv2
 import os
-from typing import Any, Dict, List
-from .face_detector import detect_faces
-from .face_identifier import identify_face
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from .face_detector import decode_for_detection, detect_faces
+from .face_identifier import identify_face, identify_face_async
+from . import tracing
+from .metrics import time_stage
+from .face_dedup import DEFAULT_HASH_THRESHOLD, cluster_faces, dedup_stats
 
-def face_matcher(source_image_path: str, target_image_path: str) -> Dict[str, Any]:
+def face_matcher(
+    source_image_path: Union[str, List[str]],
+    target_image_path: str,
+    dedup: bool = True,
+    dedup_threshold: int = DEFAULT_HASH_THRESHOLD,
+    target_mode: str = "full",
+    on_progress: Optional[Callable[[int, int, List[Dict[str, Any]]], None]] = None,
+) -> Dict[str, Any]:
     """
-    Detect all faces in the source image and match them against the target image.
+    Detect all faces in the source image(s) and match them against the target image.
+
+    Near-identical crops (burst captures, video frames) are clustered first so
+    that only one representative per cluster is sent to ``identify_face``; its
+    result is then copied to every member of the cluster.
 
     Args:
-        source_image_path: Path to the source image with faces to be detected.
+        source_image_path: Path, or list of paths, to the source images with faces to be detected.
         target_image_path: Path to the target image to match against.
+        dedup: Whether to suppress near-duplicate crops before identification.
+        dedup_threshold: Maximum perceptual-hash Hamming distance for two crops to be merged.
+        target_mode: "full" sends the whole target image to the identifier; "crops" detects
+            the target faces once locally and sends only a mosaic of those crops.
+        on_progress: Called as ``on_progress(clusters_done, total_clusters, new_results)`` once
+            detection is finished and after each cluster is identified; it may raise to stop matching.
 
     Returns:
         A dictionary containing the matching results for each detected face.
     """
     print(f"Starting face matching process for {source_image_path} and {target_image_path}")
+    source_paths = [source_image_path] if isinstance(source_image_path, str) else list(source_image_path)
 
-    # Detect faces in the source image
-    detection_result = detect_faces(source_image_path)
-    if not detection_result.get("success"):
-        return {
-            "success": False,
-            "error": "Face detection failed.",
-            "details": detection_result.get("error"),
-            "results": []
+    # Each call crops into its own temporary directory, so concurrent matches never overwrite
+    # each other's crops; the directory is removed however matching ends
+    with tempfile.TemporaryDirectory(prefix="match_") as temp_dir:
+        prepared = prepare_match(source_paths, target_image_path, temp_dir, dedup, dedup_threshold, target_mode)
+        if "clusters" not in prepared:
+            return prepared
+
+        # Identify one representative per cluster and fan the result out to its members
+        clusters = prepared["clusters"]
+        match_results: List[Dict[str, Any]] = [None] * len(prepared["entries"])
+        if on_progress is not None:
+            on_progress(0, len(clusters), [])
+        for cluster_id, members in enumerate(clusters):
+            with tracing.span("identify_cluster", **{"cluster.id": cluster_id, "cluster.size": len(members)}):
+                identification_result = identify_face(prepared["entries"][members[0]]["cropped_face_path"],
+                                                      target_image_path, **_mode_kwargs(prepared, target_mode))
+            new_results = _fan_out(prepared, cluster_id, identification_result, match_results)
+            if on_progress is not None:
+                on_progress(cluster_id + 1, len(clusters), new_results)
+        return _matched(prepared, match_results)
+
+
+async def face_matcher_async(
+    source_image_path: Union[str, List[str]],
+    target_image_path: str,
+    dedup: bool = True,
+    dedup_threshold: int = DEFAULT_HASH_THRESHOLD,
+    target_mode: str = "full",
+    on_progress: Optional[Callable[[int, int, List[Dict[str, Any]]], None]] = None,
+    run_cpu: Optional[Callable[..., Awaitable[Any]]] = None,
+    run_io: Optional[Callable[..., Awaitable[Any]]] = None,
+    max_concurrent_identifications: int = 4,
+) -> Dict[str, Any]:
+    """
+    Asynchronous ``face_matcher`` that keeps CPU work and model calls apart.
+
+    Detection, cropping and dedup run through ``run_cpu`` (e.g. a server's
+    process pool), while the clusters are identified with
+    ``identify_face_async`` on the event loop using the same runners, so
+    waiting on Gemini never occupies a CPU worker. Up to
+    ``max_concurrent_identifications`` clusters are identified at once, and
+    ``on_progress`` is called as each one finishes.
+
+    Args:
+        run_cpu: Awaitable runner called as ``run_cpu(fn, *args)``; defaults to a worker thread
+        run_io: Awaitable runner for blocking I/O in identification; defaults to a worker thread
+        max_concurrent_identifications: Clusters identified concurrently
+        Other arguments are as for ``face_matcher``.
+
+    Returns:
+        The same dictionary as ``face_matcher``
+    """
+    print(f"Starting face matching process for {source_image_path} and {target_image_path}")
+    source_paths = [source_image_path] if isinstance(source_image_path, str) else list(source_image_path)
+    run_cpu = run_cpu or asyncio.to_thread
+
+    with tempfile.TemporaryDirectory(prefix="match_") as temp_dir:
+        prepared = await run_cpu(prepare_match, source_paths, target_image_path, temp_dir, dedup,
+                                 dedup_threshold, target_mode)
+        if "clusters" not in prepared:
+            return prepared
+
+        clusters = prepared["clusters"]
+        match_results: List[Dict[str, Any]] = [None] * len(prepared["entries"])
+        if on_progress is not None:
+            on_progress(0, len(clusters), [])
+        slots = asyncio.Semaphore(max(1, max_concurrent_identifications))
+        done = 0
+
+        async def identify_cluster(cluster_id: int, members: List[int]) -> None:
+            nonlocal done
+            async with slots:
+                with tracing.span("identify_cluster", **{"cluster.id": cluster_id, "cluster.size": len(members)}):
+                    identification_result = await identify_face_async(
+                        prepared["entries"][members[0]]["cropped_face_path"], target_image_path,
+                        run_cpu=run_cpu, run_io=run_io, **_mode_kwargs(prepared, target_mode))
+            new_results = _fan_out(prepared, cluster_id, identification_result, match_results)
+            done += 1
+            if on_progress is not None:
+                on_progress(done, len(clusters), new_results)
+
+        tasks = [asyncio.ensure_future(identify_cluster(cluster_id, members))
+                 for cluster_id, members in enumerate(clusters)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the other identifications before the crop directory is removed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return _matched(prepared, match_results)
+
+
+def _mode_kwargs(prepared: Dict[str, Any], target_mode: str) -> Dict[str, Any]:
+    """Identification arguments for the target mode; crops mode shares the target detected once."""
+    if target_mode == "crops":
+        return {"target_mode": "crops", "target_faces": prepared["target_faces"]}
+    return {}
+
+
+def _fan_out(prepared: Dict[str, Any], cluster_id: int, identification_result: Dict[str, Any],
+             match_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy a cluster's identification to each of its members; returns the members' new results."""
+    entries = prepared["entries"]
+    members = prepared["clusters"][cluster_id]
+    for member in members:
+        entry = entries[member]
+        match_result = {
+            "face_id": entry["face_id"],
+            "bbox": entry["bbox"],
+            "identification_result": identification_result,
+            "cluster_id": cluster_id,
+            "is_representative": member == members[0],
         }
+        if prepared["multiple_sources"]:
+            match_result["source_image_path"] = entry["source_image_path"]
+        match_results[member] = match_result
+    return [match_results[member] for member in members]
 
-    faces = detection_result.get("faces", [])
-    if not faces:
+
+def _matched(prepared: Dict[str, Any], match_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "error": None,
+        "total_faces_detected": prepared["total_faces"],
+        "results": match_results,
+        "dedup": prepared["dedup"]
+    }
+
+
+def prepare_match(
+    source_paths: List[str],
+    target_image_path: str,
+    temp_dir: str,
+    dedup: bool = True,
+    dedup_threshold: int = DEFAULT_HASH_THRESHOLD,
+    target_mode: str = "full",
+) -> Dict[str, Any]:
+    """
+    The CPU-bound part of matching: detect and crop the source faces, cluster the crops and,
+    in "crops" mode, detect the target faces.
+
+    Crops are written to ``temp_dir``. The result holds only plain data, so
+    this can run in a process pool.
+
+    Returns:
+        A dictionary with the crop ``entries``, the ``clusters`` of entry indices, ``dedup``
+        statistics, ``target_faces`` and ``total_faces``; or, when matching ends here (a
+        failed detection or no faces), the final ``face_matcher`` result, which has no ``clusters``.
+    """
+    total_faces = 0
+    entries = []
+    crops = []
+    for source_path in source_paths:
+        # Detect faces in the source image
+        detection_result = detect_faces(source_path)
+        if not detection_result.get("success"):
+            return {
+                "success": False,
+                "error": "Face detection failed.",
+                "details": detection_result.get("error"),
+                "results": []
+            }
+
+        faces = detection_result.get("faces", [])
+        if not faces:
+            continue
+        total_faces += len(faces)
+
+        # Reuse the (possibly reduced) decode cached by detect_faces; it is at least as
+        # large as what the detector saw, so the crops lose no usable detail
+        source_image, reduction = decode_for_detection(source_path)
+        if source_image is None:
+            return {
+                "success": False,
+                "error": f"Failed to read source image: {source_path}",
+                "results": []
+            }
+
+        with tracing.span("crop", **{"image.path": source_path, "faces.count": len(faces),
+                                     "image.decode_reduction": reduction}):
+            for i, face in enumerate(faces):
+                print((f"Inside the face detection loop - {i}"))
+                bbox = face.get("bbox")
+                if not bbox or len(bbox) != 4:
+                    print(f"Skipping face {i} due to invalid bounding box.")
+                    continue
+
+                with time_stage("crop"):
+                    # Crop the face from the source image
+                    x1, y1, x2, y2 = [int(coord) // reduction for coord in bbox]
+                    cropped_face = source_image[y1:y2, x1:x2]
+
+                    # Save the cropped face to a temporary file
+                    cropped_face_path = os.path.join(temp_dir, f"face_{len(entries)}.jpg")
+                    cv2.imwrite(cropped_face_path, cropped_face)
+
+                entries.append({
+                    "source_image_path": source_path,
+                    "face_id": face.get("face_id"),
+                    "bbox": bbox,
+                    "cropped_face_path": cropped_face_path,
+                })
+                crops.append(cropped_face)
+
+    if total_faces == 0:
         return {
             "success": True,
             "error": None,
@@ -38,53 +255,35 @@ def face_matcher(source_image_path: str, target_image_path: str) -> Dict[str, An
             "results": []
         }
 
-    # Create a directory for temporary cropped face images
-    temp_dir = "temp_cropped_faces"
-    os.makedirs(temp_dir, exist_ok=True)
-
-    # Read the source image
-    source_image = cv2.imread(source_image_path)
-    if source_image is None:
-        return {
-            "success": False,
-            "error": f"Failed to read source image: {source_image_path}",
-            "results": []
-        }
-
-    match_results = []
-    for i, face in enumerate(faces):
-        print((f"Inside the face detection loop - {i}"))
-        bbox = face.get("bbox")
-        if not bbox or len(bbox) != 4:
-            print(f"Skipping face {i} due to invalid bounding box.")
-            continue
+    with tracing.span("dedup", **{"dedup.enabled": dedup, "dedup.crops": len(crops)}) as current:
+        if dedup:
+            clusters = cluster_faces(crops, threshold=dedup_threshold)
+        else:
+            clusters = [[i] for i in range(len(crops))]
+        stats = dedup_stats(len(crops), clusters)
+        tracing.set_attributes(current, **{"dedup.clusters": stats["unique_clusters"]})
+    print(f"Dedup: {stats['total_crops']} crops -> {stats['unique_clusters']} clusters "
+          f"(ratio {stats['dedup_ratio']:.2f})")
 
-        # Crop the face from the source image
-        x1, y1, x2, y2 = [int(coord) for coord in bbox]
-        cropped_face = source_image[y1:y2, x1:x2]
-
-        # Save the cropped face to a temporary file
-        cropped_face_path = os.path.join(temp_dir, f"face_{i}.jpg")
-        cv2.imwrite(cropped_face_path, cropped_face)
-
-        # Identify the cropped face against the target image
-        identification_result = identify_face(cropped_face_path, target_image_path)
-        match_results.append({
-            "face_id": face.get("face_id"),
-            "bbox": bbox,
-            "identification_result": identification_result
-        })
-
-    # Clean up temporary files
-    # for i in range(len(faces)):
-    #     cropped_face_path = os.path.join(temp_dir, f"face_{i}.jpg")
-    #     if os.path.exists(cropped_face_path):
-    #         os.remove(cropped_face_path)
-    # os.rmdir(temp_dir)
+    # In crops mode the target is detected once and shared by every identification
+    target_faces = None
+    if target_mode == "crops":
+        with tracing.span("detect_target", **{"image.path": target_image_path}):
+            target_detection = detect_faces(target_image_path)
+        if not target_detection.get("success"):
+            return {
+                "success": False,
+                "error": "Target face detection failed.",
+                "details": target_detection.get("error"),
+                "results": []
+            }
+        target_faces = target_detection.get("faces", [])
 
     return {
-        "success": True,
-        "error": None,
-        "total_faces_detected": len(faces),
-        "results": match_results
+        "entries": entries,
+        "clusters": clusters,
+        "dedup": stats,
+        "target_faces": target_faces,
+        "total_faces": total_faces,
+        "multiple_sources": len(source_paths) > 1,
     }
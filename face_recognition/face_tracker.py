@@ -0,0 +1,255 @@
+"""Multi-object face tracking so identification runs per track instead of per frame."""
+import itertools
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import cv2
+import numpy as np
+
+
+def iou(box_a: Sequence[float], box_b: Sequence[float]) -> float:
+    """Intersection over union of two [x1, y1, x2, y2] boxes."""
+    x1 = max(box_a[0], box_b[0])
+    y1 = max(box_a[1], box_b[1])
+    x2 = min(box_a[2], box_b[2])
+    y2 = min(box_a[3], box_b[3])
+    intersection = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    area_a = max(0.0, box_a[2] - box_a[0]) * max(0.0, box_a[3] - box_a[1])
+    area_b = max(0.0, box_b[2] - box_b[0]) * max(0.0, box_b[3] - box_b[1])
+    union = area_a + area_b - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class KalmanBoxFilter:
+    """
+    Constant-velocity Kalman filter over a bounding box.
+
+    The state is [cx, cy, area, aspect, vx, vy, v_area]; the aspect ratio is
+    assumed constant, as in SORT.
+    """
+
+    def __init__(self, bbox: Sequence[float]):
+        self.F = np.eye(7)
+        self.F[0, 4] = self.F[1, 5] = self.F[2, 6] = 1.0
+        self.H = np.eye(4, 7)
+        self.R = np.diag([1.0, 1.0, 10.0, 10.0])
+        self.Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 1e-4])
+        # High initial uncertainty on the unobserved velocities
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+        self.x = np.zeros(7)
+        self.x[:4] = self._to_measurement(bbox)
+
+    @staticmethod
+    def _to_measurement(bbox: Sequence[float]) -> np.ndarray:
+        x1, y1, x2, y2 = [float(c) for c in bbox]
+        w = max(x2 - x1, 1e-3)
+        h = max(y2 - y1, 1e-3)
+        return np.array([x1 + w / 2.0, y1 + h / 2.0, w * h, w / h])
+
+    def predict(self) -> List[float]:
+        """Advance the state by one step and return the predicted box."""
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.bbox
+
+    def update(self, bbox: Sequence[float]) -> None:
+        """Correct the state with an observed box."""
+        y = self._to_measurement(bbox) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+
+    @property
+    def bbox(self) -> List[float]:
+        """Current state estimate as an [x1, y1, x2, y2] box."""
+        cx, cy, area, aspect = self.x[:4]
+        area = max(area, 1e-3)
+        aspect = max(aspect, 1e-3)
+        w = float(np.sqrt(area * aspect))
+        h = area / w
+        return [cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0]
+
+
+class FaceTrack:
+    """A single tracked face and the identity attached to it."""
+
+    def __init__(self, track_id: int, face: Dict[str, Any]):
+        self.track_id = track_id
+        self.filter = KalmanBoxFilter(face["bbox"])
+        self.face = face
+        self.hits = 1
+        self.age = 0
+        self.time_since_update = 0
+        self.identity: Optional[Dict[str, Any]] = None
+        self.identified_at: Optional[float] = None
+
+    @property
+    def bbox(self) -> List[int]:
+        """Smoothed bounding box in [x1, y1, x2, y2] integer pixels."""
+        return [int(round(c)) for c in self.filter.bbox]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "track_id": self.track_id,
+            "bbox": self.bbox,
+            "detection_bbox": self.face.get("bbox"),
+            "confidence": self.face.get("confidence"),
+            "hits": self.hits,
+            "age": self.age,
+            "time_since_update": self.time_since_update,
+            "identity": self.identity,
+        }
+
+
+class FaceTracker:
+    """
+    Associate per-frame detections into persistent face tracks.
+
+    Each frame, every track's Kalman filter predicts its box, detections are
+    greedily matched to predictions by IoU, matched tracks are corrected,
+    unmatched detections start new tracks and tracks unseen for more than
+    ``max_age`` frames are dropped.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 30):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks: List[FaceTrack] = []
+        self._ids = itertools.count(1)
+
+    def update(self, faces: List[Dict[str, Any]]) -> List[FaceTrack]:
+        """
+        Update the tracker with one frame of detections from ``detect_faces``.
+
+        Returns:
+            The tracks that were matched or created in this frame
+        """
+        faces = [face for face in faces if face.get("bbox") and len(face["bbox"]) == 4]
+        predictions = [track.filter.predict() for track in self.tracks]
+        for track in self.tracks:
+            track.age += 1
+            track.time_since_update += 1
+
+        candidates = []
+        for t, predicted in enumerate(predictions):
+            for d, face in enumerate(faces):
+                overlap = iou(predicted, face["bbox"])
+                if overlap >= self.iou_threshold:
+                    candidates.append((overlap, t, d))
+        candidates.sort(reverse=True)
+
+        matched_tracks = set()
+        matched_faces = set()
+        updated = []
+        for _, t, d in candidates:
+            if t in matched_tracks or d in matched_faces:
+                continue
+            track = self.tracks[t]
+            track.filter.update(faces[d]["bbox"])
+            track.face = faces[d]
+            track.hits += 1
+            track.time_since_update = 0
+            matched_tracks.add(t)
+            matched_faces.add(d)
+            updated.append(track)
+
+        for d, face in enumerate(faces):
+            if d not in matched_faces:
+                track = FaceTrack(next(self._ids), face)
+                self.tracks.append(track)
+                updated.append(track)
+
+        self.tracks = [track for track in self.tracks if track.time_since_update <= self.max_age]
+        return updated
+
+
+class TrackIdentifier:
+    """
+    Run identification once per track, re-verifying only periodically.
+
+    ``identify_fn`` receives the BGR crop of a track and returns the
+    identification result dictionary, which is attached to the track.
+    """
+
+    def __init__(
+        self,
+        identify_fn: Callable[[np.ndarray], Dict[str, Any]],
+        reverify_seconds: Optional[float] = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.identify_fn = identify_fn
+        self.reverify_seconds = reverify_seconds
+        self.clock = clock
+        self.identify_calls = 0
+        self._started = clock()
+
+    def is_due(self, track: FaceTrack) -> bool:
+        """Whether a track is new or its identity is older than the re-verification interval."""
+        if track.identity is None or track.identified_at is None:
+            return True
+        if self.reverify_seconds is None:
+            return False
+        return self.clock() - track.identified_at >= self.reverify_seconds
+
+    def identify(self, tracks: List[FaceTrack], frame: np.ndarray) -> int:
+        """
+        Identify the tracks that are due, using their detections in ``frame``.
+
+        Returns:
+            The number of identification calls made
+        """
+        height, width = frame.shape[:2]
+        calls = 0
+        for track in tracks:
+            if track.time_since_update != 0 or not self.is_due(track):
+                continue
+            x1, y1, x2, y2 = [int(c) for c in track.face["bbox"]]
+            crop = frame[max(0, y1):min(height, y2), max(0, x1):min(width, x2)]
+            if crop.size == 0:
+                continue
+            track.identity = self.identify_fn(crop)
+            track.identified_at = self.clock()
+            calls += 1
+        self.identify_calls += calls
+        return calls
+
+    def stats(self) -> Dict[str, Any]:
+        """Identification call counters."""
+        minutes = max((self.clock() - self._started) / 60.0, 1e-9)
+        return {
+            "identify_calls": self.identify_calls,
+            "identify_calls_per_minute": self.identify_calls / minutes,
+        }
+
+
+def crop_identifier(source_image_path: str, identify: Optional[Callable[..., Dict[str, Any]]] = None,
+                    **identify_kwargs) -> Callable[[np.ndarray], Dict[str, Any]]:
+    """
+    Build a ``TrackIdentifier`` callback that checks a track crop against a source face with ``identify_face``.
+
+    Args:
+        source_image_path: Path to the reference face image
+        identify: Identification function taking (base_image_path, image_to_search_path);
+            defaults to ``identify_face``
+        identify_kwargs: Extra keyword arguments passed to the identification function
+    """
+    if identify is None:
+        from .face_identifier import identify_face as identify
+
+    def identify_crop(crop: np.ndarray) -> Dict[str, Any]:
+        if crop is None or crop.size == 0:
+            # A box lying entirely outside the frame leaves nothing to encode
+            return {"success": False, "error": "Empty face crop", "is_match": False}
+        fd, crop_path = tempfile.mkstemp(suffix=".jpg", prefix="track_")
+        os.close(fd)
+        try:
+            cv2.imwrite(crop_path, crop)
+            return identify(source_image_path, crop_path, **identify_kwargs)
+        finally:
+            os.remove(crop_path)
+
+    return identify_crop
@@ -1,36 +1,54 @@
-from typing import Any, Dict
+import os
+from typing import Any, Dict, Union
 from google.adk.tools import ToolContext
-from google.genai import types
 from fastmcp.utilities.types import Image
 from mcp.types import ImageContent
-from .utils import load_image_bytes, get_filename
+from .artifacts import save_file_artifact, save_preview_artifact
+from .utils import load_image_pil, get_filename
 
-async def fetch_image(imagePath: str, tool_context: ToolContext) -> Dict[str, Any]:
+async def fetch_image(imagePath: str, tool_context: ToolContext, full_resolution: bool = False) -> Dict[str, Any]:
     """
-    Generates an image from a text description and returns an artifact.
+    Stores an image as an artifact so it can be shown to the user.
+
+    By default a 640 px JPEG preview is stored; identical content that was
+    already stored in this session is not uploaded again.
+
+    Args:
+        imagePath: Path to the image file
+        tool_context: The ADK tool context used to save the artifact
+        full_resolution: Store the original file instead of the preview
     """
     print(f"Tool called to fetch image with prompt: '{imagePath}'")
+    if not os.path.exists(imagePath):
+        return {
+            'status': 'failed',
+            'detail': f'Image not found: {imagePath}',
+            'filename': imagePath,
+        }
 
-    # load bytes from the desired path
-    image_bytes = load_image_bytes(imagePath)
-    
-    file_name = get_filename(imagePath)
-    
-    await tool_context.save_artifact(
-      file_name,
-      types.Part.from_bytes(data=image_bytes, mime_type='image/png'),
-    )
+    if full_resolution:
+        artifact = await save_file_artifact(tool_context, imagePath, file_name=get_filename(imagePath))
+    else:
+        artifact = await save_preview_artifact(tool_context, imagePath)
     return {
         'status': 'success',
         'detail': 'Image generated successfully and stored in artifacts.',
         'filename': imagePath,
+        'artifact': artifact['filename'],
+        'deduplicated': artifact['deduplicated'],
     }
     
-def show_image(image_path) -> ImageContent:
+def show_image(image_path) -> Union[ImageContent, Dict[str, Any]]:
     """
     Generates an image.
     """
-    image = Image.open(image_path)
+    image = load_image_pil(image_path)
+    if image is None:
+        return {
+            'status': 'failed',
+            'detail': f'Could not load image: {image_path}',
+            'filename': image_path,
+        }
     return _encode_image(image)
 
 def _encode_image(image) -> ImageContent:
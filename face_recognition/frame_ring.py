@@ -0,0 +1,197 @@
+"""Shared-memory frame ring buffer so several local processes can share one camera."""
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple, Union
+import numpy as np
+
+# Capture sources of the form "shm://<name>" read from a ring instead of a device.
+RING_SCHEME = "shm://"
+
+_MAGIC = 0x46524E47  # "FRNG"
+# Header layout (int64): magic, slots, height, width, channels, latest_seq, heartbeat (wall-clock ns
+# of the last write), then one seq per slot.
+_HEADER_FIELDS = 7
+_LATEST = 5
+_HEARTBEAT = 6
+_WRITING = -1
+
+
+def ring_name_from_source(source: Union[int, str]) -> Optional[str]:
+    """Return the ring name for an ``shm://<name>`` source, or None for other sources."""
+    if isinstance(source, str) and source.startswith(RING_SCHEME):
+        return source[len(RING_SCHEME):]
+    return None
+
+
+def _header_bytes(slots: int) -> int:
+    return (_HEADER_FIELDS + slots) * np.dtype(np.int64).itemsize
+
+
+class _FrameRing:
+    """Numpy views over a ring buffer's shared-memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, shape: Tuple[int, int, int]):
+        self.shm = shm
+        self.slots = slots
+        self.shape = shape
+        self.header = np.ndarray((_HEADER_FIELDS + slots,), dtype=np.int64, buffer=shm.buf)
+        self.slot_seqs = self.header[_HEADER_FIELDS:]
+        self.frames = np.ndarray((slots, *shape), dtype=np.uint8, buffer=shm.buf, offset=_header_bytes(slots))
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest complete frame (0 before the first write)."""
+        return int(self.header[_LATEST])
+
+    @property
+    def age(self) -> float:
+        """Seconds since the producer last wrote to (or created) the ring."""
+        return (time.time_ns() - int(self.header[_HEARTBEAT])) / 1e9
+
+    def close(self) -> None:
+        # Views must be released before the mapping can be closed
+        self.header = self.slot_seqs = self.frames = None
+        self.shm.close()
+
+
+class FrameRingProducer(_FrameRing):
+    """
+    Single writer that publishes frames into a named shared-memory ring.
+
+    Frame ``n`` (numbered from 1) is written to slot ``n % slots``. While a slot
+    is being overwritten its sequence number is set to -1, so readers can tell
+    a torn frame from a complete one.
+    """
+
+    def __init__(self, name: str, shape: Tuple[int, int, int], slots: int = 8):
+        size = _header_bytes(slots) + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        super().__init__(shm, slots, tuple(shape))
+        self.header[:_HEADER_FIELDS] = [_MAGIC, slots, *shape, 0, time.time_ns()]
+        self.slot_seqs[:] = 0
+        self.name = name
+
+    def write(self, frame: np.ndarray) -> int:
+        """Publish a frame and return its sequence number."""
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match ring shape {self.shape}")
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self.slot_seqs[slot] = _WRITING
+        self.frames[slot] = frame
+        self.slot_seqs[slot] = seq
+        self.header[_LATEST] = seq
+        self.header[_HEARTBEAT] = time.time_ns()
+        return seq
+
+    def unlink(self) -> None:
+        """Close and remove the shared-memory block."""
+        shm = self.shm
+        self.close()
+        shm.unlink()
+
+
+class FrameRingConsumer(_FrameRing):
+    """
+    Reader attached to an existing ring. Any number of consumers can attach.
+
+    ``latest()`` and ``get()`` return zero-copy views into shared memory; a
+    view stays valid until the producer wraps around to its slot, which
+    ``is_valid(seq)`` checks. ``read()`` returns a verified copy and follows
+    the ``cv2.VideoCapture.read`` convention so a consumer can be used as a
+    capture source.
+
+    A consumer stays mapped to the block it attached to. If the producer
+    restarts, it creates a new block under the same name, and the old one
+    stops advancing. ``age`` exposes that, so callers can re-attach.
+    """
+
+    def __init__(self, name: str):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 registers attached segments with the resource tracker,
+            # which would unlink the producer's block when this process exits.
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if header[0] != _MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory block {name} is not a frame ring")
+        slots, height, width, channels = (int(v) for v in header[1:5])
+        del header
+        super().__init__(shm, slots, (height, width, channels))
+        self.name = name
+
+    def is_valid(self, seq: int) -> bool:
+        """Whether frame ``seq`` is still intact in its slot."""
+        return seq > 0 and int(self.slot_seqs[seq % self.slots]) == seq
+
+    def get(self, seq: int) -> Optional[np.ndarray]:
+        """Zero-copy view of frame ``seq``, or None if it was overwritten or not written yet."""
+        if not self.is_valid(seq):
+            return None
+        return self.frames[seq % self.slots]
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Sequence number and zero-copy view of the newest frame."""
+        seq = self.latest_seq
+        return seq, self.get(seq)
+
+    def wait_for_frame(self, after_seq: int, timeout: float = 5.0, poll_interval: float = 0.002
+                       ) -> Tuple[int, Optional[np.ndarray]]:
+        """Poll until a frame newer than ``after_seq`` is published; returns (seq, copy)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            seq = self.latest_seq
+            if seq > after_seq:
+                frame = self.get(seq)
+                if frame is not None:
+                    frame = frame.copy()
+                    if self.is_valid(seq):
+                        return seq, frame
+            time.sleep(poll_interval)
+        return self.latest_seq, None
+
+    def read(self, timeout: float = 5.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return a verified copy of the newest frame, waiting for the first one if needed."""
+        _, frame = self.wait_for_frame(max(self.latest_seq - 1, 0), timeout=timeout)
+        return frame is not None, frame
+
+
+def run_producer(source: Union[int, str], name: str, slots: int = 8) -> None:
+    """Publish frames from a camera or video file into a ring until interrupted."""
+    from .camera import CameraSession
+
+    session = CameraSession(source)
+    if not session.start():
+        raise IOError(f"Could not open capture source {source}")
+    seq, frame = session.wait_for_frame(0)
+    if frame is None:
+        raise IOError(f"No frames received from {source}")
+
+    producer = FrameRingProducer(name, frame.shape, slots=slots)
+    print(f"Publishing {source} into {RING_SCHEME}{name} ({frame.shape[1]}x{frame.shape[0]}, {slots} slots)")
+    try:
+        while frame is not None:
+            producer.write(frame)
+            seq, frame = session.wait_for_frame(seq)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        session.stop()
+        producer.unlink()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Share one camera with several local consumers.")
+    parser.add_argument("--source", default="0", help="Camera index or video file path.")
+    parser.add_argument("--name", default="facecam", help="Shared-memory ring name.")
+    parser.add_argument("--slots", type=int, default=8, help="Number of frames kept in the ring.")
+    args = parser.parse_args()
+    run_producer(args.source, args.name, args.slots)
+
+
+if __name__ == "__main__":
+    main()
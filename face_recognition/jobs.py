@@ -0,0 +1,184 @@
+"""Background jobs for long-running work, tracked by id with progress, partial results and cancellation."""
+import contextvars
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Job states; the last three are final
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work when the job has been cancelled."""
+
+
+class Job:
+    """
+    State of one job, shared between its worker thread and status readers.
+
+    The work function receives the job and reports through ``report``,
+    which also raises ``JobCancelled`` once cancellation was requested, so
+    work stops at its next progress report.
+    """
+
+    def __init__(self, kind: str, idempotency_key: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.idempotency_key = idempotency_key
+        self.status = QUEUED
+        self.done = 0
+        self.total: Optional[int] = None
+        self.partial_results: List[Any] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, done: int, total: Optional[int] = None, partial: Optional[List[Any]] = None) -> None:
+        """Record progress and any new partial results; raises ``JobCancelled`` if the job was cancelled."""
+        with self._lock:
+            self.done = done
+            if total is not None:
+                self.total = total
+            if partial:
+                self.partial_results.extend(partial)
+        if self._cancel.is_set():
+            raise JobCancelled(self.job_id)
+
+    def snapshot(self, include_partial: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                "success": True,
+                "job_id": self.job_id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": {"done": self.done, "total": self.total},
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if include_partial:
+                snapshot["partial_results"] = list(self.partial_results)
+            return snapshot
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool and keeps their results for ``ttl_seconds``.
+
+    At most ``max_queued`` jobs may wait for a worker; finished jobs are
+    removed once they are older than the TTL, checked whenever jobs are
+    submitted or looked up.
+    """
+
+    def __init__(self, workers: int = 2, ttl_seconds: float = 3600, max_queued: int = 100):
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.max_queued = max_queued
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, work: Callable[[Job], Any], idempotency_key: Optional[str] = None) -> Job:
+        """
+        Start ``work(job)`` in the background and return the job.
+
+        A submission with the ``idempotency_key`` of a job that has not
+        expired returns that job instead, so a client retrying after a
+        timeout does not start the work twice.
+
+        Raises:
+            RuntimeError: If ``max_queued`` jobs are already waiting for a worker
+        """
+        self._expire()
+        with self._lock:
+            if idempotency_key is not None:
+                for job in self._jobs.values():
+                    if job.idempotency_key == idempotency_key:
+                        return job
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise RuntimeError(f"Too many queued jobs ({queued}); retry later")
+            job = Job(kind, idempotency_key)
+            self._jobs[job.job_id] = job
+        # The work runs in the submitter's context, so its spans join the submitting call's trace
+        job.future = self._pool.submit(contextvars.copy_context().run, self._run, job, work)
+        return job
+
+    def _run(self, job: Job, work: Callable[[Job], Any]) -> None:
+        with job._lock:
+            if job.cancel_requested:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = work(job)
+            status, error = SUCCEEDED, None
+        except JobCancelled:
+            result, status, error = None, CANCELLED, None
+        except Exception as e:
+            print(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            result, status, error = None, FAILED, str(e)
+        with job._lock:
+            job.result, job.status, job.error = result, status, error
+            if job.total is not None and status == SUCCEEDED:
+                job.done = job.total
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation: a queued job never starts, a running job stops at its next progress report.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job._lock:
+            if job.status in FINAL_STATES:
+                return job
+            job._cancel.set()
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+                if job.future is not None:
+                    job.future.cancel()
+        return job
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "ttl_seconds": self.ttl_seconds, "jobs": counts}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,27 @@
+"""Deferred imports, so heavy frameworks load only when first used."""
+import importlib
+import sys
+import types
+from typing import Any, List
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module and imports it on first attribute access.
+
+    ``import_module`` holds the import lock, so concurrent first uses from
+    worker threads import the module exactly once. Attributes set on the
+    stand-in (e.g. by ``unittest.mock.patch``) take precedence over the
+    module's own.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(importlib.import_module(self.__name__), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """The module ``name`` if it is already imported, otherwise a ``LazyModule`` for it."""
+    return sys.modules.get(name) or LazyModule(name)
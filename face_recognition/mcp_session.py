@@ -0,0 +1,166 @@
+"""Long-lived, reconnecting MCP client session shared by the agent's tool wrappers."""
+import asyncio
+import contextlib
+from typing import Any, Callable, Dict, Iterable, Optional
+from fastmcp import Client
+from fastmcp.exceptions import FastMCPError
+from mcp.shared.exceptions import MCPError
+from mcp.types import CONNECTION_CLOSED
+
+# Errors the server reported over a working session; anything else means the connection is broken
+SERVER_ERRORS = (FastMCPError, MCPError)
+
+
+def _connection_lost(error: BaseException) -> bool:
+    """Whether a failed call means the connection broke rather than the server rejecting the call."""
+    if isinstance(error, MCPError):
+        # The transport fails pending requests with CONNECTION_CLOSED when the connection goes away
+        return error.code == CONNECTION_CLOSED
+    return not isinstance(error, SERVER_ERRORS)
+
+
+class PersistentSession:
+    """
+    One MCP session opened on first use and kept open between tool calls.
+
+    The MCP handshake and the HTTP connection are reused by every call
+    instead of being repeated per call. A background task pings the server
+    every ``keepalive_seconds`` to keep the connection warm and to notice a
+    dead one early. The session is re-established on the next call after a
+    failed ping, or after a call fails because of the connection. Errors
+    reported by the server itself never cause a reconnect.
+
+    A call that fails because of the connection is retried once only for
+    tools in ``idempotent_tools``. Once a request has been sent, the client
+    cannot tell whether the server already ran it, so repeating any other
+    tool could run it twice. Failures while connecting happen before
+    anything is sent, so opening the session is always retried once.
+    """
+
+    def __init__(self, url: str, keepalive_seconds: float = 30.0,
+                 client_factory: Callable[[str], Client] = Client, idempotent_tools: Iterable[str] = ()):
+        self.url = url
+        self.keepalive_seconds = keepalive_seconds
+        self.client_factory = client_factory
+        self.idempotent_tools = frozenset(idempotent_tools)
+        self._client: Optional[Client] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._keepalive: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.connects = 0
+        self.reconnects = 0
+        self.calls = 0
+        self.retries = 0
+
+    def _current_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A session belongs to the event loop that opened it; a new loop starts afresh
+            self._loop, self._lock, self._client, self._keepalive = loop, asyncio.Lock(), None, None
+        return self._lock
+
+    async def client(self) -> Client:
+        """The connected client, connecting first if needed (retried once, as nothing was sent yet)."""
+        async with self._current_lock():
+            if self._client is None or not self._client.is_connected():
+                try:
+                    await self._open()
+                except Exception as e:
+                    print(f"Connecting to {self.url} failed ({e}); retrying")
+                    await self._open()
+            return self._client
+
+    async def _open(self) -> None:
+        if self._client is not None:
+            self.reconnects += 1
+            await self._close_client()
+        client = self.client_factory(self.url)
+        try:
+            await client.__aenter__()
+        except BaseException:
+            with contextlib.suppress(Exception):
+                await client.close()
+            raise
+        self._client = client
+        self.connects += 1
+        if self.keepalive_seconds > 0 and (self._keepalive is None or self._keepalive.done()):
+            self._keepalive = asyncio.create_task(self._keep_alive())
+
+    async def _close_client(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            with contextlib.suppress(Exception):
+                await client.close()
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """
+        Call a tool over the shared session.
+
+        If the call fails because of the connection, the session is dropped
+        so the next call reconnects. Tools in ``idempotent_tools`` are then
+        retried once on a fresh session; for any other tool the error is
+        raised, since the server may already have run the call.
+        Server-reported errors (e.g. ``ToolError``) are raised as they are.
+        """
+        self.calls += 1
+        client = await self.client()
+        try:
+            return await client.call_tool(name, arguments)
+        except Exception as e:
+            if not _connection_lost(e):
+                raise
+            print(f"MCP session to {self.url} failed ({e}); reconnecting")
+            await self._invalidate(client)
+            if name not in self.idempotent_tools:
+                raise
+            self.retries += 1
+        return await (await self.client()).call_tool(name, arguments)
+
+    async def _invalidate(self, client: Client) -> None:
+        async with self._current_lock():
+            if self._client is client:
+                await self._close_client()
+                self.reconnects += 1
+
+    async def _ping(self, client: Client) -> bool:
+        try:
+            return await client.ping()
+        except Exception as e:
+            if not _connection_lost(e):
+                # The server answered, even if only to say it does not implement ping
+                return True
+            print(f"MCP ping to {self.url} failed: {e}")
+            return False
+
+    async def healthy(self) -> bool:
+        """Ping the server over the shared session (connecting if needed)."""
+        try:
+            client = await self.client()
+        except Exception:
+            return False
+        return await self._ping(client)
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_seconds)
+            client = self._client
+            if client is not None and not await self._ping(client):
+                await self._invalidate(client)
+
+    async def close(self) -> None:
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            with contextlib.suppress(BaseException):
+                await self._keepalive
+            self._keepalive = None
+        await self._close_client()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "connected": self._client is not None and self._client.is_connected(),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "calls": self.calls,
+            "retries": self.retries,
+        }
@@ -0,0 +1,300 @@
+"""Lightweight in-process metrics (histograms, counters, gauges) rendered in Prometheus text format."""
+import bisect
+import contextlib
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from . import tracing
+
+# Latency buckets in seconds, from sub-millisecond cache hits to multi-second model calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Payload size buckets in bytes, 256 B to 64 MB
+BYTE_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+# Batch size buckets in items, 1 to 64
+BATCH_SIZE_BUCKETS = tuple(2 ** i for i in range(7))
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                                for key, value in items]
+
+    def drain(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, such as calls in flight."""
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    render = Counter.render
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets, plus their count and sum."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the last one for +Inf, then the sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = self.header()
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+        return lines
+
+    def drain(self) -> Dict[LabelValues, List[float]]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, List[float]]) -> None:
+        with self._lock:
+            for key, other in values.items():
+                state = self._values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+                for i, value in enumerate(other):
+                    state[i] += value
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, Any]:
+        """Take and reset the counters and histograms recorded so far, e.g. in a worker process."""
+        return {name: metric.drain() for name, metric in self.metrics.items() if hasattr(metric, "drain")}
+
+    def merge(self, drained: Dict[str, Any]) -> None:
+        """Add metrics drained from another process."""
+        for name, values in drained.items():
+            if name in self.metrics:
+                self.metrics[name].merge(values)
+
+
+REGISTRY = Registry()
+
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency in seconds.", ["tool"]))
+TOOL_CALLS = REGISTRY.register(Counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome (ok, error or overloaded).", ["tool", "status"]))
+TOOL_IN_FLIGHT = REGISTRY.register(Gauge(
+    "mcp_tool_in_flight", "MCP tool calls currently running.", ["tool"]))
+TOOL_QUEUED = REGISTRY.register(Gauge(
+    "mcp_tool_queued", "MCP tool calls waiting for an admission slot.", ["tool"]))
+PAYLOAD_BYTES = REGISTRY.register(Histogram(
+    "mcp_tool_payload_bytes", "Approximate size of tool arguments (request) and results (response).",
+    ["tool", "direction"], buckets=BYTE_BUCKETS))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "face_stage_duration_seconds", "Latency of pipeline stages (decode, detect, crop, encode, identify).",
+    ["stage"]))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    "request_batch_size", "Items per dispatched micro-batch.", ["batcher"], buckets=BATCH_SIZE_BUCKETS))
+BATCH_WAIT = REGISTRY.register(Histogram(
+    "request_batch_wait_seconds", "Time a request waited in a batcher queue before its batch was dispatched.",
+    ["batcher"]))
+
+
+def time_stage(stage: str) -> contextlib.AbstractContextManager:
+    """Context manager timing one pipeline stage."""
+    return STAGE_LATENCY.time(stage=stage)
+
+
+def _payload_size(value: Any) -> int:
+    """Cheap size estimate: string and byte lengths, recursing through containers, without serializing."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(item) for item in value)
+    return 8
+
+
+def _outcome(result: Any) -> str:
+    if isinstance(result, dict):
+        if result.get("overloaded"):
+            return "overloaded"
+        if result.get("success") is False:
+            return "error"
+    return "ok"
+
+
+def instrument_tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Record latency, outcome, in-flight count and payload sizes of a tool function,
+    and run it inside a ``tool <name>`` span carrying the same figures.
+
+    Apply below ``@mcp.tool()``; the wrapper keeps the function's name and
+    signature so the tool schema is unchanged.
+    """
+    tool = fn.__name__
+    signature = inspect.signature(fn)
+
+    def record(args: Tuple[Any, ...], kwargs: Dict[str, Any], started: float, result: Any, status: Optional[str],
+               current: Any) -> None:
+        TOOL_LATENCY.observe(time.perf_counter() - started, tool=tool)
+        outcome = status or _outcome(result)
+        TOOL_CALLS.inc(tool=tool, status=outcome)
+        arguments = signature.bind_partial(*args, **kwargs).arguments if args else kwargs
+        request_bytes = _payload_size(arguments)
+        PAYLOAD_BYTES.observe(request_bytes, tool=tool, direction="request")
+        response_bytes = None
+        if status is None:
+            response_bytes = _payload_size(result)
+            PAYLOAD_BYTES.observe(response_bytes, tool=tool, direction="response")
+        tracing.set_attributes(current, **{"mcp.tool.status": outcome, "mcp.request.bytes": request_bytes,
+                                           "mcp.response.bytes": response_bytes})
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            TOOL_IN_FLIGHT.inc(tool=tool)
+            started = time.perf_counter()
+            result, status = None, "error"
+            with tracing.span(f"tool {tool}", **{"mcp.tool.name": tool}) as current:
+                try:
+                    result = await fn(*args, **kwargs)
+                    status = None
+                    return result
+                finally:
+                    TOOL_IN_FLIGHT.dec(tool=tool)
+                    record(args, kwargs, started, result, status, current)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        TOOL_IN_FLIGHT.inc(tool=tool)
+        started = time.perf_counter()
+        result, status = None, "error"
+        with tracing.span(f"tool {tool}", **{"mcp.tool.name": tool}) as current:
+            try:
+                result = fn(*args, **kwargs)
+                status = None
+                return result
+            finally:
+                TOOL_IN_FLIGHT.dec(tool=tool)
+                record(args, kwargs, started, result, status, current)
+
+    return wrapper
+
+
+def call_collecting_metrics(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``fn`` (in a worker process) and return its result with the metrics it recorded."""
+    REGISTRY.drain()
+    result = fn(*args, **kwargs)
+    return result, REGISTRY.drain()
@@ -0,0 +1,118 @@
+"""Motion and scene-change gating in front of face detection."""
+from typing import Any, Callable, Dict, Optional
+import cv2
+import numpy as np
+
+# Mean absolute grayscale difference (0-255) above which a frame counts as changed.
+DEFAULT_MOTION_THRESHOLD = 4.0
+
+# Width frames are downsampled to before scoring; height keeps the aspect ratio.
+DEFAULT_DOWNSAMPLE_WIDTH = 64
+
+
+class MotionGate:
+    """
+    Decide whether a frame differs enough from the last detected frame to re-run detection.
+
+    Frames are converted to grayscale, downsampled and blurred, then compared
+    with the last frame that was let through. Comparing against that
+    reference (rather than the previous frame) means slow drift still adds up
+    and eventually triggers a refresh.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_MOTION_THRESHOLD,
+        downsample_width: int = DEFAULT_DOWNSAMPLE_WIDTH,
+        max_skip_frames: Optional[int] = 300,
+    ):
+        """
+        Args:
+            threshold: Minimum change score for a frame to reach the detector
+            downsample_width: Width frames are reduced to before comparison
+            max_skip_frames: Force a refresh after this many consecutive skipped frames (None to disable)
+        """
+        self.threshold = threshold
+        self.downsample_width = downsample_width
+        self.max_skip_frames = max_skip_frames
+        self._reference: Optional[np.ndarray] = None
+        self._consecutive_skips = 0
+        self.frames = 0
+        self.skipped = 0
+        self.last_score = 0.0
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Reduce a frame to a small blurred grayscale thumbnail."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        height = max(1, round(gray.shape[0] * self.downsample_width / gray.shape[1]))
+        small = cv2.resize(gray, (self.downsample_width, height), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0).astype(np.int16)
+
+    def _score_thumbnail(self, thumbnail: np.ndarray) -> float:
+        """Mean absolute difference between a thumbnail and the reference."""
+        if self._reference is None or thumbnail.shape != self._reference.shape:
+            return float("inf")
+        return float(np.mean(np.abs(thumbnail - self._reference)))
+
+    def score(self, frame: np.ndarray) -> float:
+        """Return the change score of a frame against the current reference."""
+        return self._score_thumbnail(self._prepare(frame))
+
+    def should_process(self, frame: np.ndarray) -> bool:
+        """Return True if the frame should be sent to the detector, updating the reference when it is."""
+        self.frames += 1
+        thumbnail = self._prepare(frame)
+        score = self._score_thumbnail(thumbnail)
+        self.last_score = score
+
+        stale = self.max_skip_frames is not None and self._consecutive_skips >= self.max_skip_frames
+        if score >= self.threshold or stale:
+            self._reference = thumbnail
+            self._consecutive_skips = 0
+            return True
+
+        self.skipped += 1
+        self._consecutive_skips += 1
+        return False
+
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of frames that did not reach the detector."""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return gating counters for tuning the threshold."""
+        return {
+            "threshold": self.threshold,
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": self.skip_rate,
+            "last_score": self.last_score if self.last_score != float("inf") else None,
+        }
+
+    def reset(self) -> None:
+        """Forget the reference frame so the next frame is always processed."""
+        self._reference = None
+        self._consecutive_skips = 0
+
+
+class GatedDetector:
+    """Wrap a frame detector so unchanged frames reuse the previous detections."""
+
+    def __init__(self, detector: Callable[[np.ndarray], Dict[str, Any]], gate: Optional[MotionGate] = None):
+        self.detector = detector
+        self.gate = gate or MotionGate()
+        self._last_result: Optional[Dict[str, Any]] = None
+
+    def __call__(self, frame: np.ndarray) -> Dict[str, Any]:
+        if self._last_result is not None and not self.gate.should_process(frame):
+            return {**self._last_result, "reused": True, "motion_score": self.gate.last_score}
+
+        if self._last_result is None:
+            # Seed the gate's reference with the first frame
+            self.gate.should_process(frame)
+        result = self.detector(frame)
+        if result.get("success"):
+            self._last_result = result
+        score = self.gate.last_score
+        return {**result, "reused": False, "motion_score": score if score != float("inf") else None}
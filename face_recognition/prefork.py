@@ -0,0 +1,211 @@
+"""Pre-forking server: import frameworks once in a parent process, then fork workers that share them copy-on-write."""
+import gc
+import importlib
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def process_memory(pid: Any = "self") -> Dict[str, float]:
+    """
+    Memory of a process in MB, from ``/proc/<pid>/smaps_rollup`` (Linux only).
+
+    ``rss`` counts every resident page, including pages shared with the
+    parent and the other workers; ``private`` counts only the pages this
+    process has written or allocated itself, i.e. what it costs on top of
+    the shared preload; ``pss`` splits shared pages evenly between sharers.
+
+    Returns:
+        {"rss_mb": ..., "pss_mb": ..., "private_mb": ..., "shared_mb": ...}, or {} where unavailable
+    """
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                name, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    fields[name] = int(rest.split()[0])
+    except OSError:
+        return {}
+    return {
+        "rss_mb": fields.get("Rss", 0) / 1024,
+        "pss_mb": fields.get("Pss", 0) / 1024,
+        "private_mb": (fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024,
+        "shared_mb": (fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024,
+    }
+
+
+def preload_models(load_weights: bool = True) -> float:
+    """
+    Import the detection and identification frameworks and load the RetinaFace weights.
+
+    TensorFlow is only imported when the weights are loaded, so a prefork
+    parent calls this with ``load_weights=False`` and leaves the model to
+    ``build_model`` in each worker.
+
+    Args:
+        load_weights: Also build the RetinaFace model (downloads the weights if they are missing)
+
+    Returns:
+        Seconds spent
+    """
+    started = time.perf_counter()
+    from . import face_identifier  # noqa: F401
+    importlib.import_module("google.generativeai")
+    if load_weights:
+        build_model()
+    return time.perf_counter() - started
+
+
+def build_model() -> float:
+    """
+    Import TensorFlow and build the RetinaFace model in this process.
+
+    Returns:
+        Seconds spent
+    """
+    started = time.perf_counter()
+    from .face_detector import load_model
+    try:
+        load_model()
+    except Exception as e:
+        # The first detection loads the weights instead
+        print(f"Could not preload the RetinaFace weights: {e}")
+    return time.perf_counter() - started
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """A listening TCP socket to hand to every worker, so the kernel spreads connections between them."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Runs ``serve(sock)`` in ``workers`` forked processes that share one listening socket.
+
+    The parent binds the socket and runs ``preload`` once, then freezes the
+    garbage collector so the preloaded objects are never touched again and
+    their pages stay shared copy-on-write with every worker. Each worker
+    runs ``post_fork`` before serving. Workers that exit unexpectedly are
+    replaced; SIGTERM or SIGINT stops them all.
+
+    ``preload`` must not start threads, since only the forking thread
+    survives in a child. TensorFlow's thread pools do not survive a fork,
+    so the parent preloads pure-Python and NumPy state only and the model
+    is built in ``post_fork``.
+    """
+
+    def __init__(self, serve: Callable[[socket.socket], None], host: str, port: int, workers: int,
+                 preload: Optional[Callable[[], Any]] = None, report_after: float = 10.0,
+                 post_fork: Optional[Callable[[], Any]] = None):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.serve = serve
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.post_fork = post_fork
+        self.report_after = report_after
+        self.sock: Optional[socket.socket] = None
+        self.pids: Dict[int, int] = {}  # pid -> worker slot
+        self.restarts = 0
+        self._stopping = False
+
+    def start(self) -> None:
+        """Bind, preload and fork the workers."""
+        self.sock = bind_socket(self.host, self.port)
+        if self.preload is not None:
+            self.preload()
+        print(f"Preloaded parent {os.getpid()}: {_format_memory(process_memory())}")
+        # Move everything allocated so far out of the collector's reach, so collections in the
+        # workers do not write to (and thereby copy) the shared pages
+        gc.collect()
+        gc.freeze()
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                if self.post_fork is not None:
+                    self.post_fork()
+                self.serve(self.sock)
+            except BaseException as e:
+                print(f"Worker {os.getpid()} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.pids[pid] = slot
+        print(f"Started worker {slot} (pid {pid}) on {self.host}:{self.port}")
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Memory of the parent and each worker; a worker's ``private_mb`` is its cost beyond the shared preload."""
+        workers = {pid: process_memory(pid) for pid in sorted(self.pids)}
+        private = [memory["private_mb"] for memory in workers.values() if memory]
+        return {
+            "parent": process_memory(),
+            "workers": workers,
+            "total_private_mb": sum(private),
+            "mean_worker_private_mb": sum(private) / len(private) if private else 0.0,
+        }
+
+    def print_memory_report(self) -> None:
+        report = self.memory_report()
+        print(f"Parent {os.getpid()}: {_format_memory(report['parent'])}")
+        for pid, memory in report["workers"].items():
+            print(f"Worker {self.pids[pid]} (pid {pid}): {_format_memory(memory)}")
+        print(f"Mean incremental RSS per worker: {report['mean_worker_private_mb']:.0f} MB")
+
+    def stop(self) -> None:
+        """Ask every worker to shut down; ``run`` returns once they have exited."""
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        self.stop()
+
+    def run(self) -> None:
+        """Start the workers and supervise them until a stop signal and every worker has exited."""
+        self.start()
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        report_at = time.monotonic() + self.report_after
+        while self.pids:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if report_at is not None and time.monotonic() >= report_at:
+                    self.print_memory_report()
+                    report_at = None
+                time.sleep(0.2)
+                continue
+            slot = self.pids.pop(pid, None)
+            if slot is None or self._stopping:
+                continue
+            print(f"Worker {slot} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            self.restarts += 1
+            self._spawn(slot)
+        self.sock.close()
+
+
+def _format_memory(memory: Dict[str, float]) -> str:
+    if not memory:
+        return "memory unavailable"
+    return (f"RSS {memory['rss_mb']:.0f} MB (private {memory['private_mb']:.0f} MB, "
+            f"shared {memory['shared_mb']:.0f} MB, PSS {memory['pss_mb']:.0f} MB)")
@@ -0,0 +1,99 @@
+"""Dynamic micro-batching of concurrent requests into single batched calls."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from .metrics import BATCH_SIZE, BATCH_WAIT
+
+
+class RequestBatcher:
+    """
+    Collect concurrent requests and run them as one batch.
+
+    A batch is dispatched once it holds ``max_batch_size`` items or
+    ``max_wait_ms`` after its first item arrived, whichever comes first.
+    ``run_batch`` receives the list of items and must return one result per
+    item in the same order; if it raises, every caller in the batch gets the
+    exception. Dispatched batches run concurrently, so a slow batch never
+    holds up the one being collected behind it.
+
+    Batch sizes and the time each item waited for its batch are recorded in
+    ``stats`` and in the ``request_batch_size`` and
+    ``request_batch_wait_seconds`` histograms, labelled with ``name``.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], Awaitable[List[Any]]], max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, name: str = "batch"):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._wait_seconds = 0.0
+        self._longest_wait = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._batches += 1
+        self._items += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        BATCH_SIZE.observe(len(batch), batcher=self.name)
+        now = asyncio.get_running_loop().time()
+        for _, _, queued_at in batch:
+            waited = now - queued_at
+            self._wait_seconds += waited
+            self._longest_wait = max(self._longest_wait, waited)
+            BATCH_WAIT.observe(waited, batcher=self.name)
+        task = asyncio.ensure_future(self._run([(item, future) for item, future, _ in batch]))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch of {len(batch)} items returned {len(results)} results")
+        except Exception as e:
+            for _, future in batch:
+                # Callers that gave up (cancelled) no longer want a result
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "mean_wait_ms": 1000 * self._wait_seconds / self._items if self._items else 0.0,
+            "longest_wait_ms": 1000 * self._longest_wait,
+            "pending": len(self._pending),
+            "running": len(self._running),
+        }
@@ -0,0 +1,52 @@
+"""Fast JSON serialization of tool results that may contain numpy values."""
+import json
+from typing import Any
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values the encoder does not handle natively."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return getattr(obj, "__dict__", str(obj))
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON; numpy arrays and scalars are encoded natively."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON; numpy arrays and scalars are encoded natively."""
+        return json.dumps(obj, default=_default, ensure_ascii=False).encode("utf-8")
+
+    loads = json.loads
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string."""
+    return dumps(obj).decode("utf-8")
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    Convert a result into plain JSON types (dict, list, str, int, float, bool, None).
+
+    The result is round-tripped through the encoder, so numpy arrays and
+    scalars are converted in native code rather than by walking the structure
+    in Python.
+    """
+    return loads(dumps(obj))
@@ -0,0 +1,128 @@
+"""OpenTelemetry tracing for the agent, MCP server and face pipeline; spans are no-ops until configured."""
+import contextlib
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover - tracing is optional
+    trace = None
+
+TRACER_NAME = "face_recognition"
+
+# Supported exporters; see configure_tracing
+EXPORTERS = ("none", "console", "otlp", "phoenix", "memory")
+
+_provider: Any = None
+_settings: Optional[Dict[str, Any]] = None
+
+
+def _make_exporter(exporter: str, endpoint: Optional[str]) -> Any:
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if exporter == "memory":
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        return InMemorySpanExporter()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=endpoint) if endpoint else OTLPSpanExporter()
+    raise ValueError(f"Unknown trace exporter {exporter!r}; expected one of {EXPORTERS}")
+
+
+def configure_tracing(exporter: str = "none", endpoint: Optional[str] = None,
+                      service_name: str = "face-detection-agent") -> Any:
+    """
+    Install a tracer provider that exports spans, once per process.
+
+    Args:
+        exporter: "none" (spans are not recorded), "console", "otlp" (OTLP/HTTP to
+            ``endpoint``, e.g. a local collector), "phoenix" (arize-phoenix-otel's
+            ``register``, sending to ``endpoint``) or "memory" (kept in memory, for tests)
+        endpoint: Collector endpoint for "otlp" and "phoenix"
+        service_name: ``service.name`` resource attribute
+
+    Returns:
+        The span exporter (for "memory", read spans with ``get_finished_spans()``),
+        or None when nothing is exported
+    """
+    global _provider, _settings
+    if trace is None or exporter == "none":
+        return None
+    _settings = {"exporter": exporter, "endpoint": endpoint, "service_name": service_name}
+
+    try:
+        if exporter == "phoenix":
+            from phoenix.otel import register
+            _provider = register(project_name=service_name, endpoint=endpoint, batch=True)
+            return None
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        span_exporter = _make_exporter(exporter, endpoint)
+    except ImportError as e:
+        print(f"Tracing disabled: the {exporter!r} exporter needs a package that is not installed ({e})")
+        return None
+
+    if _provider is None:
+        # The global provider can only be set once; later calls add another exporter to it
+        _provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        trace.set_tracer_provider(_provider)
+    processor = SimpleSpanProcessor if exporter in ("console", "memory") else BatchSpanProcessor
+    _provider.add_span_processor(processor(span_exporter))
+    return span_exporter
+
+
+def worker_settings() -> Optional[Dict[str, Any]]:
+    """The settings passed to ``configure_tracing``, so worker processes can export the same way."""
+    return _settings
+
+
+def flush() -> None:
+    if _provider is not None and hasattr(_provider, "force_flush"):
+        _provider.force_flush()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Run a block inside a span; ``None`` attribute values are skipped.
+
+    Exceptions are recorded on the span and re-raised.
+    """
+    if trace is None:
+        yield None
+        return
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def set_attributes(current: Any, **attributes: Any) -> None:
+    """Set attributes on a span yielded by ``span``; ``None`` values are skipped."""
+    if current is None or not current.is_recording():
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def inject_context() -> Dict[str, str]:
+    """The current trace context as W3C ``traceparent``/``tracestate`` headers."""
+    carrier: Dict[str, str] = {}
+    if trace is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+@contextlib.contextmanager
+def attached_context(carrier: Optional[Dict[str, str]]) -> Iterator[None]:
+    """Make the trace context from ``inject_context`` (e.g. of another process) current."""
+    if trace is None or not carrier:
+        yield
+        return
+    token = otel_context.attach(propagate.extract(carrier))
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
@@ -1,12 +1,246 @@
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from PIL import Image
+from .metrics import time_stage
+
+# Upper bound on the total size of cached decoded images and file bytes.
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# OpenCV decode flags per downscale factor. For JPEG, the reduced modes scale
+# inside the DCT, so decoding at 1/2..1/8 is much faster and smaller than a
+# full decode followed by a resize.
+_REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class ImageCache:
+    """
+    Process-wide LRU of decoded images and raw file bytes.
+
+    Entries are keyed by absolute path and kind, and remember the file's
+    mtime and size so that a modified file is re-read. The cache is bounded
+    by the total number of bytes held rather than by entry count.
+    """
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, str], signature: Tuple[int, int]) -> Optional[Any]:
+        """Return a cached value if present and the file has not changed since it was cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple[str, str], signature: Tuple[int, int], value: Any, nbytes: int) -> None:
+        """Insert a value, evicting least recently used entries to stay within the byte budget."""
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            self._entries[key] = (signature, value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_image_cache = ImageCache()
+
+
+def _cache_key(image_path: str, kind: str) -> Tuple[Tuple[str, str], Tuple[int, int]]:
+    """Return the cache key and the (mtime, size) signature of a file. Raises OSError if missing."""
+    stat = os.stat(image_path)
+    return (os.path.abspath(image_path), kind), (stat.st_mtime_ns, stat.st_size)
+
+
+def load_image(image_path: str, reduce: int = 1) -> Optional[np.ndarray]:
+    """
+    Load a decoded BGR image, decoding each file at most once while it stays cached.
+
+    The returned array is shared between callers and therefore read-only;
+    call ``.copy()`` before drawing on it. Returns None if the file is
+    missing or cannot be decoded.
+
+    Args:
+        image_path: Path to the image file
+        reduce: Downscale factor applied during decoding (1, 2, 4 or 8)
+    """
+    if reduce not in _REDUCED_DECODE_FLAGS:
+        raise ValueError(f"reduce must be one of {sorted(_REDUCED_DECODE_FLAGS)}, got {reduce}")
+    try:
+        key, signature = _cache_key(image_path, f"decoded/{reduce}")
+    except OSError:
+        return None
+
+    image = _image_cache.get(key, signature)
+    if image is None:
+        with time_stage("decode"):
+            image = cv2.imread(image_path, _REDUCED_DECODE_FLAGS[reduce])
+        if image is None:
+            return None
+        image.flags.writeable = False
+        _image_cache.put(key, signature, image, image.nbytes)
+    return image
+
+
+def image_size(image_path: str) -> Optional[Tuple[int, int]]:
+    """Return (width, height) from the image header without decoding the pixels."""
+    try:
+        with Image.open(image_path) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+def reduction_for(image_path: str, min_side: int) -> int:
+    """
+    Pick the largest decode reduction that keeps the image's long side at least ``min_side`` pixels.
+
+    Returns 1 (full resolution) for small images or unreadable headers.
+    """
+    size = image_size(image_path)
+    if size is None:
+        return 1
+    long_side = max(size)
+    for factor in (8, 4, 2):
+        if long_side / factor >= min_side:
+            return factor
+    return 1
+
+
+def load_image_scaled(image_path: str, min_side: int) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Decode an image at the lowest resolution whose long side is still at least ``min_side``.
+
+    Returns:
+        The (read-only, cached) image and the reduction factor used; multiply
+        coordinates measured on the image by the factor to map them back to
+        full resolution
+    """
+    factor = reduction_for(image_path, min_side)
+    return load_image(image_path, reduce=factor), factor
+
+
+def load_image_region(image_path: str, bbox: Sequence[float]) -> Optional[np.ndarray]:
+    """
+    Return a full-resolution crop ``[x1, y1, x2, y2]`` of an image as a writable array.
+
+    The crop is taken from the cached full decode when it is hot. Otherwise
+    the file is decoded, only the region is kept and the full frame is
+    released immediately instead of being cached.
+    """
+    try:
+        key, signature = _cache_key(image_path, "decoded/1")
+    except OSError:
+        return None
+    image = _image_cache.get(key, signature)
+    if image is None:
+        with time_stage("decode"):
+            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+    height, width = image.shape[:2]
+    x1, y1, x2, y2 = [int(c) for c in bbox]
+    return image[max(0, y1):min(height, y2), max(0, x1):min(width, x2)].copy()
+
+
+def load_image_pil(image_path: str, max_side: Optional[int] = None) -> Optional[Image.Image]:
+    """
+    Load an image as an RGB PIL image, using a reduced decode when ``max_side`` allows it.
+
+    The result keeps a long side of at least ``max_side`` pixels (it is not
+    resized further), which is enough for previews and model uploads.
+    """
+    if max_side is None:
+        image = load_image(image_path)
+    else:
+        image, _ = load_image_scaled(image_path, max_side)
+    if image is None:
+        return None
+    return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+
+def cached_derivative(image_path: str, kind: str, build: Callable[[], Any]) -> Any:
+    """
+    Return a value derived from a file (a preview, a hash), building it once per file version.
+
+    ``build`` is called on a miss; its result is cached under ``kind`` and
+    invalidated together with the file's other entries when the file changes.
+    Raises OSError if the file does not exist.
+    """
+    key, signature = _cache_key(image_path, kind)
+    value = _image_cache.get(key, signature)
+    if value is None:
+        value = build()
+        nbytes = value.nbytes if isinstance(value, np.ndarray) else len(value)
+        _image_cache.put(key, signature, value, nbytes)
+    return value
+
+
+def image_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss/eviction counters and the current size of the image cache."""
+    return _image_cache.stats()
+
+
+def clear_image_cache() -> None:
+    """Drop every cached image and reset the counters."""
+    _image_cache.clear()
+
 
 def load_image_bytes(image_path: str) -> bytes:
     """
     Load image bytes from image_path. Returns a small placeholder PNG if loading fails.
     """
     try:
-        with open(image_path, 'rb') as f:
-            return f.read()
+        key, signature = _cache_key(image_path, "bytes")
+        data = _image_cache.get(key, signature)
+        if data is None:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            _image_cache.put(key, signature, data, len(data))
+        return data
     except FileNotFoundError:
         print(f"File {image_path} not found — using placeholder image.")
     except Exception as e:
@@ -23,4 +257,4 @@ def get_filename(image_path: str) -> str:
         if not image_path:
             return ""
         # Fallback: normalize separators and take last segment
-        return image_path.replace("\\", "/").split("/")[-1]
\ No newline at end of file
+        return image_path.replace("\\", "/").split("/")[-1]
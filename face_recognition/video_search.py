@@ -0,0 +1,223 @@
+"""Find every time interval in which a source face appears in a video file."""
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from .face_detector import detect_faces_in_frame
+from .face_tracker import FaceTracker, crop_identifier
+
+
+def _scan_segment(
+    video_path: str, start_frame: int, end_frame: int, stride: int,
+    detector: Callable[[np.ndarray], Dict[str, Any]]
+) -> Tuple[List[Tuple[int, List[Dict[str, Any]]]], int]:
+    """
+    Decode one contiguous segment of a video and detect faces on every ``stride``-th frame.
+
+    Returns:
+        A list of (frame_index, faces) pairs and the number of frames that were decoded
+    """
+    cap = cv2.VideoCapture(video_path)
+    detections = []
+    decoded = 0
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        for frame_index in range(start_frame, end_frame):
+            # Only keyframes are decoded; the frames in between are grabbed and discarded
+            if (frame_index - start_frame) % stride:
+                if not cap.grab():
+                    break
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            decoded += 1
+            result = detector(frame)
+            if result.get("success") and result.get("faces"):
+                detections.append((frame_index, result["faces"]))
+    finally:
+        cap.release()
+    return detections, decoded
+
+
+def _read_frame(video_path: str, frame_index: int) -> Optional[np.ndarray]:
+    """Decode a single frame by index."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        ret, frame = cap.read()
+        return frame if ret else None
+    finally:
+        cap.release()
+
+
+def _scan_segments(
+    pool: Executor, video_path: str, segments: List[Tuple[int, int]], stride: int,
+    detector: Callable[[np.ndarray], Dict[str, Any]]
+) -> List[Tuple[List[Tuple[int, List[Dict[str, Any]]]], int]]:
+    """Run ``_scan_segment`` for every segment on ``pool`` and return the results in order."""
+    futures = [pool.submit(_scan_segment, video_path, start, end, stride, detector) for start, end in segments]
+    return [future.result() for future in futures]
+
+
+def _merge_intervals(intervals: List[Dict[str, Any]], gap_seconds: float) -> List[Dict[str, Any]]:
+    """Merge intervals closer than ``gap_seconds``, keeping the most confident best frame."""
+    merged: List[Dict[str, Any]] = []
+    for interval in sorted(intervals, key=lambda i: i["start"]):
+        if merged and interval["start"] - merged[-1]["end"] <= gap_seconds:
+            last = merged[-1]
+            last["end"] = max(last["end"], interval["end"])
+            last["track_ids"].extend(interval["track_ids"])
+            if interval["best_frame"]["confidence"] > last["best_frame"]["confidence"]:
+                last["best_frame"] = interval["best_frame"]
+        else:
+            merged.append(interval)
+    return merged
+
+
+def search_video(
+    source_image_path: str,
+    video_path: str,
+    sample_fps: float = 2.0,
+    workers: Optional[int] = None,
+    gap_seconds: Optional[float] = None,
+    min_track_hits: int = 1,
+    executor: str = "process",
+    pool: Optional[Executor] = None,
+    detector: Callable[[np.ndarray], Dict[str, Any]] = detect_faces_in_frame,
+    identify_fn: Optional[Callable[[np.ndarray], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Find the time intervals in which the face in ``source_image_path`` appears in a video.
+
+    Keyframes are sampled at ``sample_fps`` and the video is split into
+    contiguous segments that are decoded and run through face detection in
+    parallel workers. The detections are then tracked across keyframes, each
+    track is identified once (on its most confident detection), and the
+    matching tracks are merged into time intervals.
+
+    Args:
+        source_image_path: Path to the reference face image
+        video_path: Path to the video file to search
+        sample_fps: Keyframes sampled per second of video
+        workers: Number of parallel decode/detect workers (defaults to the CPU count)
+        gap_seconds: Intervals closer than this are merged (defaults to two sample periods)
+        min_track_hits: Ignore tracks seen on fewer keyframes than this
+        executor: "process" or "thread" workers for decode and detection
+        pool: Existing executor to run the segments on (e.g. the MCP server's CPU pool);
+            when given, no pool is created and ``executor`` is ignored
+        detector: Function that detects faces in a BGR frame (must be picklable for processes)
+        identify_fn: Function identifying a face crop against the source; defaults to
+            ``identify_face`` through ``crop_identifier``
+
+    Returns:
+        Dictionary with the matched intervals (start/end seconds plus the best-matching
+        frame for each), the number of tracks and identify calls, and throughput figures
+    """
+    print(f"Searching {video_path} for the face in {source_image_path}")
+    if not os.path.exists(source_image_path):
+        return {"success": False, "error": f"Source image not found: {source_image_path}", "intervals": []}
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        cap.release()
+        return {"success": False, "error": f"Could not open video: {video_path}", "intervals": []}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if total_frames <= 0:
+        return {"success": False, "error": f"Video has no frames: {video_path}", "intervals": []}
+
+    stride = max(1, round(fps / sample_fps))
+    sample_period = stride / fps
+    gap_seconds = 2 * sample_period if gap_seconds is None else gap_seconds
+    workers = workers or os.cpu_count() or 1
+
+    # Split the video into segments aligned to the keyframe stride
+    keyframes = math.ceil(total_frames / stride)
+    per_worker = math.ceil(keyframes / workers)
+    segments = [(k * stride, min(total_frames, (k + per_worker) * stride))
+                for k in range(0, keyframes, per_worker)]
+
+    started = time.perf_counter()
+    if pool is not None:
+        scans = _scan_segments(pool, video_path, segments, stride, detector)
+    else:
+        if executor == "process":
+            scan_pool: Executor = ProcessPoolExecutor(max_workers=len(segments),
+                                                      mp_context=multiprocessing.get_context("spawn"))
+        else:
+            scan_pool = ThreadPoolExecutor(max_workers=len(segments))
+        with scan_pool:
+            scans = _scan_segments(scan_pool, video_path, segments, stride, detector)
+    scan_seconds = time.perf_counter() - started
+
+    detections = [item for segment_detections, _ in scans for item in segment_detections]
+    decoded = sum(count for _, count in scans)
+
+    # Track across keyframes; a face may vanish for up to gap_seconds and keep its track
+    tracker = FaceTracker(max_age=max(1, math.ceil(gap_seconds / sample_period)))
+    tracks: Dict[int, Dict[str, Any]] = {}
+    last_index = None
+    for frame_index, faces in sorted(detections, key=lambda item: item[0]):
+        # Advance the tracker over keyframes without detections so tracks age correctly
+        if last_index is not None:
+            for _ in range((frame_index - last_index) // stride - 1):
+                tracker.update([])
+        last_index = frame_index
+        for track in tracker.update(faces):
+            timestamp = frame_index / fps
+            info = tracks.setdefault(track.track_id, {
+                "start": timestamp, "end": timestamp, "hits": 0, "best": None
+            })
+            info["end"] = timestamp
+            info["hits"] += 1
+            confidence = float(track.face.get("confidence") or 0.0)
+            if info["best"] is None or confidence > info["best"]["confidence"]:
+                info["best"] = {"frame_index": frame_index, "timestamp": timestamp,
+                                "bbox": track.face["bbox"], "confidence": confidence}
+
+    # Identify each track once, on its best detection
+    identify_fn = identify_fn or crop_identifier(source_image_path)
+    candidates = [(track_id, info) for track_id, info in tracks.items() if info["hits"] >= min_track_hits]
+
+    def identify_track(info: Dict[str, Any]) -> Dict[str, Any]:
+        frame = _read_frame(video_path, info["best"]["frame_index"])
+        if frame is None:
+            return {"success": False, "error": "Could not decode best frame", "is_match": False}
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = [int(c) for c in info["best"]["bbox"]]
+        return identify_fn(frame[max(0, y1):min(height, y2), max(0, x1):min(width, x2)])
+
+    with ThreadPoolExecutor(max_workers=workers) as identify_pool:
+        identities = list(identify_pool.map(identify_track, [info for _, info in candidates]))
+
+    intervals = []
+    for (track_id, info), identity in zip(candidates, identities):
+        if identity.get("success") and identity.get("is_match"):
+            intervals.append({
+                "start": info["start"],
+                "end": info["end"] + sample_period,
+                "track_ids": [track_id],
+                "best_frame": info["best"],
+            })
+
+    elapsed = time.perf_counter() - started
+    return {
+        "success": True,
+        "error": None,
+        "intervals": _merge_intervals(intervals, gap_seconds),
+        "total_tracks": len(tracks),
+        "identify_calls": len(candidates),
+        "frames_decoded": decoded,
+        "video_frames": total_frames,
+        "video_seconds": total_frames / fps,
+        "workers": len(segments),
+        "decode_detect_fps": decoded / scan_seconds if scan_seconds else 0.0,
+        "video_fps_covered": total_frames / scan_seconds if scan_seconds else 0.0,
+        "elapsed_seconds": elapsed,
+    }
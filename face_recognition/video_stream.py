@@ -0,0 +1,203 @@
+"""Continuous face detection over live feeds and recorded video."""
+import math
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+import cv2
+import numpy as np
+from .camera import _open_capture, normalize_source
+from .face_detector import detect_faces_in_frame
+from .motion_gate import GatedDetector, MotionGate
+from .face_tracker import FaceTracker, TrackIdentifier
+from .frame_ring import FrameRingConsumer, ring_name_from_source
+
+# Frame rate assumed when a source does not report one (common for webcams).
+DEFAULT_FPS = 30.0
+
+# Smoothing factor for the exponential moving average of detection latency.
+LATENCY_SMOOTHING = 0.3
+
+
+def _adaptive_stride(latency: float, fps: float, min_stride: int, max_stride: int) -> int:
+    """Number of source frames that elapse while one detection runs."""
+    return max(min_stride, min(max_stride, math.ceil(latency * fps)))
+
+
+def _frame_event(
+    frame_index: int, timestamp: float, result: Dict[str, Any], stride: int, skipped: int,
+    latency: float, lag: float, gate: Optional[MotionGate]
+) -> Dict[str, Any]:
+    """Build the per-frame dictionary yielded by the stream."""
+    event = {
+        "frame_index": frame_index,
+        "timestamp": timestamp,
+        "success": result.get("success", False),
+        "error": result.get("error"),
+        "faces": result.get("faces", []),
+        "total_faces": result.get("total_faces", 0),
+        "stride": stride,
+        "skipped_frames": skipped,
+        "latency_seconds": latency,
+        "lag_seconds": lag,
+    }
+    if gate is not None:
+        event["reused"] = result.get("reused", False)
+        event["motion_score"] = result.get("motion_score")
+        event["skip_rate"] = gate.skip_rate
+    return event
+
+
+def _attach_tracks(
+    event: Dict[str, Any], frame: np.ndarray, tracker: Optional[FaceTracker],
+    track_identifier: Optional[TrackIdentifier]
+) -> Dict[str, Any]:
+    """Feed a frame's detections to the tracker and identify any tracks that are due."""
+    if tracker is None:
+        return event
+    tracks = tracker.update(event["faces"])
+    if track_identifier is not None:
+        event["identify_calls"] = track_identifier.identify(tracks, frame)
+    event["tracks"] = [track.to_dict() for track in tracks]
+    return event
+
+
+def stream_detections(
+    source: Union[int, str, Any] = 0,
+    max_lag_seconds: float = 1.0,
+    max_frames: Optional[int] = None,
+    realtime: bool = True,
+    min_stride: int = 1,
+    max_stride: int = 30,
+    detector: Callable[[np.ndarray], Dict[str, Any]] = detect_faces_in_frame,
+    motion_gate: Optional[MotionGate] = None,
+    tracker: Optional[FaceTracker] = None,
+    track_identifier: Optional[TrackIdentifier] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run face detection over a video source and yield per-frame detections.
+
+    Frames are sampled at a stride derived from the measured detection
+    latency, so detection keeps pace with the source. Whenever processing
+    falls more than ``max_lag_seconds`` behind real time, frames are dropped
+    (grabbed without decoding) until the stream has caught up.
+
+    Args:
+        source: Camera index, video file path/URL, ``"shm://<name>"`` for a shared-memory
+            frame ring, or an object with a ``read()`` method returning ``(ok, frame)``
+            such as a ``CameraSession`` (such sources always hand out their freshest
+            frame, so they never lag)
+        max_lag_seconds: Maximum allowed delay behind real time
+        max_frames: Stop after this many frames have been processed (None for no limit)
+        realtime: Pace recorded files to their frame rate; when False, files are
+            processed as fast as possible at ``min_stride``
+        min_stride: Smallest number of frames between processed frames
+        max_stride: Largest number of frames between processed frames
+        detector: Function that detects faces in a BGR frame
+        motion_gate: Optional gate; frames without enough change reuse the
+            previous detections instead of running the detector
+        tracker: Optional face tracker; each event then carries the frame's ``tracks``
+        track_identifier: Optional identifier run on new tracks and on tracks due
+            for re-verification (requires ``tracker``)
+
+    Yields:
+        Dictionaries with the frame index, media timestamp, detected faces,
+        the current stride, lag behind real time and detection latency (plus
+        ``reused``, ``motion_score`` and ``skip_rate`` when gating is enabled)
+    """
+    if motion_gate is not None:
+        detector = GatedDetector(detector, motion_gate)
+
+    if hasattr(source, "read") and not isinstance(source, (int, str)):
+        yield from _stream_latest_frames(source, max_frames, detector, motion_gate, tracker, track_identifier)
+        return
+
+    ring_name = ring_name_from_source(source)
+    if ring_name is not None:
+        consumer = FrameRingConsumer(ring_name)
+        try:
+            yield from _stream_latest_frames(consumer, max_frames, detector, motion_gate, tracker, track_identifier)
+        finally:
+            consumer.close()
+        return
+
+    source = normalize_source(source)
+    cap = _open_capture(source)
+    if not cap.isOpened():
+        cap.release()
+        raise IOError(f"Could not open video source {source}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    print(f"Streaming detections from {source} at {fps:.1f} fps (max lag {max_lag_seconds}s)")
+    latency = 0.0
+    stride = min_stride
+    frame_index = -1
+    processed = 0
+    started = time.monotonic()
+
+    try:
+        while max_frames is None or processed < max_frames:
+            # Advance to the next frame to process, dropping frames we cannot keep up with
+            target_index = frame_index + stride
+            if realtime:
+                live_index = int((time.monotonic() - started) * fps)
+                if live_index - target_index > max_lag_seconds * fps:
+                    target_index = live_index
+            skipped = 0
+            while frame_index < target_index - 1:
+                if not cap.grab():
+                    return
+                frame_index += 1
+                skipped += 1
+            ret, frame = cap.read()
+            if not ret:
+                return
+            frame_index += 1
+
+            timestamp = frame_index / fps
+            if realtime and isinstance(source, str):
+                # Recorded files are played back no faster than real time
+                ahead = timestamp - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+            detect_started = time.monotonic()
+            result = detector(frame)
+            elapsed = time.monotonic() - detect_started
+            latency = elapsed if processed == 0 else (
+                LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * latency)
+            processed += 1
+
+            lag = max(0.0, (time.monotonic() - started) - timestamp) if realtime else 0.0
+            event = _frame_event(frame_index, timestamp, result, stride, skipped, elapsed, lag, motion_gate)
+            yield _attach_tracks(event, frame, tracker, track_identifier)
+
+            if realtime:
+                stride = _adaptive_stride(latency, fps, min_stride, max_stride)
+    finally:
+        cap.release()
+
+
+def _stream_latest_frames(
+    source: Any, max_frames: Optional[int], detector: Callable[[np.ndarray], Dict[str, Any]],
+    motion_gate: Optional[MotionGate], tracker: Optional[FaceTracker],
+    track_identifier: Optional[TrackIdentifier]
+) -> Iterator[Dict[str, Any]]:
+    """Run detection on the freshest frame of a latest-frame source each iteration."""
+    processed = 0
+    seq = 0
+    started = time.monotonic()
+    while max_frames is None or processed < max_frames:
+        if hasattr(source, "wait_for_frame"):
+            # Wait for a frame we have not seen yet instead of re-detecting the same one
+            seq, frame = source.wait_for_frame(seq)
+            ret = frame is not None
+        else:
+            ret, frame = source.read()
+            seq = processed
+        if not ret:
+            return
+        detect_started = time.monotonic()
+        result = detector(frame)
+        elapsed = time.monotonic() - detect_started
+        event = _frame_event(seq, detect_started - started, result, 1, 0, elapsed, 0.0, motion_gate)
+        yield _attach_tracks(event, frame, tracker, track_identifier)
+        processed += 1
@@ -1,60 +1,139 @@
 """FastMCP server for face detection and identification tools."""
 print("Executing mcp_server.py")
-import json
-from fastmcp import FastMCP
-from typing import Any, Dict, List
+import asyncio
+import os
+import socket
+import uuid
+from fastmcp import Context, FastMCP
+from typing import Any, Dict, List, Optional
+from config import (
+    get_admission_config, get_blob_config, get_camera_config, get_detection_config, get_executor_config,
+    get_identification_config, get_job_config, get_paths_config, get_server_config, get_tracing_config
+)
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 from google.adk.tools import ToolContext
-from face_recognition.face_identifier import identify_face
-from face_recognition.face_detector import detect_faces
-from face_recognition.face_matcher import face_matcher
+from face_recognition.face_identifier import identify_face_async
+from face_recognition.face_detector import detect_faces_batch
+from face_recognition.face_matcher import face_matcher_async
 from face_recognition.camera import capture_image
+from face_recognition.video_stream import stream_detections
+from face_recognition.motion_gate import MotionGate
+from face_recognition.face_tracker import FaceTracker, TrackIdentifier, crop_identifier
+from face_recognition.video_search import search_video
 from face_recognition.draw_bounding_box_on_image import draw_object_rectangle
+from face_recognition.serialization import dumps_str, to_jsonable
+from face_recognition.executors import ToolExecutors
+from face_recognition.blob_store import BlobStore, decode_base64
+from face_recognition.request_batcher import RequestBatcher
+from face_recognition.admission import AdmissionController, Overloaded
+from face_recognition.singleflight import SingleFlight
+from face_recognition.artifacts import file_hash
+from face_recognition.jobs import Job, JobManager
+from face_recognition.batch import list_targets, run_batch
+from face_recognition.metrics import REGISTRY, TOOL_QUEUED, instrument_tool
+from face_recognition.tracing import attached_context, configure_tracing, inject_context
+from face_recognition.prefork import PreforkServer, build_model, preload_models, process_memory
 
 mcp = FastMCP("Face Identification Tools")
 
-def serializeDict(response: Dict[str, Any]) -> str:
-    try:
-        # Standard JSON serialization
-        return json.dumps(response, ensure_ascii=False)
-    except TypeError:
-        print("Inside serializeDict Exception")
-        # Fallback for non-serializable objects (e.g., custom classes, numpy arrays)
-        return json.dumps(response, default=lambda o: getattr(o, "__dict__", str(o)), ensure_ascii=False)
+# Spans for every tool call and pipeline stage; fastmcp continues the caller's trace from the request
+_tracing_config = get_tracing_config()
+configure_tracing(_tracing_config.exporter, _tracing_config.endpoint, _tracing_config.service_name)
+
+# Blocking work runs in these pools so one slow request never stalls the others
+_executor_config = get_executor_config()
+executors = ToolExecutors(cpu_workers=_executor_config.cpu_workers, io_workers=_executor_config.io_workers,
+                          cpu_executor=_executor_config.cpu_executor)
+
+# Uploaded images, so clients on other nodes can pass content instead of shared paths
+_blob_config = get_blob_config()
+blob_store = BlobStore(_blob_config.root, max_blob_bytes=_blob_config.max_blob_bytes)
+
+# Concurrent detection requests share one batched RetinaFace forward pass
+_detection_config = get_detection_config()
+detection_batcher = RequestBatcher(lambda paths: executors.run_cpu(detect_faces_batch, paths),
+                                   max_batch_size=_detection_config.batch_max_size,
+                                   max_wait_ms=_detection_config.batch_window_ms, name="detect_faces")
+
+# Expensive tools get a concurrency limit and a bounded wait queue; excess calls are shed
+_admission_config = get_admission_config()
+admission = AdmissionController(_admission_config.limits(), queue_timeout=_admission_config.queue_timeout)
+
+# Identical calls already in flight share one execution instead of each paying full cost
+inflight = SingleFlight()
+
+# Long-running work runs as background jobs that clients poll instead of holding a connection open
+_job_config = get_job_config()
+jobs = JobManager(workers=_job_config.workers, ttl_seconds=_job_config.ttl_seconds,
+                  max_queued=_job_config.max_queued)
+
+def structuredResult(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a tool response (which may hold numpy values) into structured JSON content."""
+    return to_jsonable(response)
+
+
+def resolveImage(image: str) -> str:
+    """Map an image argument (path, "sha256:<hex>" blob reference or base64 data URI) to a local path."""
+    return blob_store.resolve(image, max_inline_bytes=_blob_config.max_inline_bytes)
+
+
+async def flightKey(tool: str, *image_paths: str, **options: Any) -> str:
+    """Coalescing key: the tool name, the content hashes of its input images and its other arguments."""
+    def build() -> str:
+        digests = [file_hash(path) if os.path.isfile(path) else path for path in image_paths]
+        return dumps_str([tool, digests, options])
+
+    return await executors.run_io(build)
+
 
 @mcp.tool()
-def call_capture_image(output_path: str) -> str:
+@instrument_tool
+async def call_capture_image(output_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Captures an image from the primary camera and saves it to the specified path.
 
+    The capture is also stored in the blob store; the returned "ref" can be passed
+    to the other tools by clients that do not share the server's disk.
+
     Args:
-        output_path (str): The file path where the captured image should be saved.
+        output_path (str): The file path where the captured image should be saved on the
+                           server. Optional; when omitted only the blob reference is kept.
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the capture result,
+        dict: Structured content with the capture result,
              for example:
              {
                "success": true,             # bool indicating whether capture succeeded
                "file_path": "/path/to.jpg", # path to the saved image (if successful)
+               "ref": "sha256:...",         # blob reference of the captured image
                "error": null                # error message (if any)
              }
     """
     print(f"Inside MCP Server the capture_image tool - {output_path}")
 
-    response = capture_image(file_path=output_path)
-    print(f"Inside MCP Server After image capture - response: {response} json: {serializeDict(response)}")
-    return serializeDict(response)
+    file_path = output_path or str(blob_store.root / "uploads" / f"capture_{uuid.uuid4().hex}.jpg")
+    response = await executors.run_io(capture_image, file_path=file_path, source=get_camera_config().source)
+    if response.get("success"):
+        response["ref"] = await executors.run_io(blob_store.put_file, file_path)
+        if output_path is None:
+            os.remove(file_path)
+            response["file_path"] = resolveImage(response["ref"])
+    print(f"Inside MCP Server After image capture - response: {response}")
+    return structuredResult(response)
 
 
 @mcp.tool()
-def call_detect_faces(image_path: str) -> str:
+@instrument_tool
+async def call_detect_faces(image_path: str) -> Dict[str, Any]:
     """
     Detect faces in an image using RetinaFace.
     
     Args:
-        image_path: Path to the image file
+        image_path: The image: a file path, a "sha256:<hex>" blob reference or a base64 data URI
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the capture result,
+        dict: Structured content with the capture result,
              for example:
              {
                 "success": True,
@@ -63,22 +142,38 @@ def call_detect_faces(image_path: str) -> str:
                 "total_faces": len(processed_faces)
             }
     """
-    print(f"Inside MCP Server the detect_faces tool - {image_path}")
-    response = detect_faces(image_path=image_path)
-    return serializeDict(response)
+    print(f"Inside MCP Server the detect_faces tool - {image_path[:80]}")
+    try:
+        image_path = resolveImage(image_path)
+    except (FileNotFoundError, ValueError) as e:
+        return {"success": False, "error": str(e), "faces": [], "total_faces": 0}
+
+    async def run() -> Dict[str, Any]:
+        async with admission.admit("call_detect_faces"):
+            return await detection_batcher.submit(image_path)
+
+    try:
+        response = await inflight.do(await flightKey("call_detect_faces", image_path), run)
+    except Overloaded as e:
+        return e.to_dict()
+    return structuredResult(response)
 
 
 @mcp.tool()
-def call_identify_face(base_image_path: str, image_to_search_path: str) -> str:
+@instrument_tool
+async def call_identify_face(base_image_path: str, image_to_search_path: str, target_mode: Optional[str] = None) -> Dict[str, Any]:
     """
     Compares two images to determine if they contain the same person.
 
     Args:
-        base_image_path (str): The file path to the reference (base) image.
-        image_to_search_path (str): The file path to the image to search within.
+        base_image_path (str): The reference (base) image: a file path, a "sha256:<hex>" blob
+                               reference or a base64 data URI.
+        image_to_search_path (str): The image to search within, in any of the same forms.
+        target_mode (str): "full" to send the whole target image, or "crops" to detect the
+                           target faces locally and send only their crops. Defaults to ID_TARGET_MODE.
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the identification result,
+        dict: Structured content with the identification result,
              for example:
              {
                "is_match": true,              # bool indicating whether the faces match
@@ -88,22 +183,42 @@ def call_identify_face(base_image_path: str, image_to_search_path: str) -> str:
                "error": null                  # error message (if any)
              }
     """
-    print(f"Inside the MCP Server identify_face tool - {base_image_path} {image_to_search_path}")
-    response = identify_face(base_image_path, image_to_search_path)
-    return serializeDict(response)
+    print(f"Inside the MCP Server identify_face tool - {base_image_path[:80]} {image_to_search_path[:80]}")
+    try:
+        base_image_path = resolveImage(base_image_path)
+        image_to_search_path = resolveImage(image_to_search_path)
+    except (FileNotFoundError, ValueError) as e:
+        return {"success": False, "error": str(e), "is_match": False}
+    target_mode = target_mode or get_identification_config().target_mode
+
+    async def run() -> Dict[str, Any]:
+        async with admission.admit("call_identify_face"):
+            return await identify_face_async(base_image_path, image_to_search_path, target_mode=target_mode,
+                                             run_cpu=executors.run_cpu, run_io=executors.run_io)
+
+    try:
+        key = await flightKey("call_identify_face", base_image_path, image_to_search_path, target_mode=target_mode)
+        response = await inflight.do(key, run)
+    except Overloaded as e:
+        return e.to_dict()
+    return structuredResult(response)
 
 
 @mcp.tool()
-def call_face_matcher(source_image_path: str, target_image_path: str) -> str:
+@instrument_tool
+async def call_face_matcher(source_image_path: str, target_image_path: str, target_mode: Optional[str] = None) -> Dict[str, Any]:
     """
     Compares two images to determine if they contain the same person.
 
     Args:
-        source_image_path (str): The file path to the reference (base) image.
-        target_image_path (str): The file path to the image to search within.
+        source_image_path (str): The reference (base) image: a file path, a "sha256:<hex>" blob
+                                 reference or a base64 data URI.
+        target_image_path (str): The image to search within, in any of the same forms.
+        target_mode (str): "full" to send the whole target image, or "crops" to detect the
+                           target faces locally and send only their crops. Defaults to ID_TARGET_MODE.
 
     Returns:
-        str: A JSON-encoded string representing a dictionary with the identification result,
+        dict: Structured content with the identification result,
              for example:
              {
                "is_match": true,              # bool indicating whether the faces match
@@ -113,10 +228,469 @@ def call_face_matcher(source_image_path: str, target_image_path: str) -> str:
                "error": null                  # error message (if any)
              }
     """
-    print(f"Inside the MCP Server face_matcher tool - {source_image_path} {target_image_path}")
-    response = face_matcher(source_image_path, target_image_path)
-    return serializeDict(response)
+    print(f"Inside the MCP Server face_matcher tool - {source_image_path[:80]} {target_image_path[:80]}")
+    try:
+        source_image_path = resolveImage(source_image_path)
+        target_image_path = resolveImage(target_image_path)
+    except (FileNotFoundError, ValueError) as e:
+        return {"success": False, "error": str(e), "results": []}
+    target_mode = target_mode or get_identification_config().target_mode
+    try:
+        response = await admittedMatch(source_image_path, target_image_path, target_mode=target_mode)
+    except Overloaded as e:
+        return e.to_dict()
+    return structuredResult(response)
+
+
+@mcp.tool()
+@instrument_tool
+async def call_stream_detections(
+    source: str, ctx: Context, max_frames: int = 100, max_lag_seconds: float = 1.0,
+    motion_threshold: Optional[float] = None, source_image_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Runs continuous face detection over a camera or video file and streams per-frame results.
+
+    Each processed frame is sent to the client as a progress notification and a log
+    message while the stream runs. Frames are sampled at an adaptive stride so that
+    detection never falls more than max_lag_seconds behind real time.
+
+    Args:
+        source (str): Camera index (e.g. "0"), the path/URL of a video file, or a video
+                      uploaded as a "sha256:<hex>" blob reference or base64 data URI.
+        max_frames (int): Number of frames to process before stopping.
+        max_lag_seconds (float): Maximum allowed delay behind real time.
+        motion_threshold (float): Minimum frame change score for detection to re-run;
+                                  unchanged frames reuse the previous detections. 0 disables
+                                  gating. Defaults to MOTION_THRESHOLD.
+        source_image_path (str): Optional reference face (path, blob reference or data URI).
+                                 Faces are tracked across frames and each new track is identified
+                                 against it once, then re-verified every TRACK_REVERIFY_SECONDS.
+
+    Returns:
+        dict: Structured content with the streaming summary,
+             for example:
+             {
+               "success": true,
+               "error": null,
+               "frames": [ {"frame_index": 0, "timestamp": 0.0, "faces": [...], ...}, ... ],
+               "total_frames": 100,
+               "gate": {"frames": 100, "skipped": 80, "skip_rate": 0.8, ...},
+               "identification": {"identify_calls": 2, "identify_calls_per_minute": 1.5}
+             }
+    """
+    print(f"Inside MCP Server the stream_detections tool - {source[:80]}")
+    try:
+        source = resolveImage(source)
+        if source_image_path:
+            source_image_path = resolveImage(source_image_path)
+    except (FileNotFoundError, ValueError) as e:
+        return structuredResult({"success": False, "error": str(e), "frames": [], "total_frames": 0,
+                                 "gate": None, "identification": None})
+    if motion_threshold is None:
+        motion_threshold = get_detection_config().motion_threshold
+    gate = MotionGate(threshold=motion_threshold) if motion_threshold > 0 else None
+    identifier = None
+    if source_image_path:
+        identifier = TrackIdentifier(crop_identifier(source_image_path),
+                                     reverify_seconds=get_identification_config().reverify_seconds)
+    frames = []
+    try:
+        stream = stream_detections(source, max_lag_seconds=max_lag_seconds, max_frames=max_frames,
+                                   motion_gate=gate, tracker=FaceTracker(), track_identifier=identifier)
+        while True:
+            event = await executors.run_io(next, stream, None)
+            if event is None:
+                break
+            frames.append(event)
+            await ctx.report_progress(len(frames), max_frames)
+            await ctx.info(dumps_str(event))
+    except Exception as e:
+        return structuredResult({"success": False, "error": str(e), "frames": frames, "total_frames": len(frames),
+                              "gate": gate.stats() if gate else None,
+                              "identification": identifier.stats() if identifier else None})
+    return structuredResult({"success": True, "error": None, "frames": frames, "total_frames": len(frames),
+                          "gate": gate.stats() if gate else None,
+                          "identification": identifier.stats() if identifier else None})
+
+
+@mcp.tool()
+@instrument_tool
+async def call_search_video(source_image_path: str, video_path: str, sample_fps: float = 2.0) -> Dict[str, Any]:
+    """
+    Finds every time interval in which the face from the source image appears in a video file.
+
+    Args:
+        source_image_path (str): The reference face image: a file path, a "sha256:<hex>" blob
+                                 reference or a base64 data URI.
+        video_path (str): The video recording to search, as a file path or blob reference.
+        sample_fps (float): Keyframes sampled per second of video.
+
+    Returns:
+        dict: Structured content with the search result,
+             for example:
+             {
+               "success": true,
+               "error": null,
+               "intervals": [
+                 {"start": 12.5, "end": 31.0, "track_ids": [3],
+                  "best_frame": {"frame_index": 450, "timestamp": 15.0, "bbox": [x1, y1, x2, y2], "confidence": 0.99}}
+               ],
+               "identify_calls": 7,
+               "decode_detect_fps": 41.2
+             }
+    """
+    print(f"Inside the MCP Server search_video tool - {source_image_path[:80]} {video_path[:80]}")
+    try:
+        source_image_path = resolveImage(source_image_path)
+        video_path = resolveImage(video_path)
+    except (FileNotFoundError, ValueError) as e:
+        return {"success": False, "error": str(e), "intervals": []}
+    try:
+        async with admission.admit("call_search_video"):
+            # Segments run on the shared CPU pool instead of a new pool per call
+            response = await executors.run_io(search_video, source_image_path, video_path, sample_fps=sample_fps,
+                                              workers=executors.cpu_workers, pool=executors.cpu)
+    except Overloaded as e:
+        return e.to_dict()
+    return structuredResult(response)
+
+
+async def admittedMatch(source_image_path: Any, target_image_path: str, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Run ``face_matcher_async`` under the face_matcher admission limit.
+
+    Detection and cropping use the CPU pool; the Gemini calls are awaited on the event loop.
+
+    Raises:
+        Overloaded: If the match is shed
+    """
+    async with admission.admit("call_face_matcher"):
+        return await face_matcher_async(source_image_path, target_image_path, run_cpu=executors.run_cpu,
+                                        run_io=executors.run_io, max_concurrent_identifications=_admission_config.identify_concurrency,
+                                        **kwargs)
+
+
+async def tracedMatch(carrier: Dict[str, str], source_image_path: Any, target_image_path: str,
+                      **kwargs: Any) -> Dict[str, Any]:
+    """``admittedMatch`` under the trace context of the job thread that started it."""
+    with attached_context(carrier):
+        return await admittedMatch(source_image_path, target_image_path, **kwargs)
+
+
+def loopMatcher(loop: asyncio.AbstractEventLoop):
+    """
+    A blocking matcher for job threads that runs each match on the server's event loop.
+
+    Job matches thereby share the admission limit and the CPU pool with
+    interactive calls instead of bypassing them, and continue the job's trace.
+    """
+    def match(source_image_path: Any, target_image_path: str, **kwargs: Any) -> Dict[str, Any]:
+        coroutine = tracedMatch(inject_context(), source_image_path, target_image_path, **kwargs)
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    return match
+
+
+def matcherJob(arguments: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+    """Job work for "face_matcher": partial results arrive as each face cluster is identified."""
+    source_image_path = resolveImage(arguments["source_image_path"])
+    target_image_path = resolveImage(arguments["target_image_path"])
+    target_mode = arguments.get("target_mode") or get_identification_config().target_mode
+    match = loopMatcher(loop)
+
+    def work(job: Job) -> Dict[str, Any]:
+        return to_jsonable(match(
+            source_image_path, target_image_path, target_mode=target_mode,
+            on_progress=lambda done, total, results: job.report(done, total, to_jsonable(results))))
+
+    return work
+
+
+def batchJob(arguments: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+    """Job work for "batch": matches the sources against every image of a server-side directory or manifest."""
+    sources = [resolveImage(source) for source in arguments["source_image_paths"]]
+    targets = list_targets(arguments["targets"])
+    output_path = arguments.get("output_path") or str(get_paths_config().temp_dir / f"batch_{uuid.uuid4().hex}.jsonl")
+    target_mode = arguments.get("target_mode") or get_identification_config().target_mode
+    # Workers beyond the face_matcher concurrency limit would only wait in (or overflow) its queue
+    workers = max(1, min(int(arguments.get("workers", 4)), _admission_config.matcher_concurrency))
+
+    def work(job: Job) -> Dict[str, Any]:
+        summary = run_batch(sources, targets, output_path, workers=workers, matcher=loopMatcher(loop),
+                            matcher_kwargs={"target_mode": target_mode},
+                            on_record=lambda record, done, total: job.report(done, total, [to_jsonable(record)]))
+        return {**summary, "output_path": output_path, "workers": workers}
+
+    return work
+
+
+JOB_KINDS = {"face_matcher": matcherJob, "batch": batchJob}
+
+
+@mcp.tool()
+@instrument_tool
+async def submit_job(kind: str, arguments: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Starts long-running work in the background and returns a job id to poll with get_job.
+
+    Args:
+        kind (str): "face_matcher" or "batch".
+        arguments (dict): For "face_matcher": source_image_path, target_image_path and optional
+                          target_mode. For "batch": source_image_paths (list), targets (a directory
+                          or manifest on the server) and optional output_path, workers (capped at
+                          MCP_MATCHER_CONCURRENCY), target_mode.
+                          Images may be paths, "sha256:<hex>" blob references or base64 data URIs.
+        idempotency_key (str): Optional client-chosen key; resubmitting with the same key (e.g.
+                               after a timeout) returns the existing job instead of starting another.
+
+    Returns:
+        dict: The job status, for example:
+             {"success": true, "job_id": "9f1c...", "kind": "face_matcher", "status": "queued",
+              "progress": {"done": 0, "total": null}, "result": null, "error": null, ...}
+    """
+    print(f"Inside the MCP Server submit_job tool - {kind}")
+    if kind not in JOB_KINDS:
+        return {"success": False, "error": f"Unknown job kind {kind!r}; expected one of {sorted(JOB_KINDS)}"}
+    try:
+        # Preparing the work can resolve uploads and scan a target directory, so keep it off the event loop
+        work = await executors.run_io(JOB_KINDS[kind], arguments, asyncio.get_running_loop())
+        job = jobs.submit(kind, work, idempotency_key=idempotency_key)
+    except KeyError as e:
+        return {"success": False, "error": f"Missing job argument: {e}"}
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        return {"success": False, "error": str(e)}
+    return job.snapshot(include_partial=False)
+
+
+@mcp.tool()
+@instrument_tool
+def get_job(job_id: str, include_partial: bool = True) -> Dict[str, Any]:
+    """
+    Reports a job's status, progress, partial results and, once finished, its result.
+
+    Args:
+        job_id (str): Id returned by submit_job.
+        include_partial (bool): Whether to include the partial results gathered so far.
+
+    Returns:
+        dict: Structured content with the job status,
+             for example:
+             {
+               "success": true,
+               "job_id": "9f1c...",
+               "status": "running",            # queued, running, succeeded, failed or cancelled
+               "progress": {"done": 3, "total": 8},
+               "partial_results": [...],       # results produced so far
+               "result": null,                 # the full result once succeeded
+               "error": null
+             }
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return {"success": False, "error": f"Unknown or expired job: {job_id}"}
+    return job.snapshot(include_partial=include_partial)
+
+
+@mcp.tool()
+@instrument_tool
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancels a job. A queued job never starts; a running job stops at its next progress step.
+
+    Args:
+        job_id (str): Id returned by submit_job.
+
+    Returns:
+        dict: The job status after the request; poll get_job until status is "cancelled".
+    """
+    job = jobs.cancel(job_id)
+    if job is None:
+        return {"success": False, "error": f"Unknown or expired job: {job_id}"}
+    return job.snapshot(include_partial=False)
+
+
+def loadStats() -> Dict[str, Any]:
+    return {**admission.stats(), "coalescing": inflight.stats(), "batching": detection_batcher.stats(),
+            "jobs": jobs.stats(),
+            "worker": {"pid": os.getpid(), **process_memory()}}
+
+
+@mcp.tool()
+@instrument_tool
+def server_load() -> Dict[str, Any]:
+    """
+    Reports per-tool admission state so callers and load balancers can back off early.
+
+    Returns:
+        dict: Structured content with the load,
+             for example:
+             {
+               "overloaded": false,           # true when some tool is rejecting calls outright
+               "tools": {
+                 "call_face_matcher": {"active": 2, "queued": 3, "max_concurrent": 2, "max_queue": 8,
+                                       "admitted": 120, "rejected_queue_full": 4, "rejected_timeout": 1, ...}
+               },
+               "coalescing": {"in_flight": 1, "executions": 80, "coalesced": 12},
+               "batching": {"batches": 40, "items": 90, "mean_batch_size": 2.25, "mean_wait_ms": 6.1,
+                            "longest_wait_ms": 10.4, ...},
+               "jobs": {"workers": 2, "ttl_seconds": 3600, "jobs": {"running": 2, "queued": 1}}
+             }
+    """
+    return loadStats()
+
+
+@mcp.custom_route("/load", methods=["GET"])
+async def load_status(request: Request) -> JSONResponse:
+    """Admission state over plain HTTP for load balancer health checks; 503 while shedding load."""
+    stats = loadStats()
+    return JSONResponse(stats, status_code=503 if stats["overloaded"] else 200)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint: per-tool and per-stage latency, outcomes, in-flight calls and payload sizes."""
+    for tool, stats in admission.stats()["tools"].items():
+        TOOL_QUEUED.set(stats["queued"], tool=tool)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@mcp.tool()
+@instrument_tool
+def has_blob(ref: str) -> Dict[str, Any]:
+    """
+    Checks whether the server already stores an image, so clients can skip re-sending it.
+
+    Args:
+        ref (str): Blob reference "sha256:<hex>" computed by the client over the file bytes.
+
+    Returns:
+        dict: {"ref": "sha256:...", "exists": true}
+    """
+    try:
+        return {"ref": ref, "exists": blob_store.exists(ref)}
+    except ValueError as e:
+        return {"ref": ref, "exists": False, "error": str(e)}
+
+
+@mcp.tool()
+@instrument_tool
+def upload_blob(data_base64: str) -> Dict[str, Any]:
+    """
+    Uploads a small image in one call and returns its content-addressed reference.
+
+    Args:
+        data_base64 (str): The file content as base64 or a base64 data URI.
+
+    Returns:
+        dict: {"success": true, "ref": "sha256:...", "size": 12345, "error": null}
+    """
+    try:
+        data = decode_base64(data_base64)
+        if len(data) > _blob_config.max_inline_bytes:
+            return {"success": False, "error": f"Payload exceeds {_blob_config.max_inline_bytes} bytes; "
+                                               "use begin_upload/upload_chunk/finish_upload"}
+        return {"success": True, "ref": blob_store.put(data), "size": len(data), "error": None}
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+@instrument_tool
+def begin_upload() -> Dict[str, Any]:
+    """
+    Starts a chunked upload for an image too large to send in one call.
+
+    Returns:
+        dict: {"upload_id": "..."} to pass to upload_chunk and finish_upload.
+    """
+    return {"upload_id": blob_store.begin_upload()}
+
+
+@mcp.tool()
+@instrument_tool
+def upload_chunk(upload_id: str, offset: int, data_base64: str) -> Dict[str, Any]:
+    """
+    Appends one chunk to a chunked upload. Chunks must be sent in order.
+
+    Args:
+        upload_id (str): Id returned by begin_upload.
+        offset (int): Byte offset of this chunk in the file.
+        data_base64 (str): The chunk content as base64.
+
+    Returns:
+        dict: {"success": true, "received": 2097152, "error": null}
+    """
+    try:
+        received = blob_store.append_chunk(upload_id, offset, decode_base64(data_base64))
+        return {"success": True, "received": received, "error": None}
+    except (KeyError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+
+@mcp.tool()
+@instrument_tool
+def finish_upload(upload_id: str, sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Completes a chunked upload and returns the image's content-addressed reference.
+
+    Args:
+        upload_id (str): Id returned by begin_upload.
+        sha256 (str): Optional expected digest ("sha256:<hex>" or hex) to verify the upload.
+
+    Returns:
+        dict: {"success": true, "ref": "sha256:...", "error": null}
+    """
+    try:
+        return {"success": True, "ref": blob_store.finish_upload(upload_id, sha256), "error": None}
+    except (KeyError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+
+@mcp.resource("blob://{digest}", mime_type="application/octet-stream")
+def read_blob(digest: str) -> bytes:
+    """Content of a stored blob, e.g. a capture made on the server."""
+    return blob_store.read(f"sha256:{digest}")
+
+
+def serveWorker(sock: socket.socket) -> None:
+    """Serve MCP over HTTP on a socket shared with the other prefork workers."""
+    # Any worker may receive any request, so no MCP session state is kept between requests
+    mcp.run(transport="http", sockets=[sock], stateless_http=True, show_banner=False)
+
+
+# Tools whose follow-up calls only work in the process that served the first call
+STATEFUL_TOOLS = ("submit_job", "get_job", "cancel_job", "begin_upload", "upload_chunk", "finish_upload")
+
+
+def perWorkerWarning(workers: int) -> str:
+    """Startup warning for prefork mode: which state and limits every worker keeps for itself."""
+    limits = ", ".join(f"{tool} {concurrent}x{workers}={concurrent * workers}"
+                       for tool, (concurrent, _) in _admission_config.limits().items())
+    return (f"WARNING: serving with {workers} workers. Each worker keeps its own in-flight deduplication "
+            f"and admission limits: identical calls on different workers are not merged, and the "
+            f"server-wide concurrency limits are the per-worker limits times {workers} ({limits}).")
+
+
+def main() -> None:
+    server_config = get_server_config()
+    if not server_config.stateful_tools:
+        mcp.disable(names=set(STATEFUL_TOOLS), components={"tool"})
+    if server_config.workers <= 1:
+        mcp.run(transport="http", host=server_config.host, port=server_config.port)
+        return
+    if server_config.stateful_tools:
+        raise SystemExit(f"MCP_WORKERS={server_config.workers} requires MCP_STATEFUL_TOOLS=false: "
+                         f"{', '.join(STATEFUL_TOOLS)} keep their state in one worker, and follow-up calls "
+                         f"routed to another worker would fail. Use MCP_WORKERS=1 to keep these tools.")
+    print(perWorkerWarning(server_config.workers))
+    # Each worker is already a separate process with its own model, so detection runs on its
+    # threads rather than in spawned pools that would each load yet another copy
+    executors.cpu_executor = "thread"
+    # TensorFlow is not imported before the fork; every worker builds the model for itself
+    PreforkServer(serveWorker, server_config.host, server_config.port, server_config.workers,
+                  preload=lambda: preload_models(load_weights=False), post_fork=build_model).run()
 
 
 if __name__ == "__main__":
-    mcp.run(transport="http", host="127.0.0.1", port=8000)
\ No newline at end of file
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastmcp import Client
+import mcp_server
+from face_recognition.admission import AdmissionController, Overloaded, ToolLimiter
+from face_recognition.executors import ToolExecutors
+
+
+async def hold(controller, tool, seconds, order=None, name=None):
+    async with controller.admit(tool):
+        if order is not None:
+            order.append(name)
+        await asyncio.sleep(seconds)
+
+
+async def test_full_queue_rejects_immediately():
+    controller = AdmissionController({"tool": (1, 1)}, queue_timeout=5)
+    running = [asyncio.create_task(hold(controller, "tool", 0.2)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    with pytest.raises(Overloaded) as rejected:
+        await hold(controller, "tool", 0)
+    assert time.perf_counter() - started < 0.05
+    assert rejected.value.to_dict()["reason"] == "queue_full"
+    assert controller.overloaded()
+
+    await asyncio.gather(*running)
+    stats = controller.stats()["tools"]["tool"]
+    assert (stats["admitted"], stats["rejected_queue_full"], stats["active"], stats["queued"]) == (2, 1, 0, 0)
+
+
+async def test_queued_call_times_out():
+    controller = AdmissionController({"tool": (1, 4)}, queue_timeout=0.05)
+    running = asyncio.create_task(hold(controller, "tool", 0.3))
+    await asyncio.sleep(0.01)
+    with pytest.raises(Overloaded) as rejected:
+        await hold(controller, "tool", 0)
+    assert rejected.value.reason == "queue_timeout"
+    assert controller.stats()["tools"]["tool"]["queued"] == 0
+    await running
+
+
+async def test_waiters_admitted_in_order():
+    controller = AdmissionController({"tool": (1, 4)}, queue_timeout=5)
+    order = []
+    tasks = []
+    for name in "abc":
+        tasks.append(asyncio.create_task(hold(controller, "tool", 0.02, order, name)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b", "c"]
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    limiter = ToolLimiter(max_concurrent=1, max_queue=2, queue_timeout=5)
+    await limiter.acquire("tool")
+    waiter = asyncio.create_task(limiter.acquire("tool"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release()
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+async def test_unlimited_tool_always_admitted():
+    controller = AdmissionController({})
+    await asyncio.gather(*[hold(controller, "other", 0.01) for _ in range(10)])
+
+
+async def test_matcher_burst_is_shed_with_structured_error(monkeypatch):
+    """Calls beyond the concurrency limit plus queue get an immediate overloaded result."""
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    monkeypatch.setattr(mcp_server, "admission", AdmissionController({"call_face_matcher": (1, 1)}, queue_timeout=5))
+
+    async def slow_matcher(source, target, **kwargs):
+        await asyncio.sleep(0.2)
+        return {"success": True, "results": []}
+
+    monkeypatch.setattr(mcp_server, "face_matcher_async", slow_matcher)
+
+    async def call():
+        async with Client(mcp_server.mcp) as client:
+            result = await client.call_tool("call_face_matcher", {"source_image_path": "a.jpg",
+                                                                  "target_image_path": "b.jpg"})
+            return result.structured_content
+
+    try:
+        results = await asyncio.gather(*[call() for _ in range(4)])
+    finally:
+        executors.shutdown()
+
+    assert sum(result["success"] for result in results) == 2
+    shed = [result for result in results if result.get("overloaded")]
+    assert len(shed) == 2 and all(result["reason"] == "queue_full" for result in shed)
+
+
+async def test_load_route_reports_stats(monkeypatch):
+    controller = AdmissionController({"call_face_matcher": (1, 0)})
+    monkeypatch.setattr(mcp_server, "admission", controller)
+    transport = httpx.ASGITransport(app=mcp_server.mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        idle = await client.get("/load")
+        async with controller.admit("call_face_matcher"):
+            busy = await client.get("/load")
+    assert idle.status_code == 200 and idle.json()["tools"]["call_face_matcher"]["active"] == 0
+    assert busy.status_code == 503 and busy.json()["overloaded"] is True
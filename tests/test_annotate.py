@@ -0,0 +1,69 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from face_recognition.annotate import annotate_image, encode_image, normalize_format, render_annotations
+from face_recognition.draw_bounding_box_on_image import draw_object_rectangle
+from face_recognition.utils import clear_image_cache
+
+
+@pytest.fixture
+def image():
+    return np.zeros((100, 120, 3), dtype=np.uint8)
+
+
+def test_render_annotations_draws_on_copy(image):
+    """All boxes and landmarks are drawn in one pass without touching the input."""
+    canvas = render_annotations(image, [
+        {"bbox": [10, 10, 40, 40], "label": "alice"},
+        {"bbox": [60, 50, 30, 30], "landmarks": {"nose": [75.0, 65.0]}},
+    ], box_format="xywh")
+    assert not image.any()
+    assert tuple(canvas[50, 20]) == (255, 0, 0)
+    assert tuple(canvas[50, 70]) == (255, 0, 0)
+    assert tuple(canvas[65, 75]) == (0, 255, 255)
+
+
+def test_encode_image_mime_types(image):
+    data, mime = encode_image(image, "png")
+    assert mime == "image/png" and data.startswith(b"\x89PNG")
+    data, mime = encode_image(image, "JPG")
+    assert mime == "image/jpeg" and data.startswith(b"\xff\xd8")
+    with pytest.raises(ValueError):
+        normalize_format("gif")
+
+
+def test_annotate_image_round_trip(image):
+    data, _ = annotate_image(image, [{"bbox": [0, 0, 50, 50]}], image_format="png")
+    decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    assert tuple(decoded[0, 25]) == (255, 0, 0)
+
+
+class FakeToolContext:
+    def __init__(self):
+        self.artifacts = {}
+        self.state = {}
+
+    async def save_artifact(self, filename, part):
+        self.artifacts[filename] = part
+        return 0
+
+
+async def test_draw_object_rectangle_saves_in_memory(tmpdir, image):
+    """The artifact carries the requested MIME type, has a unique name and no file is written."""
+    path = os.path.join(tmpdir, "target.png")
+    cv2.imwrite(path, image)
+    clear_image_cache()
+    context = FakeToolContext()
+
+    first = await draw_object_rectangle(path, [10, 10, 20, 20], context,
+                                        bounding_boxes=[[50, 50, 20, 20]], labels=["a", "b"])
+    second = await draw_object_rectangle(path, [10, 10, 20, 20], context, image_format="png")
+
+    assert first["status"] == "success" and first["boxes_drawn"] == 2
+    assert first["filename"] != second["filename"]
+    assert first["filename"].endswith(".jpg") and second["filename"].endswith(".png")
+    assert context.artifacts[first["filename"]].inline_data.mime_type == "image/jpeg"
+    assert context.artifacts[second["filename"]].inline_data.mime_type == "image/png"
+    assert not os.path.exists("./result_with_bbox.jpg")
+    assert os.listdir(tmpdir) == ["target.png"]
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import cv2
+import numpy as np
+import pytest
+from face_recognition.artifacts import (
+    ARTIFACT_HASHES_KEY, file_hash, make_preview, read_file, save_artifact_once, save_file_artifact
+)
+from face_recognition.fetch_image import fetch_image, show_image
+from face_recognition.utils import clear_image_cache
+
+
+class FakeToolContext:
+    def __init__(self):
+        self.state = {}
+        self.saved = []
+
+    async def save_artifact(self, filename, part):
+        self.saved.append((filename, part))
+        return len(self.saved) - 1
+
+
+@pytest.fixture
+def photo(tmpdir):
+    path = os.path.join(tmpdir, "photo.jpg")
+    cv2.imwrite(path, np.random.default_rng(0).integers(0, 255, (1200, 1600, 3), dtype=np.uint8))
+    clear_image_cache()
+    yield path
+    clear_image_cache()
+
+
+def test_file_hash_and_read(photo):
+    data = open(photo, "rb").read()
+    assert read_file(photo) == data
+    assert file_hash(photo) == hashlib.sha256(data).hexdigest()
+
+
+def test_make_preview_is_bounded_and_cached(photo):
+    preview = make_preview(photo, max_side=640)
+    assert make_preview(photo, max_side=640) is preview
+    decoded = cv2.imdecode(np.frombuffer(preview, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (480, 640, 3)
+    assert len(preview) < os.path.getsize(photo)
+
+
+async def test_identical_content_is_uploaded_once():
+    context = FakeToolContext()
+    first = await save_artifact_once(context, "a.png", b"same", "image/png")
+    second = await save_artifact_once(context, "b.png", b"same", "image/png")
+    third = await save_artifact_once(context, "c.png", b"different", "image/png")
+
+    assert len(context.saved) == 2
+    assert not first["deduplicated"] and second["deduplicated"]
+    assert second["filename"] == "a.png" and third["filename"] == "c.png"
+    assert first["sha256"] in context.state[ARTIFACT_HASHES_KEY]
+
+
+async def test_save_file_artifact_guesses_mime_type(photo):
+    context = FakeToolContext()
+    await save_file_artifact(context, photo)
+    result = await save_file_artifact(context, photo)
+    assert result["deduplicated"]
+    assert len(context.saved) == 1
+    assert context.saved[0][1].inline_data.mime_type == "image/jpeg"
+
+
+async def test_fetch_image_saves_preview_once(photo):
+    context = FakeToolContext()
+    first = await fetch_image(photo, context)
+    second = await fetch_image(photo, context)
+    assert first["status"] == "success" and second["deduplicated"]
+    assert len(context.saved) == 1
+    assert context.saved[0][0] == "photo_preview_640.jpg"
+
+    missing = await fetch_image(photo + ".missing", context)
+    assert missing["status"] == "failed"
+
+
+async def test_fetch_image_falls_back_to_original_for_non_images(tmpdir):
+    """Files that cannot be previewed are stored as they are."""
+    path = os.path.join(tmpdir, "notes.txt")
+    with open(path, "wb") as f:
+        f.write(b"not an image")
+    context = FakeToolContext()
+    result = await fetch_image(path, context)
+    assert result["status"] == "success"
+    assert context.saved[0][0] == "notes.txt"
+    assert context.saved[0][1].inline_data.data == b"not an image"
+
+
+def test_show_image_reports_unreadable_image(tmpdir):
+    """An image that cannot be loaded is reported instead of crashing the encoder."""
+    path = os.path.join(tmpdir, "broken.jpg")
+    with open(path, "wb") as f:
+        f.write(b"not an image")
+    result = show_image(path)
+    assert result["status"] == "failed"
+    assert result["filename"] == path
@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+import cv2
+import numpy as np
+import pytest
+from face_recognition.batch import list_targets, load_checkpoint, run_batch
+from face_recognition.face_matcher import face_matcher
+
+
+@pytest.fixture
+def image_dir(tmpdir):
+    """A directory with a few (empty) image files and a non-image file."""
+    for name in ["b.jpg", "a.png", "c.jpeg", "notes.txt"]:
+        open(os.path.join(tmpdir, name), "w").close()
+    return str(tmpdir)
+
+
+def _fake_matcher(sources, target, **kwargs):
+    return {"success": True, "results": [], "sources": sources, "target_mode": kwargs.get("target_mode")}
+
+
+def test_list_targets_directory(image_dir):
+    """Only image files are listed, sorted."""
+    targets = list_targets(image_dir)
+    assert [os.path.basename(t) for t in targets] == ["a.png", "b.jpg", "c.jpeg"]
+
+
+def test_list_targets_manifest(tmpdir):
+    """Text and JSONL manifests resolve relative paths against the manifest."""
+    manifest = os.path.join(tmpdir, "manifest.txt")
+    with open(manifest, "w") as f:
+        f.write("one.jpg\n# comment\n\n{\"path\": \"/abs/two.jpg\"}\n")
+    assert list_targets(manifest) == [os.path.join(tmpdir, "one.jpg"), "/abs/two.jpg"]
+
+
+def test_run_batch_writes_jsonl(image_dir, tmpdir):
+    """Every target gets one JSONL record."""
+    output = os.path.join(tmpdir, "out.jsonl")
+    summary = run_batch(["src.jpg"], list_targets(image_dir), output, workers=2, matcher=_fake_matcher,
+                        matcher_kwargs={"target_mode": "crops"}, progress=lambda line: None)
+    records = [json.loads(line) for line in open(output)]
+    assert summary["processed"] == 3
+    assert len(records) == 3
+    assert all(r["success"] and r["result"]["target_mode"] == "crops" for r in records)
+
+
+def test_run_batch_resumes_and_retries_failures(image_dir, tmpdir):
+    """Completed targets are skipped on resume; failed and torn records are redone."""
+    targets = list_targets(image_dir)
+    output = os.path.join(tmpdir, "out.jsonl")
+    with open(output, "w") as f:
+        f.write(json.dumps({"target": targets[0], "success": True}) + "\n")
+        f.write(json.dumps({"target": targets[1], "success": False, "error": "boom"}) + "\n")
+        f.write('{"target": "' + targets[2])  # killed mid-write
+
+    calls = []
+
+    def matcher(sources, target, **kwargs):
+        calls.append(target)
+        return {"success": True}
+
+    summary = run_batch(["src.jpg"], targets, output, matcher=matcher, progress=lambda line: None)
+
+    assert sorted(calls) == targets[1:]
+    assert summary["skipped"] == 1
+    assert load_checkpoint(output) == set(targets)
+
+
+def test_run_batch_records_exceptions(image_dir, tmpdir):
+    """Matcher exceptions become failed records instead of aborting the job."""
+    def matcher(sources, target, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    output = os.path.join(tmpdir, "out.jsonl")
+    summary = run_batch(["src.jpg"], list_targets(image_dir), output, matcher=matcher, progress=lambda line: None)
+    assert summary["failed"] == 3
+    assert load_checkpoint(output) == set()
+
+
+def test_run_batch_on_record_can_stop_the_run(image_dir, tmpdir):
+    """Raising from on_record stops the run; written records stay as the checkpoint."""
+    output = os.path.join(tmpdir, "out.jsonl")
+    seen = []
+
+    def on_record(record, processed, pending):
+        seen.append((processed, pending))
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(["src.jpg"], list_targets(image_dir), output, workers=1, matcher=_fake_matcher,
+                  progress=lambda line: None, on_record=on_record)
+    assert seen == [(1, 3)]
+    assert len(load_checkpoint(output)) >= 1
+
+
+def _crop_value_identifier(base_image_path, image_to_search_path):
+    """Report the brightness of the crop it was given, after giving other workers time to write theirs."""
+    time.sleep(0.02)
+    return {"success": True, "is_match": True, "crop_value": int(cv2.imread(base_image_path)[0, 0, 0])}
+
+
+@patch("face_recognition.face_matcher.identify_face", side_effect=_crop_value_identifier)
+@patch("face_recognition.face_matcher.detect_faces",
+       return_value={"success": True, "faces": [{"face_id": "face_1", "bbox": [0, 0, 20, 20]}]})
+def test_run_batch_concurrent_matches_use_their_own_crops(mock_detect_faces, mock_identify_face, tmpdir, monkeypatch):
+    """Matches running on parallel workers identify their own crops, not another worker's."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmpdir))
+    sources = {}
+    for i in range(12):
+        source = os.path.join(tmpdir, f"source_{i}.png")
+        cv2.imwrite(source, np.full((20, 20, 3), i * 20, dtype=np.uint8))
+        sources[os.path.join(tmpdir, f"target_{i}.png")] = source
+
+    def matcher(_, target, **kwargs):
+        return face_matcher(sources[target], target, dedup=False)
+
+    output = os.path.join(tmpdir, "out.jsonl")
+    summary = run_batch(["unused.png"], list(sources), output, workers=4, matcher=matcher, progress=lambda line: None)
+
+    assert summary["failed"] == 0
+    for record in map(json.loads, open(output)):
+        expected = int(cv2.imread(sources[record["target"]])[0, 0, 0])
+        assert record["result"]["results"][0]["identification_result"]["crop_value"] == expected
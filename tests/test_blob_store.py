@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import os
+from unittest.mock import patch
+import pytest
+from fastmcp import Client
+import mcp_server
+from face_recognition.blob_store import BlobStore, decode_base64, parse_ref, upload_file
+from face_recognition.executors import ToolExecutors
+
+
+@pytest.fixture
+def store(tmpdir):
+    return BlobStore(os.path.join(tmpdir, "blobs"), max_blob_bytes=1024)
+
+
+def test_put_is_content_addressed(store):
+    ref = store.put(b"image bytes")
+    assert ref == "sha256:" + hashlib.sha256(b"image bytes").hexdigest()
+    assert store.put(b"image bytes") == ref
+    assert store.exists(ref)
+    assert store.read(ref) == b"image bytes"
+    with pytest.raises(ValueError):
+        store.put(b"x" * 2048)
+
+
+def test_resolve_forms(store, tmpdir):
+    ref = store.put(b"abc")
+    assert open(store.resolve(ref), "rb").read() == b"abc"
+    data_uri = "data:image/jpeg;base64," + base64.b64encode(b"inline").decode()
+    assert open(store.resolve(data_uri), "rb").read() == b"inline"
+    assert store.resolve("/some/path.jpg") == "/some/path.jpg"
+    with pytest.raises(FileNotFoundError):
+        store.resolve("sha256:" + "0" * 64)
+    with pytest.raises(ValueError):
+        parse_ref("sha256:../../etc/passwd")
+
+
+def test_chunked_upload(store):
+    upload_id = store.begin_upload()
+    assert store.append_chunk(upload_id, 0, b"hello ") == 6
+    assert store.append_chunk(upload_id, 0, b"hello ") == 6  # retried chunk is ignored
+    with pytest.raises(ValueError):
+        store.append_chunk(upload_id, 3, b"gap")
+    store.append_chunk(upload_id, 6, b"world")
+    ref = store.finish_upload(upload_id, hashlib.sha256(b"hello world").hexdigest())
+    assert store.read(ref) == b"hello world"
+    with pytest.raises(KeyError):
+        store.finish_upload(upload_id)
+
+
+def test_chunked_upload_digest_mismatch(store):
+    upload_id = store.begin_upload()
+    store.append_chunk(upload_id, 0, b"data")
+    with pytest.raises(ValueError):
+        store.finish_upload(upload_id, "sha256:" + "0" * 64)
+
+
+def test_decode_base64_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_base64("not base64!")
+
+
+@pytest.fixture
+def server_store(tmpdir, monkeypatch):
+    store = BlobStore(os.path.join(tmpdir, "server_blobs"))
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "blob_store", store)
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    yield store
+    executors.shutdown()
+
+
+@pytest.mark.parametrize("size", [100, 3 * 1024 * 1024])
+@patch('mcp_server.detect_faces_batch')
+async def test_upload_then_reference_by_hash(mock_detect, size, server_store, tmpdir):
+    """Images are uploaded once (inline or chunked) and later calls pass only the hash."""
+    mock_detect.side_effect = lambda paths: [{"success": True, "faces": [], "total_faces": 0,
+                                              "size": os.path.getsize(path)} for path in paths]
+    local = os.path.join(tmpdir, "local.jpg")
+    with open(local, "wb") as f:
+        f.write(os.urandom(size))
+
+    async with Client(mcp_server.mcp) as client:
+        ref = await upload_file(client, local)
+        assert server_store.exists(ref)
+        with patch.object(server_store, "put", side_effect=AssertionError("re-sent")), \
+                patch.object(server_store, "begin_upload", side_effect=AssertionError("re-sent")):
+            assert await upload_file(client, local) == ref
+        result = await client.call_tool("call_detect_faces", {"image_path": ref})
+        missing = await client.call_tool("call_detect_faces", {"image_path": "sha256:" + "1" * 64})
+        contents = await client.read_resource(f"blob://{ref.split(':')[1]}")
+
+    assert result.structured_content["size"] == size
+    assert missing.structured_content["success"] is False
+    assert base64.b64decode(contents[0].blob) == open(local, "rb").read()
+
+
+async def test_upload_file_raises_the_servers_error(server_store, tmpdir, monkeypatch):
+    """A rejected upload raises with the server's message instead of a KeyError on the missing ref."""
+    monkeypatch.setattr(mcp_server._blob_config, "max_inline_bytes", 10)
+    local = os.path.join(tmpdir, "local.jpg")
+    with open(local, "wb") as f:
+        f.write(os.urandom(100))
+
+    async with Client(mcp_server.mcp) as client:
+        with pytest.raises(RuntimeError, match="upload_blob failed: Payload exceeds 10 bytes"):
+            await upload_file(client, local)
+
+
+@patch('mcp_server.TrackIdentifier')
+@patch('mcp_server.crop_identifier')
+@patch('mcp_server.stream_detections')
+async def test_stream_detections_resolves_blob_references(mock_stream, mock_crop_identifier, mock_track_identifier,
+                                                          server_store):
+    """Both the video and the reference face may be passed as blob references."""
+    mock_stream.return_value = iter([])
+    mock_track_identifier.return_value.stats.return_value = {"identify_calls": 0}
+    video_ref = server_store.put(b"video bytes")
+    face_ref = server_store.put(b"face bytes")
+
+    async with Client(mcp_server.mcp) as client:
+        result = await client.call_tool("call_stream_detections", {"source": video_ref, "source_image_path": face_ref})
+        missing = await client.call_tool("call_stream_detections", {"source": "sha256:" + "1" * 64})
+
+    assert result.structured_content["success"] is True
+    assert mock_stream.call_args.args[0] == server_store.resolve(video_ref)
+    mock_crop_identifier.assert_called_once_with(server_store.resolve(face_ref))
+    assert missing.structured_content["success"] is False
+    assert "Blob not found" in missing.structured_content["error"]
+    assert mock_stream.call_count == 1
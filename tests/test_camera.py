@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+import pytest
+from face_recognition import camera
+from face_recognition.camera import CameraSession, capture_image, close_camera_sessions
+
+
+@pytest.fixture
+def video_path(tmpdir):
+    """Write a short MJPG video whose frames encode their index in brightness."""
+    path = os.path.join(tmpdir, "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    yield path
+    close_camera_sessions()
+
+
+def test_camera_session_reads_video_file(video_path):
+    """A session over a video file grabs frames in the background."""
+    with CameraSession(video_path) as session:
+        ok, frame = session.read()
+        assert ok
+        assert frame.shape == (48, 64, 3)
+        first_seq = session.frame_count
+        time.sleep(0.2)
+        assert session.frame_count > first_seq
+
+
+def test_camera_session_latest_frame_is_fresh(video_path):
+    """Later reads return newer frames without reopening the source."""
+    with CameraSession(video_path, loop=False) as session:
+        seq, frame = session.wait_for_frame(after_seq=0)
+        assert frame is not None
+        newer_seq, newer = session.wait_for_frame(after_seq=seq)
+        assert newer_seq > seq
+
+
+def test_capture_image_from_video_source(video_path, tmpdir):
+    """capture_image accepts a video file as its source and returns quickly once warm."""
+    output_path = os.path.join(tmpdir, "capture.jpg")
+    assert capture_image(output_path, source=video_path)["success"] is True
+
+    started = time.perf_counter()
+    result = capture_image(output_path, source=video_path)
+    assert result["success"] is True
+    assert time.perf_counter() - started < 0.5
+    assert cv2.imread(output_path) is not None
+
+
+def test_capture_image_bad_source(tmpdir):
+    """An unopenable source reports an error."""
+    result = capture_image(os.path.join(tmpdir, "x.jpg"), source=os.path.join(tmpdir, "missing.avi"))
+    assert result["success"] is False
+
+
+def test_ended_source_is_not_reported_as_fresh_capture(video_path):
+    """Once a source stops producing frames and cannot be reopened, reads fail instead of reusing the last frame."""
+    session = CameraSession(video_path, loop=False)
+    assert session.start()
+    assert session.read()[0]
+    deadline = time.monotonic() + 5
+    while session.is_running and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not session.is_running
+    assert session.latest() == (0, None)
+
+    os.remove(video_path)
+    assert session.read() == (False, None)
+    session.stop()
+
+
+def test_concurrent_first_captures_open_the_source_once(video_path, tmpdir, monkeypatch):
+    """Parallel first captures on one source share a single capture and grabber thread."""
+    opened = []
+    open_capture = camera._open_capture
+
+    def counting_open(source):
+        opened.append(source)
+        time.sleep(0.05)  # widen the window in which the other callers arrive
+        return open_capture(source)
+
+    monkeypatch.setattr(camera, "_open_capture", counting_open)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def capture(i):
+        barrier.wait()
+        results.append(capture_image(os.path.join(tmpdir, f"capture_{i}.jpg"), source=video_path))
+
+    threads = [threading.Thread(target=capture, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result["success"] for result in results)
+    assert len(opened) == 1
+    assert len([t for t in threading.enumerate() if t.name == f"camera-{video_path}"]) == 1
@@ -0,0 +1,65 @@
+import asyncio
+import math
+import threading
+import time
+import pytest
+from fastmcp import Client
+import mcp_server
+from face_recognition.executors import ToolExecutors
+from face_recognition.request_batcher import RequestBatcher
+
+
+def slow_detect(image_path):
+    time.sleep(0.3)
+    return {"success": True, "error": None, "faces": [], "total_faces": 0,
+            "thread": threading.current_thread().name}
+
+
+async def test_run_io_and_cpu_threads():
+    executors = ToolExecutors(cpu_workers=2, io_workers=2, cpu_executor="thread")
+    try:
+        assert not executors.stats()["cpu_started"]
+        assert await executors.run_cpu(math.factorial, 5) == 120
+        assert await executors.run_io(sorted, [3, 1, 2], reverse=True) == [3, 2, 1]
+        assert executors.stats()["cpu_started"] and executors.stats()["io_started"]
+    finally:
+        executors.shutdown()
+
+
+async def test_run_cpu_in_process_pool():
+    executors = ToolExecutors(cpu_workers=1, cpu_executor="process")
+    try:
+        assert await executors.run_cpu(math.factorial, 6) == 720
+    finally:
+        executors.shutdown()
+
+
+def test_invalid_cpu_executor():
+    with pytest.raises(ValueError):
+        ToolExecutors(cpu_executor="fiber")
+
+
+async def test_concurrent_tool_calls_overlap(monkeypatch):
+    """Blocking tool work runs in the pool, so concurrent clients are served in parallel."""
+    executors = ToolExecutors(cpu_workers=4, cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    monkeypatch.setattr(mcp_server, "detect_faces_batch", lambda paths: [slow_detect(p) for p in paths])
+    # One request per batch, so every call needs its own worker
+    monkeypatch.setattr(mcp_server, "detection_batcher", RequestBatcher(
+        lambda paths: executors.run_cpu(mcp_server.detect_faces_batch, paths), max_batch_size=1))
+
+    async def call(index):
+        # Distinct images, so the calls are not coalesced into one
+        async with Client(mcp_server.mcp) as client:
+            return await client.call_tool("call_detect_faces", {"image_path": f"image_{index}.jpg"})
+
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*[call(index) for index in range(4)])
+        elapsed = time.perf_counter() - started
+    finally:
+        executors.shutdown()
+
+    assert all(result.structured_content["success"] for result in results)
+    assert len({result.structured_content["thread"] for result in results}) == 4
+    assert elapsed < 1.0
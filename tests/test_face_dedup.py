@@ -0,0 +1,48 @@
+import numpy as np
+import cv2
+from face_recognition.face_dedup import cluster_faces, dedup_stats, dhash, hamming_distance
+
+
+def _textured_face(seed: int, size: int = 64) -> np.ndarray:
+    """Create a deterministic textured crop."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (8, 8, 3), dtype=np.uint8)
+    return cv2.resize(small, (size, size), interpolation=cv2.INTER_NEAREST)
+
+
+def test_dhash_identical_images():
+    """Identical crops have identical hashes."""
+    face = _textured_face(1)
+    assert hamming_distance(dhash(face), dhash(face.copy())) == 0
+
+
+def test_cluster_faces_groups_near_duplicates():
+    """Rescaled and slightly noisy copies of a face share one cluster."""
+    face_a = _textured_face(1)
+    face_b = _textured_face(2)
+    face_a_small = cv2.resize(face_a, (48, 48))
+    noisy = np.clip(face_a.astype(int) + 3, 0, 255).astype(np.uint8)
+
+    clusters = cluster_faces([face_a_small, face_b, face_a, noisy])
+
+    assert len(clusters) == 2
+    cluster_a = next(c for c in clusters if 0 in c)
+    assert sorted(cluster_a) == [0, 2, 3]
+    # The largest crop is the representative
+    assert cluster_a[0] in (2, 3)
+
+
+def test_cluster_faces_never_merges_flat_crops():
+    """Blank crops carry no structure and stay in their own clusters."""
+    blank = np.zeros((40, 40, 3), dtype=np.uint8)
+    clusters = cluster_faces([blank, blank.copy()])
+    assert len(clusters) == 2
+
+
+def test_dedup_stats():
+    """Dedup ratio is the fraction of crops that were suppressed."""
+    stats = dedup_stats(4, [[0, 1, 2], [3]])
+    assert stats["unique_clusters"] == 2
+    assert stats["suppressed"] == 2
+    assert stats["dedup_ratio"] == 0.5
+    assert dedup_stats(0, [])["dedup_ratio"] == 0.0
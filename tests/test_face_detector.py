@@ -0,0 +1,90 @@
+import os
+from unittest.mock import patch
+import cv2
+import numpy as np
+import pytest
+from face_recognition.face_detector import decode_for_detection, detect_faces, detect_faces_batch
+from face_recognition.utils import clear_image_cache
+
+
+@pytest.fixture
+def photo(tmpdir):
+    """A 12 MP JPEG, far larger than the resolution RetinaFace runs at."""
+    path = os.path.join(tmpdir, "photo.jpg")
+    cv2.imwrite(path, np.zeros((3000, 4000, 3), dtype=np.uint8))
+    clear_image_cache()
+    yield path
+    clear_image_cache()
+
+
+def test_decode_for_detection_reduces_large_images(photo):
+    image, reduction = decode_for_detection(photo)
+    assert reduction == 2
+    assert image.shape == (1500, 2000, 3)
+
+
+@patch('face_recognition.face_detector.RetinaFace.detect_faces')
+def test_detect_faces_maps_back_to_full_resolution(mock_detect, photo):
+    """Detections on the reduced decode are reported in full-resolution coordinates."""
+    mock_detect.return_value = {
+        "face_1": {
+            "facial_area": [100, 50, 200, 175],
+            "landmarks": {"left_eye": [130.5, 90.0]},
+            "score": 0.99,
+        }
+    }
+
+    result = detect_faces(photo)
+
+    assert mock_detect.call_args[0][0].shape == (1500, 2000, 3)
+    assert result["decode_reduction"] == 2
+    face = result["faces"][0]
+    assert face["bbox"] == [200, 100, 400, 350]
+    assert face["landmarks"]["left_eye"] == [261.0, 180.0]
+
+
+def fake_net_out(batch):
+    """RetinaFace-shaped outputs where only the first image in the batch has a confident face."""
+    outputs = []
+    for stride in (32, 16, 8):
+        height, width = -(-batch.shape[1] // stride), -(-batch.shape[2] // stride)
+        scores = np.zeros((len(batch), height, width, 4), dtype=np.float32)
+        scores[0, 4, 4, 2] = 0.95 if stride == 32 else 0
+        outputs += [scores, np.zeros((len(batch), height, width, 8), dtype=np.float32),
+                    np.zeros((len(batch), height, width, 20), dtype=np.float32)]
+    return outputs
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = array
+
+    def numpy(self):
+        return self.array
+
+
+@patch('face_recognition.face_detector.RetinaFace.build_model')
+def test_detect_faces_batch_runs_one_pass_per_shape(mock_build, tmpdir):
+    """Same-shape images share one forward pass and each gets its own slice of the output."""
+    batch_sizes = []
+
+    def model(batch):
+        batch_sizes.append(len(batch))
+        return [FakeTensor(output) for output in fake_net_out(batch)]
+
+    mock_build.return_value = model
+    paths = []
+    for name, shape in [("a.jpg", (200, 300, 3)), ("b.jpg", (200, 300, 3)), ("c.jpg", (300, 200, 3))]:
+        paths.append(os.path.join(tmpdir, name))
+        cv2.imwrite(paths[-1], np.zeros(shape, dtype=np.uint8))
+    paths.insert(1, os.path.join(tmpdir, "missing.jpg"))
+    clear_image_cache()
+
+    results = detect_faces_batch(paths)
+
+    assert sorted(batch_sizes) == [1, 2]
+    assert [result["success"] for result in results] == [True, False, True, True]
+    assert "not found" in results[1]["error"]
+    # Only row 0 of each batch carries a face: image a in its bucket and image c alone in its own
+    assert [result["total_faces"] for result in results] == [1, 0, 0, 1]
+    assert results[0]["faces"][0]["confidence"] == pytest.approx(0.95)
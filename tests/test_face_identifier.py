@@ -0,0 +1,130 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from face_recognition import face_identifier
+from face_recognition.face_identifier import build_face_mosaic, identify_face, identify_face_async
+
+
+@pytest.fixture
+def base_and_target(tmpdir):
+    """Create a base crop and a larger target image."""
+    base_path = os.path.join(tmpdir, "base.jpg")
+    target_path = os.path.join(tmpdir, "target.jpg")
+    cv2.imwrite(base_path, np.full((40, 40, 3), 128, dtype=np.uint8))
+    cv2.imwrite(target_path, np.full((1080, 1920, 3), 64, dtype=np.uint8))
+    return base_path, target_path
+
+
+def test_build_face_mosaic_layout():
+    """Faces are tiled into a square grid of fixed-size tiles."""
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    faces = [{"bbox": [0, 0, 50, 80]}, {"bbox": [60, 60, 100, 100]}, {"bbox": [120, 10, 190, 60]}]
+    mosaic = build_face_mosaic(image, faces, tile_size=64)
+    assert mosaic.shape == (128, 128, 3)
+
+
+@patch('face_recognition.face_identifier.genai')
+@patch('face_recognition.face_identifier.detect_faces')
+def test_identify_face_crops_mode_returns_local_bbox(mock_detect_faces, mock_genai, base_and_target):
+    """Crops mode maps the matched tile back to the exact local detection box."""
+    base_path, target_path = base_and_target
+    mock_detect_faces.return_value = {
+        "success": True,
+        "faces": [
+            {"face_id": "face_1", "bbox": [100, 100, 200, 220]},
+            {"face_id": "face_2", "bbox": [800, 300, 950, 480]}
+        ]
+    }
+    model = MagicMock()
+    model.generate_content.return_value.text = '```json\n{"match": "yes", "tile": 1}\n```'
+    mock_genai.GenerativeModel.return_value = model
+
+    result = identify_face(base_path, target_path, target_mode="crops")
+
+    assert result["success"] is True
+    assert result["is_match"] is True
+    assert result["bounding_box"] == [800, 300, 150, 180]
+    assert result["target_face_id"] == "face_2"
+    # Only the base crop and a compact mosaic are uploaded
+    assert 0 < result["payload_bytes"] < os.path.getsize(target_path) + os.path.getsize(base_path)
+    parts = model.generate_content.call_args[0][0]
+    assert all(part["mime_type"] == "image/jpeg" for part in parts[1:])
+
+
+@patch('face_recognition.face_identifier.genai')
+def test_identify_face_crops_mode_without_target_faces(mock_genai, base_and_target):
+    """No remote call is made when the target has no detected faces."""
+    base_path, target_path = base_and_target
+    result = identify_face(base_path, target_path, target_mode="crops", target_faces=[])
+    assert result["success"] is True
+    assert result["is_match"] is False
+    mock_genai.GenerativeModel.assert_not_called()
+
+
+@patch('face_recognition.face_identifier.genai')
+@patch('face_recognition.face_identifier.detect_faces')
+async def test_identify_face_async_uses_async_client(mock_detect_faces, mock_genai, base_and_target):
+    """The async variant detects in the executor and awaits Gemini's async API."""
+    base_path, target_path = base_and_target
+    mock_detect_faces.return_value = {"success": True, "faces": [{"face_id": "face_1", "bbox": [10, 10, 90, 90]}]}
+    model = MagicMock()
+    model.generate_content_async = AsyncMock()
+    model.generate_content_async.return_value.text = '{"match": "yes", "tile": 0}'
+    mock_genai.GenerativeModel.return_value = model
+
+    result = await identify_face_async(base_path, target_path, target_mode="crops")
+
+    assert result["is_match"] is True
+    assert result["bounding_box"] == [10, 10, 80, 80]
+    model.generate_content.assert_not_called()
+    model.generate_content_async.assert_awaited_once()
+
+
+@patch('face_recognition.face_identifier.genai')
+@patch('face_recognition.face_identifier.detect_faces')
+async def test_identify_face_async_uses_the_given_runners(mock_detect_faces, mock_genai, base_and_target):
+    """Target detection goes through run_cpu and request building through run_io."""
+    base_path, target_path = base_and_target
+    mock_detect_faces.return_value = {"success": True, "faces": [{"face_id": "face_1", "bbox": [10, 10, 90, 90]}]}
+    model = MagicMock()
+    model.generate_content_async = AsyncMock()
+    model.generate_content_async.return_value.text = '{"match": "no", "tile": null}'
+    mock_genai.GenerativeModel.return_value = model
+    calls = []
+
+    def runner(name):
+        async def run(fn, *args, **kwargs):
+            calls.append((name, fn))
+            return fn(*args, **kwargs)
+        return run
+
+    result = await identify_face_async(base_path, target_path, target_mode="crops",
+                                       run_cpu=runner("cpu"), run_io=runner("io"))
+
+    assert result["success"] is True
+    assert calls == [("cpu", mock_detect_faces), ("io", face_identifier._prepare_request)]
+
+
+@patch('face_recognition.face_identifier.genai')
+def test_identify_face_rejects_unknown_target_mode(mock_genai, base_and_target):
+    base_path, target_path = base_and_target
+    result = identify_face(base_path, target_path, target_mode="mosaic")
+    assert result["success"] is False
+    assert "mosaic" in result["error"]
+    mock_genai.GenerativeModel.assert_not_called()
+
+
+@patch('face_recognition.face_identifier.genai')
+def test_identify_face_full_mode_reports_uploaded_bytes(mock_genai, base_and_target):
+    """The reported payload is the re-encoded, reduced upload rather than the files on disk."""
+    base_path, target_path = base_and_target
+    model = MagicMock()
+    model.generate_content.return_value.text = '{"match": "no", "bounding_box": null}'
+    mock_genai.GenerativeModel.return_value = model
+
+    result = identify_face(base_path, target_path)
+
+    parts = model.generate_content.call_args[0][0]
+    assert result["payload_bytes"] == len(parts[1]["data"]) + len(parts[2]["data"])
@@ -2,9 +2,18 @@
 import pytest
 import cv2
 import numpy as np
+import asyncio
 import os
+import tempfile
 from unittest.mock import patch, MagicMock
-from face_recognition.face_matcher import face_matcher
+from face_recognition.face_matcher import face_matcher, face_matcher_async, prepare_match
+
+@pytest.fixture(autouse=True)
+def crop_dir(tmpdir, monkeypatch):
+    """Keep the matcher's temporary crop directories inside the test's tmpdir."""
+    crops = tmpdir.mkdir("crops")
+    monkeypatch.setattr(tempfile, "tempdir", str(crops))
+    return crops
 
 @pytest.fixture
 def create_dummy_images(tmpdir):
@@ -72,3 +81,133 @@ def test_face_matcher_source_not_found():
 
     assert result["success"] is False
     assert "Face detection failed" in result["error"]
+
+@patch('face_recognition.face_matcher.detect_faces')
+@patch('face_recognition.face_matcher.identify_face')
+def test_face_matcher_dedup_fans_out_result(mock_identify_face, mock_detect_faces, tmpdir):
+    """Near-duplicate crops are identified once and share the result."""
+    source_image_path = os.path.join(tmpdir, "burst.jpg")
+    target_image_path = os.path.join(tmpdir, "target.jpg")
+    rng = np.random.default_rng(0)
+    face = cv2.resize(rng.integers(0, 255, (8, 8, 3), dtype=np.uint8), (40, 40),
+                      interpolation=cv2.INTER_NEAREST)
+    image = np.zeros((50, 100, 3), dtype=np.uint8)
+    image[5:45, 5:45] = face
+    image[5:45, 55:95] = face
+    cv2.imwrite(source_image_path, image, [cv2.IMWRITE_JPEG_QUALITY, 100])
+    cv2.imwrite(target_image_path, image)
+
+    mock_detect_faces.return_value = {
+        "success": True,
+        "faces": [
+            {"face_id": "face_1", "bbox": [5, 5, 45, 45]},
+            {"face_id": "face_2", "bbox": [55, 5, 95, 45]}
+        ]
+    }
+    mock_identify_face.return_value = {"success": True, "is_match": True}
+
+    result = face_matcher(source_image_path, target_image_path)
+
+    assert mock_identify_face.call_count == 1
+    assert result["dedup"]["unique_clusters"] == 1
+    assert result["dedup"]["dedup_ratio"] == 0.5
+    assert all(r["identification_result"]["is_match"] for r in result["results"])
+
+
+@patch('face_recognition.face_matcher.detect_faces')
+@patch('face_recognition.face_matcher.identify_face')
+def test_face_matcher_reports_progress_per_cluster(mock_identify_face, mock_detect_faces, tmpdir):
+    """on_progress sees each cluster's results, and raising from it stops matching."""
+    source_image_path = os.path.join(tmpdir, "source.jpg")
+    image = np.zeros((50, 100, 3), dtype=np.uint8)
+    image[5:45, 55:95] = 255
+    cv2.imwrite(source_image_path, image)
+    mock_detect_faces.return_value = {
+        "success": True,
+        "faces": [
+            {"face_id": "face_1", "bbox": [5, 5, 45, 45]},
+            {"face_id": "face_2", "bbox": [55, 5, 95, 45]}
+        ]
+    }
+    mock_identify_face.return_value = {"success": True, "is_match": False}
+    calls = []
+
+    def on_progress(done, total, results):
+        calls.append((done, total, [r["face_id"] for r in results]))
+        if done == 1:
+            raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        face_matcher(source_image_path, source_image_path, on_progress=on_progress)
+
+    assert calls == [(0, 2, []), (1, 2, ["face_1"])]
+    assert mock_identify_face.call_count == 1
+
+
+@patch('face_recognition.face_matcher.detect_faces')
+@patch('face_recognition.face_matcher.identify_face')
+def test_face_matcher_removes_its_crops(mock_identify_face, mock_detect_faces, create_dummy_images, crop_dir):
+    """Crop files exist while identifying and are removed afterwards, also when matching fails."""
+    source_image_path, target_image_path = create_dummy_images
+    mock_detect_faces.return_value = {"success": True, "faces": [{"face_id": "face_1", "bbox": [10, 10, 50, 50]}]}
+    seen = []
+
+    def identify(base_image_path, image_to_search_path):
+        seen.append(os.path.exists(base_image_path))
+        return {"success": True, "is_match": True}
+
+    mock_identify_face.side_effect = identify
+    assert face_matcher(source_image_path, target_image_path)["success"]
+    assert seen == [True]
+    assert crop_dir.listdir() == []
+
+    mock_identify_face.side_effect = RuntimeError("identifier down")
+    with pytest.raises(RuntimeError):
+        face_matcher(source_image_path, target_image_path)
+    assert crop_dir.listdir() == []
+
+
+@patch('face_recognition.face_matcher.detect_faces')
+@patch('face_recognition.face_matcher.identify_face_async')
+async def test_face_matcher_async_splits_cpu_and_identification(mock_identify_face_async, mock_detect_faces,
+                                                                 create_dummy_images, crop_dir):
+    """Detection and cropping go through run_cpu; clusters are identified concurrently on the loop."""
+    source_image_path, target_image_path = create_dummy_images
+    mock_detect_faces.return_value = {
+        "success": True,
+        "faces": [{"face_id": f"face_{i}", "bbox": [i * 20, 0, i * 20 + 20, 20]} for i in range(4)],
+    }
+    running = peak = 0
+
+    async def identify(base_image_path, image_to_search_path, run_cpu, run_io):
+        nonlocal running, peak
+        assert os.path.exists(base_image_path)
+        assert (run_cpu, run_io) == (fake_run_cpu, fake_run_io)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"success": True, "is_match": True}
+
+    mock_identify_face_async.side_effect = identify
+    cpu_calls = []
+
+    async def fake_run_cpu(fn, *args):
+        cpu_calls.append(fn)
+        return fn(*args)
+
+    async def fake_run_io(fn, *args):
+        return fn(*args)
+
+    progress = []
+    result = await face_matcher_async(source_image_path, target_image_path, dedup=False, run_cpu=fake_run_cpu,
+                                      run_io=fake_run_io, max_concurrent_identifications=2,
+                                      on_progress=lambda done, total, results: progress.append(done))
+
+    assert cpu_calls == [prepare_match]
+    assert result["success"] is True
+    assert [r["face_id"] for r in result["results"]] == [f"face_{i}" for i in range(4)]
+    assert all(r["identification_result"]["is_match"] for r in result["results"])
+    assert peak == 2
+    assert progress == [0, 1, 2, 3, 4]
+    assert crop_dir.listdir() == []
@@ -0,0 +1,72 @@
+import os
+import numpy as np
+from face_recognition.face_tracker import FaceTracker, TrackIdentifier, crop_identifier, iou
+
+
+def _faces(*boxes):
+    return [{"face_id": f"face_{i + 1}", "bbox": list(box), "confidence": 0.99} for i, box in enumerate(boxes)]
+
+
+def test_iou():
+    """IoU of identical, disjoint and half-overlapping boxes."""
+    assert iou([0, 0, 10, 10], [0, 0, 10, 10]) == 1.0
+    assert iou([0, 0, 10, 10], [20, 20, 30, 30]) == 0.0
+    assert abs(iou([0, 0, 10, 10], [5, 0, 15, 10]) - 1 / 3) < 1e-9
+
+
+def test_tracker_keeps_ids_for_moving_faces():
+    """Two faces moving at constant velocity keep their track ids."""
+    tracker = FaceTracker()
+    ids = None
+    for step in range(20):
+        faces = _faces((10 + 3 * step, 10, 60 + 3 * step, 70), (200, 100 + 2 * step, 250, 160 + 2 * step))
+        tracks = tracker.update(faces)
+        current = sorted(track.track_id for track in tracks)
+        ids = ids or current
+        assert current == ids
+    assert len(tracker.tracks) == 2
+
+
+def test_tracker_drops_stale_tracks_and_starts_new_ones():
+    """Tracks unseen for more than max_age frames are removed."""
+    tracker = FaceTracker(max_age=2)
+    tracker.update(_faces((0, 0, 50, 50)))
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.tracks == []
+    new = tracker.update(_faces((0, 0, 50, 50)))
+    assert new[0].track_id == 2
+
+
+def test_identifier_runs_once_per_track_until_reverify():
+    """Identification happens for new tracks and again only after the re-verification interval."""
+    now = [0.0]
+    calls = []
+
+    def identify(crop):
+        calls.append(crop.shape)
+        return {"success": True, "is_match": True}
+
+    identifier = TrackIdentifier(identify, reverify_seconds=30.0, clock=lambda: now[0])
+    tracker = FaceTracker()
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    for step in range(100):
+        now[0] = step * 0.5
+        tracks = tracker.update(_faces((10 + step, 10, 60 + step, 70)))
+        identifier.identify(tracks, frame)
+
+    # Identified at t=0 and re-verified at t=30
+    assert identifier.identify_calls == 2
+    assert tracker.tracks[0].identity == {"success": True, "is_match": True}
+    assert calls[0] == (60, 50, 3)
+
+
+def test_crop_identifier_skips_empty_crop(tmpdir):
+    """An empty crop is reported as a failed identification without calling the identifier."""
+    calls = []
+    identify = crop_identifier(os.path.join(tmpdir, "source.jpg"), identify=lambda *args: calls.append(args))
+    result = identify(np.zeros((0, 10, 3), dtype=np.uint8))
+    assert result["success"] is False
+    assert result["is_match"] is False
+    assert calls == []
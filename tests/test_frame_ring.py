@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import threading
+import uuid
+import cv2
+import numpy as np
+import pytest
+from face_recognition import camera
+from face_recognition.camera import capture_image
+from face_recognition.frame_ring import _HEARTBEAT, FrameRingConsumer, FrameRingProducer
+
+
+@pytest.fixture
+def producer():
+    """Create a small ring and remove it afterwards."""
+    ring = FrameRingProducer(f"test_{uuid.uuid4().hex[:8]}", (24, 32, 3), slots=4)
+    yield ring
+    ring.unlink()
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((24, 32, 3), value, dtype=np.uint8)
+
+
+def _read_latest_value(name, queue):
+    consumer = FrameRingConsumer(name)
+    seq, frame = consumer.latest()
+    queue.put((seq, int(frame[0, 0, 0])))
+    del frame
+    consumer.close()
+
+
+def test_consumer_reads_latest_frame(producer):
+    """Consumers see the newest frame and its sequence number."""
+    producer.write(_frame(1))
+    producer.write(_frame(2))
+    consumer = FrameRingConsumer(producer.name)
+    seq, frame = consumer.latest()
+    assert seq == 2
+    assert frame[0, 0, 0] == 2
+    assert consumer.shape == (24, 32, 3)
+    del frame
+    consumer.close()
+
+
+def test_consumer_views_are_zero_copy_and_expire(producer):
+    """Views alias shared memory and are invalidated once the ring wraps."""
+    consumer = FrameRingConsumer(producer.name)
+    producer.write(_frame(10))
+    view = consumer.get(1)
+    assert not view.flags.owndata
+    assert consumer.get(1)[0, 0, 0] == 10
+    for value in range(4):
+        producer.write(_frame(value))
+    assert consumer.get(1) is None
+    assert consumer.is_valid(1) is False
+    del view
+    consumer.close()
+
+
+def test_consumer_in_another_process(producer):
+    """A separate process can attach and read the latest frame."""
+    producer.write(_frame(42))
+    queue = multiprocessing.get_context("spawn").Queue()
+    process = multiprocessing.get_context("spawn").Process(target=_read_latest_value, args=(producer.name, queue))
+    process.start()
+    process.join(timeout=30)
+    assert queue.get(timeout=5) == (1, 42)
+
+
+def test_capture_image_from_ring(producer, tmpdir):
+    """capture_image can read from a ring with an shm:// source."""
+    producer.write(_frame(7))
+    output_path = os.path.join(tmpdir, "ring.png")
+    result = capture_image(output_path, source=f"shm://{producer.name}")
+    assert result["success"] is True
+    assert os.path.exists(output_path)
+
+
+def test_capture_image_reattaches_after_producer_restart(tmpdir):
+    """A restarted producer's new block is picked up instead of repeating the old ring's last frame."""
+    name = f"test_{uuid.uuid4().hex[:8]}"
+    output_path = os.path.join(tmpdir, "ring.png")
+    first = FrameRingProducer(name, (24, 32, 3), slots=4)
+    first.write(_frame(7))
+    assert capture_image(output_path, source=f"shm://{name}")["success"] is True
+    # The producer stops, and a new one takes over the name
+    first.header[_HEARTBEAT] = 0
+    first.unlink()
+    second = FrameRingProducer(name, (24, 32, 3), slots=4)
+    try:
+        second.write(_frame(99))
+        assert capture_image(output_path, source=f"shm://{name}")["success"] is True
+        assert cv2.imread(output_path)[0, 0, 0] == 99
+
+        # A producer that stops writing makes captures fail rather than return its last frame
+        second.header[_HEARTBEAT] = 0
+        assert capture_image(output_path, source=f"shm://{name}")["success"] is False
+        assert name not in camera._ring_consumers
+    finally:
+        second.unlink()
+
+
+def test_dropped_consumer_stays_mapped_until_reads_finish(producer):
+    """A consumer dropped by one thread is not closed under a read still running in another."""
+    producer.write(_frame(5))
+    reading = camera._acquire_ring_consumer(producer.name)
+    camera._drop_ring_consumer(producer.name, reading)
+    assert producer.name not in camera._ring_consumers
+    assert reading.consumer.read()[1][0, 0, 0] == 5
+    camera._release_ring_consumer(reading)
+    assert reading.consumer.frames is None
+
+
+def test_concurrent_ring_reads_while_consumers_are_dropped(producer):
+    """Parallel reads never see a consumer closed underneath them."""
+    producer.write(_frame(3))
+    errors = []
+
+    def read_many():
+        try:
+            for _ in range(200):
+                ret, frame = camera._read_from_ring(producer.name)
+                assert ret and frame[0, 0, 0] == 3
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        shared = camera._ring_consumers.get(producer.name)
+        if shared is not None:
+            camera._drop_ring_consumer(producer.name, shared)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_producer_rejects_wrong_shape(producer):
+    with pytest.raises(ValueError):
+        producer.write(np.zeros((10, 10, 3), dtype=np.uint8))
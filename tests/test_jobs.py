@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from fastmcp import Client
+import mcp_server
+from face_recognition.admission import AdmissionController
+from face_recognition.executors import ToolExecutors
+from face_recognition.jobs import CANCELLED, FAILED, SUCCEEDED, JobManager
+
+
+def wait_for(job, states=(SUCCEEDED, FAILED, CANCELLED), timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status not in states:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job.snapshot()
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers=1, ttl_seconds=60)
+    yield manager
+    manager.shutdown(wait=False)
+
+
+def test_job_reports_progress_and_result(manager):
+    def work(job):
+        for i in range(3):
+            job.report(i + 1, 3, [{"item": i}])
+        return {"total": 3}
+
+    snapshot = wait_for(manager.submit("count", work))
+    assert snapshot["status"] == SUCCEEDED
+    assert snapshot["progress"] == {"done": 3, "total": 3}
+    assert snapshot["partial_results"] == [{"item": 0}, {"item": 1}, {"item": 2}]
+    assert snapshot["result"] == {"total": 3}
+
+
+def test_failed_job_records_error(manager):
+    def work(job):
+        raise ValueError("bad input")
+
+    snapshot = wait_for(manager.submit("fail", work))
+    assert snapshot["status"] == FAILED
+    assert snapshot["error"] == "bad input"
+
+
+def test_cancel_running_and_queued_jobs(manager):
+    release = threading.Event()
+    started = []
+
+    def work(job):
+        started.append(job.job_id)
+        while True:
+            release.wait(0.01)
+            job.report(0)
+
+    running = manager.submit("loop", work)
+    queued = manager.submit("loop", work)
+    while not started:
+        time.sleep(0.01)
+
+    assert manager.cancel(queued.job_id).status == CANCELLED
+    manager.cancel(running.job_id)
+    assert wait_for(running)["status"] == CANCELLED
+    assert started == [running.job_id]
+
+
+def test_finished_jobs_expire_after_ttl(manager):
+    manager.ttl_seconds = 0.05
+    job = manager.submit("quick", lambda job: "done")
+    wait_for(job)
+    assert manager.get(job.job_id) is not None
+    time.sleep(0.1)
+    assert manager.get(job.job_id) is None
+
+
+def test_idempotency_key_returns_existing_job(manager):
+    first = manager.submit("quick", lambda job: "done", idempotency_key="retry-1")
+    second = manager.submit("quick", lambda job: "again", idempotency_key="retry-1")
+    assert second is first
+
+
+def test_queue_is_bounded():
+    manager = JobManager(workers=1, max_queued=1)
+    release = threading.Event()
+    try:
+        manager.submit("block", lambda job: release.wait(5))
+        time.sleep(0.05)
+        manager.submit("block", lambda job: release.wait(5))
+        with pytest.raises(RuntimeError):
+            manager.submit("block", lambda job: None)
+    finally:
+        release.set()
+        manager.shutdown()
+
+
+async def test_matcher_job_over_mcp(monkeypatch):
+    """A client submits a face_matcher job and polls it to completion, seeing partial results."""
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    monkeypatch.setattr(mcp_server, "jobs", JobManager(workers=1))
+
+    admission = AdmissionController({"call_face_matcher": (1, 1)})
+    monkeypatch.setattr(mcp_server, "admission", admission)
+
+    async def fake_matcher(source, target, target_mode, on_progress, run_cpu, **kwargs):
+        assert run_cpu == executors.run_cpu
+        on_progress(0, 2, [])
+        on_progress(1, 2, [{"face_id": "face_1"}])
+        on_progress(2, 2, [{"face_id": "face_2"}])
+        return {"success": True, "results": [{"face_id": "face_1"}, {"face_id": "face_2"}]}
+
+    monkeypatch.setattr(mcp_server, "face_matcher_async", fake_matcher)
+    try:
+        async with Client(mcp_server.mcp) as client:
+            submitted = (await client.call_tool("submit_job", {
+                "kind": "face_matcher",
+                "arguments": {"source_image_path": "a.jpg", "target_image_path": "b.jpg"},
+            })).structured_content
+            for _ in range(100):
+                status = (await client.call_tool("get_job", {"job_id": submitted["job_id"]})).structured_content
+                if status["status"] == SUCCEEDED:
+                    break
+                await asyncio.sleep(0.02)
+            unknown = (await client.call_tool("get_job", {"job_id": "missing"})).structured_content
+            bad_kind = (await client.call_tool("submit_job", {"kind": "nope", "arguments": {}})).structured_content
+    finally:
+        executors.shutdown()
+
+    assert submitted["success"] and submitted["job_id"]
+    assert status["status"] == SUCCEEDED
+    assert status["progress"] == {"done": 2, "total": 2}
+    assert [r["face_id"] for r in status["partial_results"]] == ["face_1", "face_2"]
+    assert status["result"]["success"] is True
+    assert unknown["success"] is False and bad_kind["success"] is False
+    # The job's match was admitted like an interactive call
+    assert admission.stats()["tools"]["call_face_matcher"]["admitted"] == 1
+
+
+async def test_batch_job_is_admitted_and_workers_are_capped(monkeypatch, tmpdir):
+    """A batch job runs each target under the face_matcher limit with at most that many workers."""
+    for name in ["a.jpg", "b.jpg", "c.jpg"]:
+        open(os.path.join(tmpdir, name), "w").close()
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    monkeypatch.setattr(mcp_server, "jobs", JobManager(workers=1))
+    admission = AdmissionController({"call_face_matcher": (2, 8)})
+    monkeypatch.setattr(mcp_server, "admission", admission)
+    monkeypatch.setattr(mcp_server._admission_config, "matcher_concurrency", 2)
+    peak = 0
+
+    async def fake_matcher(sources, target, **kwargs):
+        nonlocal peak
+        peak = max(peak, admission.limiters["call_face_matcher"].active)
+        await asyncio.sleep(0.02)
+        return {"success": True, "results": []}
+
+    monkeypatch.setattr(mcp_server, "face_matcher_async", fake_matcher)
+    try:
+        async with Client(mcp_server.mcp) as client:
+            submitted = (await client.call_tool("submit_job", {
+                "kind": "batch",
+                "arguments": {"source_image_paths": ["src.jpg"], "targets": str(tmpdir), "workers": 64,
+                              "output_path": os.path.join(tmpdir, "out.jsonl")},
+            })).structured_content
+            for _ in range(200):
+                status = (await client.call_tool("get_job", {"job_id": submitted["job_id"]})).structured_content
+                if status["status"] == SUCCEEDED:
+                    break
+                await asyncio.sleep(0.02)
+    finally:
+        executors.shutdown()
+
+    assert status["status"] == SUCCEEDED
+    assert status["result"]["workers"] == 2
+    assert status["result"]["processed"] == 3
+    assert admission.stats()["tools"]["call_face_matcher"]["admitted"] == 3
+    assert peak <= 2
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("tensorflow", "retinaface.RetinaFace", "google.generativeai", "google.adk")
+
+# Generous ceiling for the light import paths (numpy and OpenCV included); TensorFlow alone is several hundred MB
+RSS_BUDGET_MB = 200
+
+
+def run_probe(statement: str) -> dict:
+    probe = (f"import json, sys\nfrom benchmarks.bench_import_time import peak_rss_mb\n{statement}\n"
+             "print(json.dumps({'rss_mb': peak_rss_mb(), "
+             f"'heavy': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))")
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("statement", [
+    "import face_recognition; face_recognition.greeter('test')",
+    "import face_recognition.face_detector",
+    "import face_recognition.face_matcher",
+    "from face_recognition import face_matcher, detect_faces, identify_face",
+])
+def test_imports_do_not_load_heavy_frameworks(statement):
+    result = run_probe(statement)
+    assert result["heavy"] == []
+    assert result["rss_mb"] < RSS_BUDGET_MB
+
+
+def test_package_exports_resolve_to_functions():
+    import face_recognition
+    from face_recognition.face_matcher import face_matcher
+    assert face_recognition.face_matcher is face_matcher
+    assert face_recognition.greeter("Ada") == "Hello, Ada!"
+    with pytest.raises(AttributeError):
+        face_recognition.not_a_tool
+
+
+def test_lazy_module_imports_on_first_use():
+    from face_recognition.lazy import LazyModule
+    module = LazyModule("colorsys")
+    sys.modules.pop("colorsys", None)
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
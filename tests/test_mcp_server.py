@@ -68,13 +68,11 @@ def test_mcp_server_has_name():
 
 def test_face_detector_module_imports():
     """Test face detector module imports correctly."""
-    from face_recognition.face_detector import (
-        register_face_detector_tools,
-        convert_to_native_types
-    )
+    from face_recognition.face_detector import register_face_detector_tools
+    from face_recognition.serialization import to_jsonable
     
     assert callable(register_face_detector_tools)
-    assert callable(convert_to_native_types)
+    assert callable(to_jsonable)
 
 
 def test_face_identifier_module_imports():
@@ -109,7 +107,7 @@ def test_mcp_server_module_imports():
 
 def test_numpy_type_conversion():
     """Test numpy type conversion utility."""
-    from face_recognition.face_detector import convert_to_native_types
+    from face_recognition.serialization import to_jsonable
     
     # Test various numpy types
     test_data = {
@@ -121,7 +119,7 @@ def test_numpy_type_conversion():
         }
     }
     
-    result = convert_to_native_types(test_data)
+    result = to_jsonable(test_data)
     
     assert result["int_val"] == 100
     assert isinstance(result["int_val"], int)
@@ -132,28 +130,28 @@ def test_numpy_type_conversion():
 
 def test_numpy_int_conversion():
     """Test numpy int conversion."""
-    from face_recognition.face_detector import convert_to_native_types
+    from face_recognition.serialization import to_jsonable
     
-    result = convert_to_native_types(np.int64(42))
+    result = to_jsonable(np.int64(42))
     assert result == 42
     assert isinstance(result, int)
 
 
 def test_numpy_float_conversion():
     """Test numpy float conversion."""
-    from face_recognition.face_detector import convert_to_native_types
+    from face_recognition.serialization import to_jsonable
     
-    result = convert_to_native_types(np.float32(3.14))
+    result = to_jsonable(np.float32(3.14))
     assert isinstance(result, float)
     assert abs(result - 3.14) < 0.01
 
 
 def test_numpy_array_conversion():
     """Test numpy array conversion."""
-    from face_recognition.face_detector import convert_to_native_types
+    from face_recognition.serialization import to_jsonable
     
     arr = np.array([[1, 2], [3, 4]])
-    result = convert_to_native_types(arr)
+    result = to_jsonable(arr)
     assert isinstance(result, list)
     assert result == [[1, 2], [3, 4]]
 
@@ -0,0 +1,169 @@
+import asyncio
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from mcp.shared.exceptions import MCPError
+from mcp.types import CONNECTION_CLOSED
+import mcp_server
+from face_recognition.mcp_session import PersistentSession
+
+
+class FakeClient:
+    """
+    Stands in for fastmcp.Client; ``failures`` lists exceptions for the next call_tool/ping calls.
+
+    A ``ConnectionRefusedError`` at the head of the list fails the next connect instead.
+    """
+    opened = []
+
+    def __init__(self, url, failures=None):
+        self.url = url
+        self.failures = failures if failures is not None else []
+        self.connected = False
+        FakeClient.opened.append(self)
+
+    def is_connected(self):
+        return self.connected
+
+    async def __aenter__(self):
+        if self.failures and isinstance(self.failures[0], ConnectionRefusedError):
+            raise self.failures.pop(0)
+        self.connected = True
+        return self
+
+    async def close(self):
+        self.connected = False
+
+    async def call_tool(self, name, arguments):
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"tool": name, "client": id(self)}
+
+    async def ping(self):
+        if self.failures:
+            raise self.failures.pop(0)
+        return True
+
+
+@pytest.fixture
+def failures():
+    FakeClient.opened = []
+    return []
+
+
+def fake_session(failures, keepalive_seconds=0):
+    return PersistentSession("http://server/mcp", keepalive_seconds=keepalive_seconds,
+                             client_factory=lambda url: FakeClient(url, failures), idempotent_tools=["server_load"])
+
+
+async def test_calls_share_one_session(failures):
+    session = fake_session(failures)
+    results = [await session.call_tool("server_load", {}) for _ in range(3)]
+    assert len({result["client"] for result in results}) == 1
+    assert session.stats()["connects"] == 1
+
+
+async def test_connection_failure_reconnects_and_retries_once(failures):
+    session = fake_session(failures)
+    await session.call_tool("server_load", {})
+    failures.append(ConnectionError("connection reset"))
+
+    result = await session.call_tool("server_load", {})
+
+    assert result["client"] == id(FakeClient.opened[1])
+    assert not FakeClient.opened[0].connected
+    assert session.stats()["reconnects"] == 1
+
+
+async def test_dropped_call_of_non_idempotent_tool_is_not_repeated(failures):
+    """A tool that may already have run is not sent again, but the next call gets a fresh session."""
+    session = fake_session(failures)
+    await session.call_tool("server_load", {})
+    failures.append(MCPError(CONNECTION_CLOSED, "Connection closed"))
+
+    with pytest.raises(MCPError):
+        await session.call_tool("call_identify_face", {})
+    assert session.stats()["retries"] == 0
+    assert not FakeClient.opened[0].connected
+
+    result = await session.call_tool("call_identify_face", {})
+    assert result["client"] == id(FakeClient.opened[1])
+
+
+async def test_failed_connect_is_retried(failures):
+    """Nothing was sent when connecting fails, so opening the session is retried for any tool."""
+    session = fake_session(failures)
+    failures.append(ConnectionRefusedError("connection refused"))
+    result = await session.call_tool("call_identify_face", {})
+    assert result["client"] == id(FakeClient.opened[1])
+    assert session.stats()["connects"] == 1
+
+
+async def test_server_errors_keep_the_session(failures):
+    session = fake_session(failures)
+    failures.append(ToolError("Image file not found"))
+    with pytest.raises(ToolError):
+        await session.call_tool("call_detect_faces", {})
+    await session.call_tool("server_load", {})
+    assert len(FakeClient.opened) == 1
+
+
+async def test_failed_keepalive_ping_drops_the_session(failures):
+    session = fake_session(failures, keepalive_seconds=0.01)
+    await session.call_tool("server_load", {})
+    failures.append(ConnectionError("server went away"))
+    await asyncio.sleep(0.05)
+    assert not session.stats()["connected"]
+
+    await session.call_tool("server_load", {})
+    assert len(FakeClient.opened) == 2
+    await session.close()
+
+
+async def test_session_against_mcp_server():
+    session = PersistentSession("memory", keepalive_seconds=0, client_factory=lambda url: Client(mcp_server.mcp))
+    try:
+        for _ in range(3):
+            result = await session.call_tool("server_load", {})
+            assert "tools" in result.structured_content
+        assert await session.healthy()
+        assert session.stats()["connects"] == 1
+    finally:
+        await session.close()
+
+
+class DroppingClient(Client):
+    """A real client whose first call of each tool in ``drop`` fails as if the connection was lost."""
+
+    def __init__(self, transport, drop):
+        super().__init__(transport)
+        self.drop = drop
+
+    async def call_tool(self, name, arguments=None, **kwargs):
+        if name in self.drop:
+            self.drop.remove(name)
+            raise ConnectionError("connection reset")
+        return await super().call_tool(name, arguments, **kwargs)
+
+
+async def test_agent_uploads_are_retried_through_the_session(tmpdir, monkeypatch):
+    """The agent uploads images through its session, so a dropped has_blob or upload_blob is retried."""
+    from face_identifier_agent import agent
+    from face_recognition.blob_store import BlobStore
+
+    store = BlobStore(str(tmpdir.join("blobs")))
+    monkeypatch.setattr(mcp_server, "blob_store", store)
+    drop = ["has_blob", "upload_blob"]
+    session = PersistentSession("memory", keepalive_seconds=0,
+                                client_factory=lambda url: DroppingClient(mcp_server.mcp, drop),
+                                idempotent_tools=agent.IDEMPOTENT_TOOLS)
+    monkeypatch.setattr(agent, "session", session)
+    local = tmpdir.join("face.jpg")
+    local.write_binary(b"face bytes")
+    try:
+        ref = await agent._image_ref(str(local))
+    finally:
+        await session.close()
+
+    assert store.exists(ref)
+    assert session.stats()["retries"] == 2
@@ -0,0 +1,122 @@
+import os
+from unittest.mock import patch
+import httpx
+import numpy as np
+from fastmcp import Client
+import mcp_server
+from face_recognition.annotate import encode_image
+from face_recognition.executors import ToolExecutors
+from face_recognition.metrics import (
+    REGISTRY, STAGE_LATENCY, TOOL_CALLS, Counter, Histogram, Registry, instrument_tool, time_stage
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("work_seconds", "Work time.", ["stage"], buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="detect")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE work_seconds histogram" in lines
+    assert 'work_seconds_bucket{stage="detect",le="0.1"} 1' in lines
+    assert 'work_seconds_bucket{stage="detect",le="1"} 3' in lines
+    assert 'work_seconds_bucket{stage="detect",le="+Inf"} 4' in lines
+    assert 'work_seconds_count{stage="detect"} 4' in lines
+    assert 'work_seconds_sum{stage="detect"} 4.25' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = Registry()
+    counter = registry.register(Counter("calls_total", "Calls.", ["tool"]))
+    counter.inc(tool='say "hi"')
+    assert 'calls_total{tool="say \\"hi\\""} 1' in registry.render()
+
+
+def test_drain_and_merge_move_observations_between_registries():
+    worker, parent = Registry(), Registry()
+    for registry in (worker, parent):
+        registry.register(Histogram("stage_seconds", "Stage time.", ["stage"]))
+        registry.register(Counter("calls_total", "Calls.", ["tool"]))
+    worker.metrics["stage_seconds"].observe(0.2, stage="decode")
+    worker.metrics["calls_total"].inc(tool="detect")
+    parent.metrics["calls_total"].inc(tool="detect")
+
+    parent.merge(worker.drain())
+
+    assert parent.metrics["stage_seconds"].count(stage="decode") == 1
+    assert parent.metrics["calls_total"].value(tool="detect") == 2
+    assert worker.metrics["stage_seconds"].count(stage="decode") == 0
+
+
+async def test_instrument_tool_records_outcomes():
+    @instrument_tool
+    async def metrics_probe_tool(fail: bool = False):
+        return {"success": not fail}
+
+    await metrics_probe_tool(fail=False)
+    await metrics_probe_tool(True)
+    assert TOOL_CALLS.value(tool="metrics_probe_tool", status="ok") == 1
+    assert TOOL_CALLS.value(tool="metrics_probe_tool", status="error") == 1
+
+
+def test_time_stage_records_even_on_error():
+    before = STAGE_LATENCY.count(stage="probe")
+    try:
+        with time_stage("probe"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert STAGE_LATENCY.count(stage="probe") == before + 1
+
+
+async def test_process_pool_stage_metrics_reach_the_server():
+    """Stages timed inside spawned CPU workers are merged into the server's registry."""
+    executors = ToolExecutors(cpu_workers=1, cpu_executor="process")
+    before = STAGE_LATENCY.count(stage="encode")
+    try:
+        data, mime = await executors.run_cpu(encode_image, np.zeros((8, 8, 3), dtype=np.uint8))
+    finally:
+        executors.shutdown()
+    assert mime == "image/jpeg"
+    assert STAGE_LATENCY.count(stage="encode") == before + 1
+
+
+async def test_metrics_endpoint_serves_tool_metrics():
+    async with Client(mcp_server.mcp) as client:
+        await client.call_tool("has_blob", {"ref": "sha256:" + "0" * 64})
+    transport = httpx.ASGITransport(app=mcp_server.mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'mcp_tool_calls_total{tool="has_blob",status="ok"}' in response.text
+    assert 'mcp_tool_duration_seconds_count{tool="has_blob"}' in response.text
+    assert 'mcp_tool_in_flight{tool="has_blob"} 0' in response.text
+    assert 'mcp_tool_queued{tool="call_face_matcher"} 0' in response.text
+
+
+@patch('mcp_server.detect_faces_batch')
+async def test_batcher_metrics_reach_server_load_and_the_endpoint(mock_detect, tmpdir, monkeypatch):
+    """Detection batch sizes and queue waits are reported by server_load and exported at /metrics."""
+    mock_detect.side_effect = lambda paths: [{"success": True, "faces": [], "total_faces": 0} for _ in paths]
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    image = os.path.join(tmpdir, "image.jpg")
+    with open(image, "wb") as f:
+        f.write(b"jpeg")
+    try:
+        async with Client(mcp_server.mcp) as client:
+            await client.call_tool("call_detect_faces", {"image_path": image})
+            load = await client.call_tool("server_load", {})
+    finally:
+        executors.shutdown()
+    transport = httpx.ASGITransport(app=mcp_server.mcp.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    batching = load.structured_content["batching"]
+    assert batching["batches"] >= 1 and batching["items"] >= 1
+    assert "mean_wait_ms" in batching and "longest_wait_ms" in batching
+    assert 'request_batch_size_bucket{batcher="detect_faces",le="1"}' in response.text
+    assert 'request_batch_wait_seconds_count{batcher="detect_faces"}' in response.text
@@ -0,0 +1,59 @@
+import numpy as np
+from face_recognition.motion_gate import GatedDetector, MotionGate
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+
+def test_motion_gate_skips_static_frames():
+    """Identical frames after the first are skipped."""
+    gate = MotionGate(threshold=4.0)
+    assert gate.should_process(_frame(100)) is True
+    assert gate.should_process(_frame(100)) is False
+    assert gate.should_process(_frame(101)) is False
+    assert gate.skip_rate == 2 / 3
+
+
+def test_motion_gate_passes_changed_frames():
+    """A large change reaches the detector and becomes the new reference."""
+    gate = MotionGate(threshold=4.0)
+    gate.should_process(_frame(100))
+    moved = _frame(100)
+    moved[20:100, 40:120] = 255
+    assert gate.should_process(moved) is True
+    assert gate.should_process(moved.copy()) is False
+
+
+def test_motion_gate_accumulates_drift():
+    """Slow drift is measured against the last processed frame, not the previous one."""
+    gate = MotionGate(threshold=4.0)
+    gate.should_process(_frame(100))
+    decisions = [gate.should_process(_frame(100 + step)) for step in range(1, 6)]
+    assert decisions == [False, False, False, True, False]
+
+
+def test_motion_gate_forces_periodic_refresh():
+    """max_skip_frames bounds how long detections can be reused."""
+    gate = MotionGate(threshold=4.0, max_skip_frames=2)
+    gate.should_process(_frame(0))
+    assert [gate.should_process(_frame(0)) for _ in range(3)] == [False, False, True]
+
+
+def test_gated_detector_reuses_previous_result():
+    """Skipped frames return the cached detections without calling the detector."""
+    calls = []
+
+    def detector(frame):
+        calls.append(frame)
+        return {"success": True, "faces": [{"bbox": [1, 2, 3, 4]}], "total_faces": 1}
+
+    gated = GatedDetector(detector, MotionGate(threshold=4.0))
+    first = gated(_frame(50))
+    second = gated(_frame(50))
+
+    assert len(calls) == 1
+    assert first["reused"] is False
+    assert second["reused"] is True
+    assert second["faces"] == first["faces"]
+    assert gated.gate.stats()["skipped"] == 1
@@ -0,0 +1,148 @@
+import asyncio
+import gc
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+import cv2
+import numpy as np
+import pytest
+from fastmcp import Client
+from config import ServerConfig
+from face_recognition.prefork import PreforkServer, process_memory
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="fork and /proc are Linux-specific")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELOADED = []
+
+
+def serve_pid(sock):
+    """Answer every connection with this worker's pid and the preloaded values it holds."""
+    while True:
+        conn, _ = sock.accept()
+        with conn:
+            conn.sendall(f"{os.getpid()} {'+'.join(PRELOADED)}".encode())
+
+
+def ask(port):
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as conn:
+        pid, value = conn.recv(128).decode().split()
+    return int(pid), value
+
+
+def test_process_memory_reports_private_and_shared():
+    memory = process_memory()
+    assert memory["rss_mb"] > 0
+    assert memory["private_mb"] + memory["shared_mb"] == pytest.approx(memory["rss_mb"], rel=0.05)
+
+
+def test_workers_share_socket_and_preload():
+    server = PreforkServer(serve_pid, "127.0.0.1", 0, workers=2, preload=lambda: PRELOADED.append("model"),
+                           post_fork=lambda: PRELOADED.append("built"))
+    try:
+        server.start()
+        port = server.sock.getsockname()[1]
+        answers = [ask(port) for _ in range(10)]
+        assert {pid for pid, _ in answers} <= set(server.pids)
+        # Workers inherit the preload and run post_fork themselves; the parent never does
+        assert {value for _, value in answers} == {"model+built"}
+        assert set(server.memory_report()["workers"]) == set(server.pids)
+    finally:
+        server.stop()
+        for pid in list(server.pids):
+            os.waitpid(pid, 0)
+        server.sock.close()
+        gc.unfreeze()
+    assert PRELOADED == ["model"]
+
+
+def test_startup_warning_names_per_worker_state():
+    """Prefork mode warns that dedup and admission limits are kept per worker."""
+    import mcp_server
+
+    warning = mcp_server.perWorkerWarning(3)
+    assert "3 workers" in warning
+    for state in ("deduplication", "admission limits"):
+        assert state in warning
+    concurrent, _ = mcp_server._admission_config.limits()["call_face_matcher"]
+    assert f"call_face_matcher {concurrent}x3={concurrent * 3}" in warning
+
+
+def test_prefork_is_refused_while_stateful_tools_are_enabled(monkeypatch):
+    """Job and chunked-upload state lives in one worker, so prefork needs those tools turned off."""
+    import mcp_server
+
+    monkeypatch.setattr(mcp_server, "get_server_config", lambda: ServerConfig(workers=2, stateful_tools=True))
+    monkeypatch.setattr(mcp_server, "PreforkServer", lambda *args, **kwargs: pytest.fail("forked anyway"))
+    with pytest.raises(SystemExit, match="MCP_STATEFUL_TOOLS=false"):
+        mcp_server.main()
+
+
+def _mapped(pid, library):
+    with open(f"/proc/{pid}/maps") as maps:
+        return library in maps.read()
+
+
+async def _detect_when_ready(url, image_path, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with Client(url) as client:
+                detection = await client.call_tool("call_detect_faces", {"image_path": image_path})
+                load = await client.call_tool("server_load", {})
+                tools = {tool.name for tool in await client.list_tools()}
+                return detection.structured_content, load.structured_content["worker"]["pid"], tools
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(1)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(importlib.util.find_spec("tensorflow") is None or importlib.util.find_spec("retinaface") is None,
+                    reason="needs TensorFlow and RetinaFace")
+def test_forked_worker_runs_tensorflow_detection(tmpdir):
+    """A worker forked from a parent that never imported TensorFlow builds the model and detects."""
+    env = {**os.environ, "DEEPFACE_HOME": str(tmpdir), "TF_USE_LEGACY_KERAS": "1"}
+    # All-zero weights run the same graph as the published ones without a download; every face
+    # score comes out at 0.5, below the detection threshold, so the result is deterministic
+    weights = os.path.join(tmpdir, ".deepface", "weights", "retinaface.h5")
+    os.makedirs(os.path.dirname(weights))
+    subprocess.run([sys.executable, "-c",
+                    "import sys\n"
+                    "import numpy as np\n"
+                    "from retinaface.model import retinaface_model\n"
+                    "retinaface_model.load_weights = lambda model: model\n"
+                    "model = retinaface_model.build_model()\n"
+                    "model.set_weights([np.zeros_like(w) for w in model.get_weights()])\n"
+                    "model.save_weights(sys.argv[1])\n", weights],
+                   env=env, check=True, capture_output=True)
+    image_path = os.path.join(tmpdir, "image.jpg")
+    cv2.imwrite(image_path, np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8))
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    server = subprocess.Popen([sys.executable, "mcp_server.py"], cwd=ROOT,
+                              env={**env, "MCP_WORKERS": "2", "MCP_STATEFUL_TOOLS": "false", "MCP_PORT": str(port),
+                                   "MCP_HOST": "127.0.0.1"},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        detection, worker_pid, tools = asyncio.run(
+            _detect_when_ready(f"http://127.0.0.1:{port}/mcp", image_path, timeout=240))
+        parent_has_tensorflow = _mapped(server.pid, "tensorflow")
+        worker_has_tensorflow = _mapped(worker_pid, "tensorflow")
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    assert detection["success"] is True, detection
+    assert detection["total_faces"] == 0
+    assert worker_pid != server.pid
+    assert worker_has_tensorflow and not parent_has_tensorflow
+    assert "get_job" not in tools and "begin_upload" not in tools
+    assert "call_detect_faces" in tools and "upload_blob" in tools
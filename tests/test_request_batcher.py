@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from face_recognition.metrics import BATCH_SIZE, BATCH_WAIT
+from face_recognition.request_batcher import RequestBatcher
+
+
+def recording_batcher(**kwargs):
+    batches = []
+
+    async def run_batch(items):
+        batches.append(list(items))
+        await asyncio.sleep(0)
+        return [item * 10 for item in items]
+
+    return RequestBatcher(run_batch, **kwargs), batches
+
+
+async def test_concurrent_requests_share_a_batch():
+    batcher, batches = recording_batcher(max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(*[batcher.submit(i) for i in range(5)])
+    assert results == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["mean_batch_size"] == 5
+
+
+async def test_full_batch_dispatches_without_waiting():
+    batcher, batches = recording_batcher(max_batch_size=2, max_wait_ms=10_000)
+    results = await asyncio.wait_for(asyncio.gather(*[batcher.submit(i) for i in range(4)]), timeout=1)
+    assert results == [0, 10, 20, 30]
+    assert batches == [[0, 1], [2, 3]]
+
+
+async def test_lone_request_dispatches_after_window():
+    batcher, batches = recording_batcher(max_batch_size=8, max_wait_ms=5)
+    assert await asyncio.wait_for(batcher.submit(7), timeout=1) == 70
+    assert batches == [[7]]
+
+
+async def test_batch_sizes_and_queue_waits_are_recorded():
+    """Each batch's size and each item's wait are kept in stats and the batcher's histograms."""
+    batcher, batches = recording_batcher(max_batch_size=8, max_wait_ms=20, name="recorded")
+    await asyncio.gather(*[batcher.submit(i) for i in range(3)])
+    await batcher.submit(3)
+
+    stats = batcher.stats()
+    assert stats["batches"] == 2
+    assert 15 <= stats["longest_wait_ms"] < 1000
+    assert 0 < stats["mean_wait_ms"] <= stats["longest_wait_ms"]
+    assert BATCH_SIZE.count(batcher="recorded") == 2
+    assert BATCH_WAIT.count(batcher="recorded") == 4
+
+
+async def test_batch_failure_reaches_every_caller():
+    async def run_batch(items):
+        raise RuntimeError("model failed")
+
+    batcher = RequestBatcher(run_batch, max_batch_size=4, max_wait_ms=5)
+    results = await asyncio.gather(*[batcher.submit(i) for i in range(3)], return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        RequestBatcher(lambda items: items, max_batch_size=0)
@@ -0,0 +1,80 @@
+import json
+from unittest.mock import patch
+import numpy as np
+from fastmcp import Client
+import pytest
+import mcp_server
+from face_recognition.executors import ToolExecutors
+from face_recognition.serialization import dumps, dumps_str, to_jsonable
+
+
+def detection_with_numpy_values():
+    return {
+        "success": True,
+        "error": None,
+        "faces": [{
+            "face_id": "face_1",
+            "bbox": np.array([10, 20, 110, 140], dtype=np.int64),
+            "landmarks": {"nose": np.array([60.5, 80.25], dtype=np.float32)},
+            "confidence": np.float32(0.5),
+        }],
+        "total_faces": np.int64(1),
+    }
+
+
+def test_dumps_handles_numpy_natively():
+    data = json.loads(dumps(detection_with_numpy_values()))
+    face = data["faces"][0]
+    assert face["bbox"] == [10, 20, 110, 140]
+    assert face["landmarks"]["nose"] == [60.5, 80.25]
+    assert face["confidence"] == 0.5
+    assert data["total_faces"] == 1
+
+
+def test_to_jsonable_returns_native_types():
+    result = to_jsonable({"a": np.int32(3), "b": (1, 2), 7: np.bool_(True), "nested": [np.float64(1.5)]})
+    assert result == {"a": 3, "b": [1, 2], "7": True, "nested": [1.5]}
+    assert isinstance(result["a"], int)
+
+
+def test_to_jsonable_matches_encoded_json():
+    """The single-pass conversion gives the same structure as encoding and parsing the result."""
+    result = detection_with_numpy_values()
+    result["faces"][0]["mask"] = np.zeros((2, 2), dtype=np.uint8)
+    result[3] = {None: "none", False: "no", 1.5: "half"}
+    converted = to_jsonable(result)
+    assert converted == json.loads(dumps(result))
+    assert isinstance(converted["faces"][0]["bbox"][0], int)
+    assert isinstance(converted["faces"][0]["confidence"], float)
+
+
+def test_dumps_str_keeps_unicode():
+    assert dumps_str({"name": "José"}) == '{"name":"José"}'
+
+
+@pytest.fixture(autouse=True)
+def thread_executors(monkeypatch):
+    """Run tool work in threads so patched functions need not be picklable."""
+    executors = ToolExecutors(cpu_executor="thread")
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    yield executors
+    executors.shutdown()
+
+
+@patch('mcp_server.detect_faces_batch')
+async def test_tool_returns_structured_dict(mock_detect):
+    """Tools return plain dictionaries instead of JSON strings."""
+    mock_detect.side_effect = lambda paths: [detection_with_numpy_values() for _ in paths]
+    response = await mcp_server.call_detect_faces("image.jpg")
+    assert isinstance(response, dict)
+    assert response["faces"][0]["bbox"] == [10, 20, 110, 140]
+
+
+@patch('mcp_server.detect_faces_batch')
+async def test_tool_result_carries_structured_content(mock_detect):
+    """Clients receive the result as structured content and need not parse text."""
+    mock_detect.side_effect = lambda paths: [detection_with_numpy_values() for _ in paths]
+    async with Client(mcp_server.mcp) as client:
+        result = await client.call_tool("call_detect_faces", {"image_path": "image.jpg"})
+    assert result.structured_content["total_faces"] == 1
+    assert result.structured_content["faces"][0]["landmarks"]["nose"] == [60.5, 80.25]
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import shutil
+import time
+import pytest
+import mcp_server
+from face_recognition.executors import ToolExecutors
+from face_recognition.singleflight import SingleFlight
+
+
+async def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    results = await asyncio.gather(*[flight.do("key", work) for _ in range(5)])
+    assert results == [{"value": 42}] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+    # Finished calls are not cached
+    await flight.do("key", work)
+    assert len(calls) == 2
+
+
+async def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["executions"] == 1
+
+
+async def test_cancelled_waiter_leaves_execution_running():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "done"
+
+
+@pytest.fixture
+def detect_calls(monkeypatch):
+    executors = ToolExecutors(cpu_executor="thread")
+    calls = []
+
+    def detect_faces_batch(paths):
+        calls.extend(paths)
+        time.sleep(0.1)
+        return [{"success": True, "error": None, "faces": [], "total_faces": 0} for _ in paths]
+
+    monkeypatch.setattr(mcp_server, "executors", executors)
+    monkeypatch.setattr(mcp_server, "detect_faces_batch", detect_faces_batch)
+    monkeypatch.setattr(mcp_server, "inflight", SingleFlight())
+    yield calls
+    executors.shutdown()
+
+
+async def test_duplicate_detect_calls_are_coalesced_by_content(detect_calls, tmpdir):
+    """Same content under different paths runs once; different content runs separately."""
+    first = os.path.join(tmpdir, "first.jpg")
+    with open(first, "wb") as f:
+        f.write(b"image one")
+    copy = os.path.join(tmpdir, "copy.jpg")
+    shutil.copy(first, copy)
+    other = os.path.join(tmpdir, "other.jpg")
+    with open(other, "wb") as f:
+        f.write(b"image two")
+
+    results = await asyncio.gather(*[mcp_server.call_detect_faces(path) for path in [first, first, copy, other]])
+
+    assert all(result["success"] for result in results)
+    assert sorted(os.path.basename(path) for path in detect_calls) in (["first.jpg", "other.jpg"],
+                                                                       ["copy.jpg", "other.jpg"])
+    assert mcp_server.inflight.stats()["coalesced"] == 2
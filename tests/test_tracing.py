@@ -0,0 +1,116 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from fastmcp import Client
+import mcp_server
+from face_recognition import tracing
+from face_recognition.executors import ToolExecutors
+from face_recognition.face_identifier import identify_face
+from face_recognition.face_matcher import face_matcher
+
+# The global tracer provider can only be installed once per process
+EXPORTER = tracing.configure_tracing("memory", service_name="face-recognition-tests")
+
+
+@pytest.fixture
+def spans():
+    EXPORTER.clear()
+    yield EXPORTER
+    EXPORTER.clear()
+
+
+def by_name(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_span_skips_none_attributes(spans):
+    with tracing.span("probe", **{"image.width": 640, "image.height": None}) as current:
+        tracing.set_attributes(current, **{"faces.count": 2, "unused": None})
+    probe = by_name(spans)["probe"]
+    assert dict(probe.attributes) == {"image.width": 640, "faces.count": 2}
+
+
+def test_context_round_trips_through_carrier(spans):
+    with tracing.span("caller") as caller:
+        carrier = tracing.inject_context()
+    assert "traceparent" in carrier
+    with tracing.attached_context(carrier):
+        with tracing.span("worker"):
+            pass
+    worker = by_name(spans)["worker"]
+    assert worker.context.trace_id == caller.get_span_context().trace_id
+    assert worker.parent.span_id == caller.get_span_context().span_id
+
+
+async def test_tool_call_joins_client_trace(spans):
+    """The server's tool span continues the trace of the calling agent turn."""
+    with tracing.span("agent turn") as turn:
+        async with Client(mcp_server.mcp) as client:
+            await client.call_tool("server_load", {})
+
+    tool_span = by_name(spans)["tool server_load"]
+    assert tool_span.context.trace_id == turn.get_span_context().trace_id
+    assert tool_span.attributes["mcp.tool.status"] == "ok"
+    assert tool_span.attributes["mcp.response.bytes"] > 0
+
+
+@patch('face_recognition.face_identifier.genai')
+def test_identify_span_records_upload_and_verdict(mock_genai, spans, tmpdir):
+    base_path = os.path.join(tmpdir, "base.jpg")
+    target_path = os.path.join(tmpdir, "target.jpg")
+    cv2.imwrite(base_path, np.full((40, 40, 3), 128, dtype=np.uint8))
+    cv2.imwrite(target_path, np.full((120, 160, 3), 64, dtype=np.uint8))
+    model = MagicMock()
+    model.generate_content.return_value.text = '{"match": "yes", "bounding_box": [1, 2, 3, 4]}'
+    mock_genai.GenerativeModel.return_value = model
+
+    result = identify_face(base_path, target_path)
+
+    span = by_name(spans)["identify_face"]
+    assert span.attributes["identify.target_mode"] == "full"
+    assert span.attributes["identify.upload_bytes"] == result["payload_bytes"] > 0
+    assert span.attributes["identify.is_match"] is True
+
+
+@patch('face_recognition.face_matcher.detect_faces')
+@patch('face_recognition.face_matcher.identify_face')
+def test_face_matcher_stages_are_spans(mock_identify_face, mock_detect_faces, spans, tmpdir):
+    source_path = os.path.join(tmpdir, "source.jpg")
+    target_path = os.path.join(tmpdir, "target.jpg")
+    cv2.imwrite(source_path, np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8))
+    cv2.imwrite(target_path, np.zeros((100, 100, 3), dtype=np.uint8))
+    mock_detect_faces.return_value = {
+        "success": True,
+        "faces": [{"face_id": "face_1", "bbox": [10, 10, 40, 40]}, {"face_id": "face_2", "bbox": [50, 50, 90, 90]}],
+    }
+    mock_identify_face.return_value = {"success": True, "is_match": False}
+
+    with tracing.span("match") as match:
+        face_matcher(source_path, target_path, dedup=False)
+
+    finished = spans.get_finished_spans()
+    names = [span.name for span in finished]
+    assert names.count("identify_cluster") == 2
+    assert by_name(spans)["crop"].attributes["faces.count"] == 2
+    assert by_name(spans)["dedup"].attributes["dedup.clusters"] == 2
+    assert {span.context.trace_id for span in finished} == {match.get_span_context().trace_id}
+
+
+def traced_work():
+    with tracing.span("cpu work"):
+        return True
+
+
+async def test_thread_pool_work_joins_caller_trace(spans):
+    executors = ToolExecutors(cpu_workers=1, io_workers=1, cpu_executor="thread")
+    try:
+        with tracing.span("caller") as caller:
+            await executors.run_cpu(traced_work)
+            await executors.run_io(traced_work)
+    finally:
+        executors.shutdown()
+    work = [span for span in spans.get_finished_spans() if span.name == "cpu work"]
+    assert len(work) == 2
+    assert all(span.parent.span_id == caller.get_span_context().span_id for span in work)
@@ -0,0 +1,110 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from face_recognition.utils import (
+    ImageCache, clear_image_cache, image_cache_stats, image_size, load_image, load_image_bytes,
+    load_image_pil, load_image_region, reduction_for
+)
+
+
+@pytest.fixture
+def image_path(tmpdir):
+    path = os.path.join(tmpdir, "image.png")
+    cv2.imwrite(path, np.full((20, 30, 3), 77, dtype=np.uint8))
+    clear_image_cache()
+    yield path
+    clear_image_cache()
+
+
+def test_load_image_decodes_once(image_path):
+    """The second load of an unchanged file is a cache hit returning the same array."""
+    first = load_image(image_path)
+    second = load_image(image_path)
+    assert first is second
+    stats = image_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["bytes"] == first.nbytes
+
+
+def test_load_image_is_read_only(image_path):
+    """Shared arrays cannot be modified in place by callers."""
+    image = load_image(image_path)
+    with pytest.raises(ValueError):
+        image[0, 0] = 0
+
+
+def test_load_image_reloads_modified_file(image_path):
+    """A change in mtime or size invalidates the cached entry."""
+    load_image(image_path)
+    cv2.imwrite(image_path, np.full((40, 30, 3), 10, dtype=np.uint8))
+    os.utime(image_path, ns=(0, 123456789))
+    assert load_image(image_path).shape == (40, 30, 3)
+
+
+def test_load_image_missing_file(tmpdir):
+    assert load_image(os.path.join(tmpdir, "missing.png")) is None
+
+
+def test_load_image_bytes_cached(image_path):
+    """Raw bytes are cached separately from the decoded array."""
+    data = load_image_bytes(image_path)
+    assert load_image_bytes(image_path) is data
+    assert data == open(image_path, "rb").read()
+
+
+def test_image_cache_evicts_by_bytes():
+    """The least recently used entries are evicted to stay within the byte budget."""
+    cache = ImageCache(max_bytes=100)
+    cache.put(("a", "decoded"), (1, 1), "A", 60)
+    cache.put(("b", "decoded"), (1, 1), "B", 30)
+    assert cache.get(("a", "decoded"), (1, 1)) == "A"
+    cache.put(("c", "decoded"), (1, 1), "C", 30)
+    assert cache.get(("b", "decoded"), (1, 1)) is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 90
+
+
+@pytest.fixture
+def large_jpeg(tmpdir):
+    path = os.path.join(tmpdir, "large.jpg")
+    image = np.zeros((1200, 1600, 3), dtype=np.uint8)
+    image[300:600, 400:800] = (0, 128, 255)
+    cv2.imwrite(path, image)
+    clear_image_cache()
+    yield path
+    clear_image_cache()
+
+
+def test_reduced_decode(large_jpeg):
+    """Reduced decodes are smaller and cached separately from the full decode."""
+    assert load_image(large_jpeg, reduce=4).shape == (300, 400, 3)
+    assert load_image(large_jpeg).shape == (1200, 1600, 3)
+    assert image_cache_stats()["misses"] == 2
+    with pytest.raises(ValueError):
+        load_image(large_jpeg, reduce=3)
+
+
+def test_reduction_for(large_jpeg):
+    """The largest factor that keeps the long side at or above the minimum is chosen."""
+    assert image_size(large_jpeg) == (1600, 1200)
+    assert reduction_for(large_jpeg, 400) == 4
+    assert reduction_for(large_jpeg, 500) == 2
+    assert reduction_for(large_jpeg, 2000) == 1
+    assert image_cache_stats()["misses"] == 0
+
+
+def test_load_image_region(large_jpeg):
+    """Region crops are full resolution, writable and do not populate the cache."""
+    region = load_image_region(large_jpeg, [400, 300, 800, 600])
+    assert region.shape == (300, 400, 3)
+    region[0, 0] = 0
+    assert abs(int(region[150, 200, 2]) - 255) < 10
+    assert image_cache_stats()["entries"] == 0
+
+
+def test_load_image_pil_converts_to_rgb(large_jpeg):
+    image = load_image_pil(large_jpeg, max_side=800)
+    assert image.size == (800, 600)
+    r, g, b = image.getpixel((300, 225))
+    assert r > 200 and b < 50
@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import pytest
+from face_recognition.video_search import _merge_intervals, search_video
+
+
+def _bright_region_detector(frame):
+    """Treat the bounding box of bright pixels as a single detected face."""
+    ys, xs = np.where(frame[:, :, 0] > 200)
+    if len(xs) == 0:
+        return {"success": True, "faces": [], "total_faces": 0}
+    bbox = [int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1]
+    return {"success": True, "faces": [{"face_id": "face_1", "bbox": bbox, "confidence": 0.99}], "total_faces": 1}
+
+
+@pytest.fixture
+def video_and_source(tmpdir):
+    """A 4 second clip in which a bright 'face' is visible from 1.0s to 2.0s."""
+    video_path = os.path.join(tmpdir, "recording.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (160, 120))
+    for i in range(120):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        if 30 <= i < 60:
+            x = 20 + (i - 30)
+            frame[30:80, x:x + 40] = 255
+        writer.write(frame)
+    writer.release()
+    source_path = os.path.join(tmpdir, "source.jpg")
+    cv2.imwrite(source_path, np.full((40, 40, 3), 255, dtype=np.uint8))
+    return source_path, video_path
+
+
+def test_search_video_finds_interval(video_and_source):
+    """The appearance is returned as one interval, identified once."""
+    source_path, video_path = video_and_source
+    crops = []
+
+    def identify(crop):
+        crops.append(crop.shape)
+        return {"success": True, "is_match": True}
+
+    result = search_video(source_path, video_path, sample_fps=10, workers=3, executor="thread",
+                          detector=_bright_region_detector, identify_fn=identify)
+
+    assert result["success"] is True
+    assert len(result["intervals"]) == 1
+    interval = result["intervals"][0]
+    assert 0.9 <= interval["start"] <= 1.1
+    assert 1.9 <= interval["end"] <= 2.1
+    assert 1.0 <= interval["best_frame"]["timestamp"] < 2.0
+    assert result["identify_calls"] == 1
+    assert len(crops) == 1
+    assert result["frames_decoded"] == 40
+    assert result["decode_detect_fps"] > 0
+
+
+def test_search_video_no_match(video_and_source):
+    """Tracks that do not match the source produce no intervals."""
+    source_path, video_path = video_and_source
+    result = search_video(source_path, video_path, sample_fps=5, workers=2, executor="thread",
+                          detector=_bright_region_detector,
+                          identify_fn=lambda crop: {"success": True, "is_match": False})
+    assert result["intervals"] == []
+    assert result["total_tracks"] == 1
+
+
+def test_search_video_missing_video(tmpdir, video_and_source):
+    source_path, _ = video_and_source
+    result = search_video(source_path, os.path.join(tmpdir, "missing.avi"))
+    assert result["success"] is False
+
+
+def test_merge_intervals():
+    """Nearby intervals merge and keep the most confident frame."""
+    intervals = [
+        {"start": 0.0, "end": 1.0, "track_ids": [1], "best_frame": {"confidence": 0.5}},
+        {"start": 1.2, "end": 2.0, "track_ids": [2], "best_frame": {"confidence": 0.9}},
+        {"start": 5.0, "end": 6.0, "track_ids": [3], "best_frame": {"confidence": 0.7}},
+    ]
+    merged = _merge_intervals(intervals, gap_seconds=0.5)
+    assert [(m["start"], m["end"]) for m in merged] == [(0.0, 2.0), (5.0, 6.0)]
+    assert merged[0]["track_ids"] == [1, 2]
+    assert merged[0]["best_frame"]["confidence"] == 0.9
+
+
+def test_search_video_runs_on_a_shared_pool(video_and_source):
+    """A caller-supplied pool is used for the segments and left running."""
+    source_path, video_path = video_and_source
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = search_video(source_path, video_path, sample_fps=10, workers=2, pool=pool,
+                              detector=_bright_region_detector,
+                              identify_fn=lambda crop: {"success": True, "is_match": True})
+        assert result["success"] is True
+        assert len(result["intervals"]) == 1
+        assert pool.submit(lambda: 1).result() == 1
+
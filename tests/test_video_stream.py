@@ -0,0 +1,103 @@
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+from face_recognition.camera import CameraSession
+from face_recognition.face_tracker import FaceTracker, TrackIdentifier
+from face_recognition.motion_gate import MotionGate
+from face_recognition.video_stream import _adaptive_stride, stream_detections
+
+
+@pytest.fixture
+def video_path(tmpdir):
+    """Write a 2 second, 30 fps MJPG clip."""
+    path = os.path.join(tmpdir, "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for i in range(60):
+        writer.write(np.full((48, 64, 3), (i * 4) % 255, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _fake_detector(delay: float):
+    def detect(frame):
+        time.sleep(delay)
+        return {"success": True, "error": None, "faces": [{"bbox": [0, 0, 10, 10]}], "total_faces": 1}
+    return detect
+
+
+def test_adaptive_stride():
+    """Stride covers the frames that elapse during one detection."""
+    assert _adaptive_stride(0.0, 30.0, 1, 30) == 1
+    assert _adaptive_stride(0.1, 30.0, 1, 30) == 3
+    assert _adaptive_stride(5.0, 30.0, 1, 30) == 30
+
+
+def test_stream_processes_every_frame_when_not_realtime(video_path):
+    """Offline processing visits every frame in order."""
+    events = list(stream_detections(video_path, realtime=False, detector=_fake_detector(0)))
+    assert [e["frame_index"] for e in events] == list(range(60))
+    assert all(e["total_faces"] == 1 for e in events)
+
+
+def test_stream_skips_frames_to_stay_within_lag(video_path):
+    """A slow detector increases the stride and never lags more than the limit."""
+    events = list(stream_detections(video_path, max_lag_seconds=0.2, detector=_fake_detector(0.1)))
+    assert len(events) < 60
+    assert max(e["stride"] for e in events) >= 3
+    assert all(e["lag_seconds"] <= 0.2 + 0.15 for e in events)
+
+
+def test_stream_from_camera_session(video_path):
+    """Latest-frame sources such as CameraSession are supported."""
+    with CameraSession(video_path) as session:
+        events = list(stream_detections(session, max_frames=3, detector=_fake_detector(0)))
+    assert len(events) == 3
+
+
+def test_stream_bad_source(tmpdir):
+    """Unopenable sources raise an IOError."""
+    with pytest.raises(IOError):
+        next(stream_detections(os.path.join(tmpdir, "missing.avi")))
+
+
+def test_stream_with_motion_gate_reuses_detections(tmpdir):
+    """Static stretches of video reuse detections and report the skip rate."""
+    path = os.path.join(tmpdir, "static.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for _ in range(20):
+        writer.write(np.full((48, 64, 3), 90, dtype=np.uint8))
+    writer.release()
+
+    calls = []
+
+    def detector(frame):
+        calls.append(1)
+        return {"success": True, "error": None, "faces": [], "total_faces": 0}
+
+    gate = MotionGate(threshold=4.0)
+    events = list(stream_detections(path, realtime=False, detector=detector, motion_gate=gate))
+
+    assert len(events) == 20
+    assert len(calls) == 1
+    assert events[-1]["reused"] is True
+    assert events[-1]["skip_rate"] == gate.skip_rate > 0.9
+
+
+def test_stream_with_tracker_identifies_once_per_track(video_path):
+    """With a tracker, a steady face is identified once for the whole clip."""
+    calls = []
+
+    def identify(crop):
+        calls.append(1)
+        return {"success": True, "is_match": True}
+
+    identifier = TrackIdentifier(identify, reverify_seconds=None)
+    events = list(stream_detections(video_path, realtime=False, detector=_fake_detector(0),
+                                    tracker=FaceTracker(), track_identifier=identifier))
+
+    assert len(events) == 60
+    assert len(calls) == 1
+    assert {t["track_id"] for e in events for t in e["tracks"]} == {1}
+    assert events[-1]["tracks"][0]["identity"]["is_match"] is True